@@ -3,10 +3,16 @@ Shared utilities for API and self-hosted services
 Common functions for validation, timing, and analysis
 """
 
+import sys
 import time
 import functools
+import importlib
 import logging
-from typing import Dict, Any, List
+import statistics
+import threading
+from collections import deque
+from types import ModuleType
+from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +32,80 @@ def measure_time(func):
             raise
     return wrapper
 
+def timed_import(module_name: str, profile: List[Dict[str, Any]]) -> ModuleType:
+    """
+    Import a module and append its cumulative import time to profile
+    
+    Cumulative time covers the module plus every dependency it pulled in,
+    matching the "cumulative" column of python -X importtime. lab-01.1 and
+    lab-03.1 keep their own copies, since each lab is its own build context.
+    
+    Args:
+        module_name: Dotted module name to import
+        profile: List that receives one entry per imported module
+    
+    Returns:
+        The imported module
+    """
+    modules_before = len(sys.modules)
+    start_time = time.perf_counter()
+    module = importlib.import_module(module_name)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    
+    profile.append({
+        "module": module_name,
+        "cumulative_ms": round(elapsed_ms, 2),
+        "modules_loaded": len(sys.modules) - modules_before
+    })
+    logger.info("Imported %s in %.0fms", module_name, elapsed_ms)
+    return module
+
+class LatencyTracker:
+    """
+    Tracks first-request latency separately from steady-state latency
+    
+    The first requests after a rollout pay lazy allocation and kernel
+    selection costs; comparing them with the steady state shows whether
+    warmup actually removed the latency cliff.
+    """
+    
+    def __init__(self, first_requests: int = 1, window: int = 500):
+        self.first_requests = first_requests
+        self._first: List[float] = []
+        self._steady = deque(maxlen=window)
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def record(self, latency_ms: float) -> None:
+        with self._lock:
+            self._count += 1
+            if len(self._first) < self.first_requests:
+                self._first.append(latency_ms)
+            else:
+                self._steady.append(latency_ms)
+    
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            first = list(self._first)
+            steady = sorted(self._steady)
+            count = self._count
+        
+        steady_p50 = statistics.median(steady) if steady else None
+        first_max = max(first) if first else None
+        return {
+            "requests_observed": count,
+            "first_request_ms": [round(v, 2) for v in first],
+            "steady_state_p50_ms": round(steady_p50, 2) if steady_p50 is not None else None,
+            "steady_state_p95_ms": round(steady[int(0.95 * (len(steady) - 1))], 2) if steady else None,
+            "first_vs_steady_ratio": round(first_max / steady_p50, 2) if first_max and steady_p50 else None
+        }
+
+def build_warmup_text(words: int) -> str:
+    """Build a synthetic document of roughly the given word count for warmup"""
+    base = generate_test_documents()[-1]["text"].split()
+    repeats = words // len(base) + 1
+    return " ".join((base * repeats)[:words])
+
 def validate_request(data: Dict[str, Any]) -> bool:
     """Validate incoming request data"""
     if not data:
@@ -0,0 +1,72 @@
+import asyncio
+import math
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+
+
+class AdmissionController:
+    """
+    Caps concurrent inference and sheds work that would queue too long.
+
+    Requests wait for a free slot for at most `queue_budget_ms`; past that
+    they get a fast 429 with Retry-After instead of piling up in memory.
+    """
+
+    def __init__(self, max_concurrency: int, queue_budget_ms: float, expected_latency_ms: float):
+        self.max_concurrency = max_concurrency
+        self.queue_budget_ms = queue_budget_ms
+        self.expected_latency_ms = expected_latency_ms
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def retry_after_seconds(self) -> int:
+        # Rough time for everything already admitted or queued to drain
+        waves = (self.in_flight + self.queued) / self.max_concurrency
+        return max(1, math.ceil(waves * self.expected_latency_ms / 1000.0))
+
+    @asynccontextmanager
+    async def slot(self):
+        self.queued += 1
+        acquired = False
+        try:
+            # asyncio.timeout rather than wait_for: on 3.11 wait_for can time out
+            # after the inner acquire already succeeded and lose that permit
+            async with asyncio.timeout(self.queue_budget_ms / 1000.0):
+                await self._slots.acquire()
+                acquired = True
+        except BaseException as exc:
+            # Cancelled (or timed out) after the permit was granted: hand it back
+            if acquired:
+                self._slots.release()
+            if not isinstance(exc, TimeoutError):
+                raise
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="server busy, queue budget exceeded",
+                headers={"Retry-After": str(self.retry_after_seconds())},
+            )
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_budget_ms": self.queue_budget_ms,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,61 @@
+import argparse
+import json
+import random
+import time
+
+import httpx
+
+
+def make_rows(num_rows: int, num_features: int):
+    return [[random.random() for _ in range(num_features)] for _ in range(num_rows)]
+
+
+def bench_per_row(client: httpx.Client, base_url: str, rows) -> float:
+    start = time.perf_counter()
+    for row in rows:
+        resp = client.post(f"{base_url}/predict", json={"features": row})
+        resp.raise_for_status()
+    return time.perf_counter() - start
+
+
+def bench_batch(client: httpx.Client, base_url: str, rows, batch_size: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(rows), batch_size):
+        resp = client.post(f"{base_url}/predict/batch", json={"rows": rows[i:i + batch_size]})
+        resp.raise_for_status()
+    return time.perf_counter() - start
+
+
+def run(base_url: str, num_rows: int, num_features: int, batch_size: int) -> dict:
+    rows = make_rows(num_rows, num_features)
+    with httpx.Client(timeout=30.0) as client:
+        per_row_sec = bench_per_row(client, base_url, rows)
+        batch_sec = bench_batch(client, base_url, rows, batch_size)
+
+    return {
+        "url": base_url,
+        "rows": num_rows,
+        "features": num_features,
+        "batch_size": batch_size,
+        "per_row_total_sec": round(per_row_sec, 3),
+        "per_row_rows_per_sec": round(num_rows / per_row_sec, 1),
+        "batch_total_sec": round(batch_sec, 3),
+        "batch_rows_per_sec": round(num_rows / batch_sec, 1),
+        "speedup": round(per_row_sec / batch_sec, 1),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare /predict (one row per call) with /predict/batch"
+    )
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the API")
+    parser.add_argument("--rows", type=int, default=200, help="Rows to score (default: 200)")
+    parser.add_argument("--features", type=int, default=16, help="Features per row (default: 16)")
+    parser.add_argument("--batch-size", type=int, default=200, help="Rows per batch call (default: 200)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(json.dumps(run(args.url, args.rows, args.features, args.batch_size)))
@@ -0,0 +1,54 @@
+import argparse
+import json
+import timeit
+
+import msgpack
+import numpy as np
+
+from codec import decode_features
+from main import Features
+
+DEFAULT_SIZES = [16, 256, 4096, 65536]
+
+
+def payloads(size: int) -> dict:
+    values = np.random.default_rng(0).random(size, dtype=np.float32)
+    return {
+        "json": (json.dumps({"features": values.tolist()}).encode(), "application/json"),
+        "msgpack_list": (msgpack.packb({"features": values.tolist()}), "application/msgpack"),
+        "msgpack_bin": (msgpack.packb({"features": values.astype("<f4").tobytes()}), "application/msgpack"),
+        "octet_stream": (values.astype("<f4").tobytes(), "application/octet-stream"),
+    }
+
+
+def parse_and_compute(body: bytes, content_type: str) -> float:
+    return float(decode_features(body, content_type, Features).sum(dtype=np.float64))
+
+
+def run(sizes, repeat: int) -> list:
+    results = []
+    for size in sizes:
+        row = {"features": size}
+        for name, (body, content_type) in payloads(size).items():
+            number = max(1, 20000 // size)
+            best = min(timeit.repeat(lambda: parse_and_compute(body, content_type), number=number, repeat=repeat))
+            row[f"{name}_us"] = round(best / number * 1e6, 2)
+            row[f"{name}_bytes"] = len(body)
+        results.append(row)
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="In-process parse + compute cost per payload encoding and size"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Feature vector lengths to test")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats (best is reported)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for row in run(args.sizes, args.repeat):
+        print(json.dumps(row))
@@ -1,33 +1,90 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel, Field
 from typing import List
-import time
+import asyncio
+import os
+
+import numpy as np
+
+from admission import AdmissionController
+from codec import PREDICT_OPENAPI, encode_response, read_features, response_format
 
 app = FastAPI(title="AI Lab Free - Simple Inference API")
 
+# Simulated model cost: a fixed per-call overhead plus a small per-row component,
+# which is how real batched inference behaves (the fixed part is amortized).
+SIMULATED_LATENCY_MS = 50
+PER_ROW_LATENCY_MS = 0.2
+MAX_BATCH_ROWS = 1024
+
+# Admission control: at most MAX_CONCURRENCY requests "on the model" at once;
+# anything that waits longer than QUEUE_BUDGET_MS for a slot is rejected with 429.
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "64"))
+QUEUE_BUDGET_MS = float(os.getenv("QUEUE_BUDGET_MS", "200"))
+
+admission = AdmissionController(MAX_CONCURRENCY, QUEUE_BUDGET_MS, SIMULATED_LATENCY_MS)
+
 
 class Features(BaseModel):
     features: List[float] = Field(..., min_length=1)
 
 
+class FeatureBatch(BaseModel):
+    rows: List[List[float]] = Field(..., min_length=1, max_length=MAX_BATCH_ROWS)
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
 
-@app.post("/predict")
-def predict(payload: Features):
+@app.get("/admission")
+def admission_stats():
+    return admission.stats()
+
+
+@app.post("/predict", openapi_extra=PREDICT_OPENAPI)
+async def predict(request: Request):
+    # JSON, raw float32 (application/octet-stream) or MessagePack
+    features = await read_features(request, Features)
     try:
         # Simulated "model": sum of features
-        prediction = float(sum(payload.features))
+        prediction = float(features.sum(dtype=np.float64))
     except Exception as exc:  # defensive
         raise HTTPException(status_code=400, detail=str(exc))
 
-    # Simulate fixed model latency (e.g., 50ms)
-    simulated_latency_ms = 50
-    time.sleep(simulated_latency_ms / 1000.0)
+    # Simulate fixed model latency (e.g., 50ms) without holding a worker thread
+    simulated_latency_ms = SIMULATED_LATENCY_MS
+    async with admission.slot():
+        await asyncio.sleep(simulated_latency_ms / 1000.0)
 
-    return {
+    result = {
         "prediction": prediction,
         "model_latency_ms": simulated_latency_ms,
-    }
\ No newline at end of file
+    }
+    return encode_response(result, response_format(request))
+
+
+@app.post("/predict/batch")
+async def predict_batch(payload: FeatureBatch):
+    try:
+        # One (rows x features) matrix, one vectorized pass for every row
+        matrix = np.asarray(payload.rows, dtype=np.float64)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"rows must all have the same length: {exc}")
+    if matrix.ndim != 2 or matrix.shape[1] == 0:
+        raise HTTPException(status_code=400, detail="rows must be non-empty feature vectors")
+
+    predictions = matrix.sum(axis=1)
+
+    # Fixed latency is charged once per batch, plus a per-row component
+    rows = matrix.shape[0]
+    simulated_latency_ms = SIMULATED_LATENCY_MS + PER_ROW_LATENCY_MS * rows
+    async with admission.slot():
+        await asyncio.sleep(simulated_latency_ms / 1000.0)
+
+    return {
+        "predictions": predictions.tolist(),
+        "rows": rows,
+        "model_latency_ms": round(simulated_latency_ms, 2),
+    }
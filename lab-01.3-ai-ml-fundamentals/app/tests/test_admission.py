@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from admission import AdmissionController
+
+
+async def hold_slot(controller: AdmissionController, seconds: float):
+    async with controller.slot():
+        await asyncio.sleep(seconds)
+
+
+def test_admits_within_concurrency():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=2, queue_budget_ms=50, expected_latency_ms=10)
+        await asyncio.gather(*(hold_slot(controller, 0.01) for _ in range(4)))
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["admitted"] == 4
+    assert stats["rejected"] == 0
+    assert stats["in_flight"] == 0
+
+
+def test_rejects_with_retry_after_when_queue_budget_exceeded():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, queue_budget_ms=10, expected_latency_ms=500)
+        holder = asyncio.create_task(hold_slot(controller, 0.2))
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as exc_info:
+            await hold_slot(controller, 0.0)
+        await holder
+        return controller.stats(), exc_info.value
+
+    stats, exc = asyncio.run(scenario())
+    assert exc.status_code == 429
+    assert int(exc.headers["Retry-After"]) >= 1
+    assert stats["rejected"] == 1
+    assert stats["admitted"] == 1
+
+
+def test_no_permit_leaks_when_timeouts_race_releases():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=2, queue_budget_ms=5, expected_latency_ms=5)
+
+        async def attempt():
+            try:
+                await hold_slot(controller, 0.005)
+            except HTTPException:
+                pass
+
+        # Queue budget equal to the hold time makes timeouts and releases collide
+        await asyncio.gather(*(attempt() for _ in range(200)))
+        after_storm = controller.stats()
+
+        # Every permit came back: a full wave is admitted at once, none waits out the budget
+        holders = [asyncio.create_task(hold_slot(controller, 0.05)) for _ in range(controller.max_concurrency)]
+        await asyncio.sleep(0.01)
+        full_wave = controller.stats()
+        await asyncio.gather(*holders)
+        return after_storm, full_wave
+
+    stats, full_wave = asyncio.run(scenario())
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+    assert stats["admitted"] + stats["rejected"] == 200
+    assert full_wave["in_flight"] == full_wave["max_concurrency"]
+    assert full_wave["rejected"] == stats["rejected"]
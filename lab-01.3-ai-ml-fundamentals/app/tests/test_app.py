@@ -1,3 +1,5 @@
+import msgpack
+import numpy as np
 from fastapi.testclient import TestClient
 from main import app
 
@@ -20,3 +22,88 @@ def test_predict_basic():
     assert data["prediction"] == 6.5
     assert "model_latency_ms" in data
     assert isinstance(data["model_latency_ms"], int)
+
+
+def test_predict_batch():
+    payload = {"rows": [[1.0, 2.0, 3.5], [0.5, 0.5, 0.5], [-1.0, 1.0, 0.0]]}
+    response = client.post("/predict/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["predictions"] == [6.5, 1.5, 0.0]
+    assert data["rows"] == 3
+    assert data["model_latency_ms"] > 50
+
+
+def test_predict_batch_rejects_ragged_rows():
+    payload = {"rows": [[1.0, 2.0], [3.0]]}
+    response = client.post("/predict/batch", json=payload)
+    assert response.status_code == 400
+
+
+def test_admission_stats():
+    response = client.get("/admission")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["in_flight"] == 0
+    assert data["rejected"] == 0
+
+
+def test_predict_octet_stream():
+    body = np.array([1.0, 2.0, 3.5], dtype="<f4").tobytes()
+    response = client.post(
+        "/predict", content=body, headers={"Content-Type": "application/octet-stream"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert np.frombuffer(response.content, dtype="<f8").tolist() == [6.5]
+
+
+def test_predict_msgpack():
+    body = msgpack.packb({"features": [1.0, 2.0, 3.5]})
+    response = client.post(
+        "/predict", content=body, headers={"Content-Type": "application/msgpack"}
+    )
+    assert response.status_code == 200
+    data = msgpack.unpackb(response.content)
+    assert data["prediction"] == 6.5
+    assert data["model_latency_ms"] == 50
+
+
+def test_predict_binary_request_json_response():
+    body = np.array([1.0, 2.0], dtype="<f4").tobytes()
+    response = client.post(
+        "/predict",
+        content=body,
+        headers={"Content-Type": "application/octet-stream", "Accept": "application/json"},
+    )
+    assert response.status_code == 200
+    assert response.json()["prediction"] == 3.0
+
+
+def test_predict_accept_q_values_pick_preferred_format():
+    body = np.array([1.0, 2.0], dtype="<f4").tobytes()
+    response = client.post(
+        "/predict",
+        content=body,
+        headers={
+            "Content-Type": "application/octet-stream",
+            "Accept": "application/msgpack;q=0.2, application/json",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["prediction"] == 3.0
+
+
+def test_predict_non_finite_binary_is_400():
+    body = np.array([1.0, np.nan], dtype="<f4").tobytes()
+    response = client.post(
+        "/predict",
+        content=body,
+        headers={"Content-Type": "application/octet-stream", "Accept": "application/json"},
+    )
+    assert response.status_code == 400
+
+
+def test_predict_unsupported_content_type():
+    response = client.post("/predict", content=b"1,2,3", headers={"Content-Type": "text/csv"})
+    assert response.status_code == 415
@@ -0,0 +1,49 @@
+import msgpack
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+
+from codec import decode_features, parse_accept
+from main import Features
+
+
+def test_octet_stream_is_zero_copy():
+    body = np.arange(8, dtype="<f4").tobytes()
+    features = decode_features(body, "application/octet-stream", Features)
+    assert features.dtype == np.dtype("<f4")
+    assert features.base is not None  # view over the request bytes, not a copy
+    assert features.tolist() == list(range(8))
+
+
+def test_octet_stream_rejects_partial_float():
+    with pytest.raises(HTTPException) as exc_info:
+        decode_features(b"\x00\x00\x80", "application/octet-stream", Features)
+    assert exc_info.value.status_code == 400
+
+
+def test_msgpack_bin_features():
+    packed = msgpack.packb({"features": np.array([1.5, 2.5], dtype="<f4").tobytes()})
+    features = decode_features(packed, "application/x-msgpack", Features)
+    assert features.tolist() == [1.5, 2.5]
+
+
+def test_json_keeps_pydantic_validation():
+    with pytest.raises(RequestValidationError):
+        decode_features(b'{"features": []}', "application/json; charset=utf-8", Features)
+
+
+@pytest.mark.parametrize("value", [np.nan, np.inf, -np.inf])
+def test_non_finite_features_rejected(value):
+    body = np.array([1.0, value], dtype="<f4").tobytes()
+    with pytest.raises(HTTPException) as exc_info:
+        decode_features(body, "application/octet-stream", Features)
+    assert exc_info.value.status_code == 400
+    with pytest.raises(HTTPException):
+        decode_features(msgpack.packb({"features": [1.0, float(value)]}), "application/msgpack", Features)
+
+
+def test_accept_q_values():
+    assert parse_accept("application/json;q=0.5, application/msgpack") == [
+        ("application/msgpack", 1.0), ("application/json", 0.5)]
+    assert parse_accept("application/msgpack;q=0, */*;q=0.1") == [("*/*", 0.1)]
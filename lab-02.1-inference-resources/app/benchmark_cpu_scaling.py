@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import json
+import subprocess
+from typing import List
+
+from load_generator import run_async
+
+DEPLOYMENT = "deployment/ai-lab-2-1-free"
+CONTAINER = "ai-lab-2-1-free"
+
+
+def kubectl(*args: str) -> None:
+    subprocess.run(["kubectl", *args], check=True, capture_output=True, text=True)
+
+
+def apply_cpu_limit(cpu: str, mode: str) -> None:
+    """Patch the lab deployment and wait for the new pod to roll out."""
+    kubectl("set", "env", DEPLOYMENT, f"EXECUTION_MODE={mode}")
+    kubectl("set", "resources", DEPLOYMENT, "-c", CONTAINER, f"--limits=cpu={cpu}")
+    kubectl("rollout", "status", DEPLOYMENT, "--timeout=180s")
+
+
+def run(url: str, cpu_limits: List[str], modes: List[str], requests: int, concurrency: int) -> list:
+    rows = []
+    for mode in modes:
+        for cpu in cpu_limits:
+            apply_cpu_limit(cpu, mode)
+            # Short warmup so the new pod's first requests don't skew results
+            asyncio.run(run_async(url, concurrency * 2, concurrency))
+            summary = asyncio.run(run_async(url, requests, concurrency))
+            row = {
+                "execution_mode": mode,
+                "cpu_limit": cpu,
+                "throughput_rps": summary["throughput_rps"],
+                "p50_latency_ms": summary["p50_latency_ms"],
+                "p99_latency_ms": summary["p99_latency_ms"],
+                "errors": summary["errors"],
+            }
+            print(json.dumps(row))
+            rows.append(row)
+    return rows
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Throughput vs CPU limit for thread and process execution modes"
+    )
+    parser.add_argument("--url", required=True,
+                        help="Port-forwarded /predict URL (e.g. http://localhost:8000/predict)")
+    parser.add_argument("--cpu-limits", nargs="+", default=["500m", "1", "2", "4"],
+                        help="limits.cpu values to test (default: 500m 1 2 4)")
+    parser.add_argument("--modes", nargs="+", choices=["thread", "process"],
+                        default=["thread", "process"], help="Execution modes to compare")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per step (default: 500)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Closed-loop workers (default: 16)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(args.url, args.cpu_limits, args.modes, args.requests, args.concurrency)
@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from load_generator import build_summary, collect_async
+
+
+class ProcSampler:
+    """
+    CPU seconds and RSS of one or more processes and all their descendants,
+    from /proc/<pid>/stat and status.
+
+    Descendants are found again on every sample, so process-pool workers
+    (EXECUTION_MODE=process) are counted even if they start or restart
+    mid-step. CPU time of children that already exited comes from their
+    parent's cutime/cstime.
+    """
+
+    def __init__(self, pids: List[int], proc_root: Path = Path("/proc")):
+        self.pids = pids
+        self.proc_root = proc_root
+        self.clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def _children(self, pid: int) -> List[int]:
+        children: List[int] = []
+        for task in (self.proc_root / str(pid) / "task").glob("*/children"):
+            try:
+                children.extend(int(child) for child in task.read_text().split())
+            except FileNotFoundError:
+                pass
+        return children
+
+    def processes(self) -> List[int]:
+        """The target pids and their descendants, each once."""
+        seen = set()
+        todo = list(self.pids)
+        while todo:
+            pid = todo.pop()
+            if pid not in seen:
+                seen.add(pid)
+                todo.extend(self._children(pid))
+        return sorted(seen)
+
+    def cpu_seconds(self) -> float:
+        total = 0.0
+        for pid in self.processes():
+            try:
+                stat = (self.proc_root / str(pid) / "stat").read_text()
+            except FileNotFoundError:
+                continue  # exited since it was listed; its parent's cutime has it
+            # Fields after the ")" that closes the command name; utime/stime/cutime/cstime are 14-17
+            fields = stat.rsplit(")", 1)[1].split()
+            total += sum(int(f) for f in fields[11:15]) / self.clock_ticks
+        return total
+
+    def rss_bytes(self) -> int:
+        total = 0
+        for pid in self.processes():
+            try:
+                status = (self.proc_root / str(pid) / "status").read_text()
+            except FileNotFoundError:
+                continue
+            for line in status.splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+        return total
+
+
+class CgroupSampler:
+    """CPU and memory of a whole container, from its cgroup v2 directory."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def cpu_seconds(self) -> float:
+        for line in (self.path / "cpu.stat").read_text().splitlines():
+            key, value = line.split()
+            if key == "usage_usec":
+                return int(value) / 1_000_000
+        raise ValueError(f"usage_usec missing from {self.path / 'cpu.stat'}")
+
+    def rss_bytes(self) -> int:
+        return int((self.path / "memory.current").read_text().strip())
+
+
+async def run_step(url: str, rps: float, duration: float, concurrency: int,
+                   sampler, sample_interval: float = 0.5) -> dict:
+    """Drive one open-loop step and measure CPU cores used and peak memory meanwhile."""
+    peak_rss = sampler.rss_bytes()
+    stop = asyncio.Event()
+
+    async def sample_memory() -> None:
+        nonlocal peak_rss
+        while not stop.is_set():
+            peak_rss = max(peak_rss, sampler.rss_bytes())
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=sample_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    num_requests = max(1, int(rps * duration))
+    cpu_before, t0 = sampler.cpu_seconds(), time.monotonic()
+    sampling = asyncio.create_task(sample_memory())
+    stats = await collect_async(url, num_requests, concurrency, rps)
+    stop.set()
+    await sampling
+    cpu_after, elapsed = sampler.cpu_seconds(), time.monotonic() - t0
+
+    summary = build_summary(stats, url, num_requests, concurrency, rps)
+    return {
+        "target_rps": rps,
+        "achieved_rps": summary["throughput_rps"],
+        "p99_latency_ms": summary["p99_latency_ms"],
+        "error_rate": round(summary["errors"] / num_requests, 4),
+        "cpu_cores": round((cpu_after - cpu_before) / elapsed, 4),
+        "peak_rss_mb": round(peak_rss / (1024 * 1024), 1),
+    }
+
+
+def step_ok(step: dict, slo_p99_ms: float, max_error_rate: float = 0.01) -> bool:
+    return (
+        step["achieved_rps"] >= 0.95 * step["target_rps"]
+        and step["p99_latency_ms"] <= slo_p99_ms
+        and step["error_rate"] <= max_error_rate
+    )
+
+
+def fit_cpu_cost(steps: List[dict]) -> Dict[str, float]:
+    """Least-squares fit of cpu_cores = idle_cores + cpu_per_request * rps."""
+    xs = [s["achieved_rps"] for s in steps]
+    ys = [s["cpu_cores"] for s in steps]
+    if len(steps) == 1 or len(set(xs)) == 1:
+        return {"idle_cores": 0.0, "cpu_seconds_per_request": ys[0] / xs[0] if xs[0] else 0.0}
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sum((x - mean_x) ** 2 for x in xs)
+    return {"idle_cores": max(0.0, mean_y - slope * mean_x), "cpu_seconds_per_request": max(0.0, slope)}
+
+
+def round_millicores(cores: float) -> str:
+    return f"{max(10, int(math.ceil(cores * 100)) * 10)}m"
+
+
+def round_mebibytes(mb: float) -> str:
+    return f"{max(16, int(math.ceil(mb / 16.0)) * 16)}Mi"
+
+
+def plan(steps: List[dict], target_rps: float, slo_p99_ms: float,
+         utilization: float = 0.7) -> dict:
+    """
+    Turn stepped load results into per-pod capacity, resources and replicas.
+
+    The saturation point is the highest step that still met the SLO; pods are
+    planned at `utilization` of it to leave headroom for spikes and rollouts.
+    """
+    good = [s for s in steps if step_ok(s, slo_p99_ms)]
+    if not good:
+        raise ValueError("no load step met the SLO; start with a lower --start-rps")
+    saturation = max(good, key=lambda s: s["achieved_rps"])
+    fit = fit_cpu_cost(good)
+
+    per_pod_rps = saturation["achieved_rps"] * utilization
+    replicas = max(1, math.ceil(target_rps / per_pod_rps))
+    planned_cores = fit["idle_cores"] + fit["cpu_seconds_per_request"] * (target_rps / replicas)
+    peak_rss_mb = max(s["peak_rss_mb"] for s in steps)
+
+    return {
+        "target_rps": target_rps,
+        "slo_p99_ms": slo_p99_ms,
+        "saturation_rps": saturation["achieved_rps"],
+        "saturation_cpu_cores": saturation["cpu_cores"],
+        "per_pod_rps": round(per_pod_rps, 2),
+        "idle_cores": round(fit["idle_cores"], 4),
+        "cpu_ms_per_request": round(fit["cpu_seconds_per_request"] * 1000, 3),
+        "replicas": replicas,
+        "resources": {
+            "requests": {"cpu": round_millicores(planned_cores), "memory": round_mebibytes(peak_rss_mb * 1.2)},
+            "limits": {
+                "cpu": round_millicores(max(planned_cores, saturation["cpu_cores"]) * 1.2),
+                "memory": round_mebibytes(peak_rss_mb * 1.5),
+            },
+        },
+    }
+
+
+def to_manifest_patch(result: dict, container: str) -> str:
+    """Strategic-merge patch for the deployment (kubectl patch --patch-file)."""
+    res = result["resources"]
+    return "\n".join([
+        f"# capacity plan: {result['target_rps']} rps, p99 <= {result['slo_p99_ms']} ms, "
+        f"{result['per_pod_rps']} rps/pod",
+        "spec:",
+        f"  replicas: {result['replicas']}",
+        "  template:",
+        "    spec:",
+        "      containers:",
+        f"        - name: {container}",
+        "          resources:",
+        "            requests:",
+        f"              cpu: \"{res['requests']['cpu']}\"",
+        f"              memory: \"{res['requests']['memory']}\"",
+        "            limits:",
+        f"              cpu: \"{res['limits']['cpu']}\"",
+        f"              memory: \"{res['limits']['memory']}\"",
+        "",
+    ])
+
+
+async def run_steps(url: str, sampler, start_rps: float, step_rps: float, max_rps: float,
+                    duration: float, concurrency: int, slo_p99_ms: float) -> List[dict]:
+    steps = []
+    rps = start_rps
+    while rps <= max_rps:
+        step = await run_step(url, rps, duration, concurrency, sampler)
+        print(json.dumps(step))
+        steps.append(step)
+        if not step_ok(step, slo_p99_ms):
+            break  # past saturation, no need to push further
+        rps += step_rps
+    return steps
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Stepped load test -> k8s resources and replica count for a target RPS and p99 SLO"
+    )
+    parser.add_argument("--url", required=True, help="Target /predict URL")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--pid", type=int, nargs="+", help="Target process id(s), with their descendants, read from /proc")
+    source.add_argument("--cgroup", type=Path, help="Target container cgroup v2 directory")
+    parser.add_argument("--target-rps", type=float, required=True, help="Total RPS to plan for")
+    parser.add_argument("--slo-p99-ms", type=float, default=200.0, help="p99 latency SLO (default: 200)")
+    parser.add_argument("--start-rps", type=float, default=5.0, help="First step (default: 5)")
+    parser.add_argument("--step-rps", type=float, default=5.0, help="Increase per step (default: 5)")
+    parser.add_argument("--max-rps", type=float, default=200.0, help="Last step (default: 200)")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per step (default: 15)")
+    parser.add_argument("--concurrency", type=int, default=100, help="Max pooled connections (default: 100)")
+    parser.add_argument("--utilization", type=float, default=0.7,
+                        help="Fraction of saturation RPS to plan each pod for (default: 0.7)")
+    parser.add_argument("--container", default="ai-lab-2-1-free", help="Container name in the patch")
+    parser.add_argument("--patch-file", type=Path, help="Also write the deployment patch here")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    sampler = ProcSampler(args.pid) if args.pid else CgroupSampler(args.cgroup)
+    steps = asyncio.run(run_steps(args.url, sampler, args.start_rps, args.step_rps, args.max_rps,
+                                  args.duration, args.concurrency, args.slo_p99_ms))
+    result = plan(steps, args.target_rps, args.slo_p99_ms, args.utilization)
+    print(json.dumps(result))
+    patch = to_manifest_patch(result, args.container)
+    print(patch)
+    if args.patch_file:
+        args.patch_file.write_text(patch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import asyncio
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+
+
+def cpu_quota(path: Path = CGROUP_CPU_MAX) -> Optional[float]:
+    """
+    CPUs granted by the cgroup v2 `cpu.max` file ("<quota> <period>").
+
+    Returns None when there is no limit ("max") or the file is missing.
+    This is what a Kubernetes `limits.cpu` turns into inside the container;
+    os.cpu_count() reports the node's cores instead.
+    """
+    try:
+        quota, period = path.read_text().split()[:2]
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    return int(quota) / int(period)
+
+
+def default_pool_size(path: Path = CGROUP_CPU_MAX) -> int:
+    quota = cpu_quota(path)
+    if quota is not None:
+        return max(1, math.ceil(quota))
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class InferenceExecutor:
+    """
+    Runs CPU-bound inference either on the FastAPI threadpool ("thread",
+    one core at most because of the GIL) or on a persistent process pool
+    sized to the container CPU quota ("process").
+    """
+
+    def __init__(self, mode: str = "thread", workers: Optional[int] = None):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"unknown execution mode: {mode}")
+        self.mode = mode
+        self.workers = workers or default_pool_size()
+        self.in_flight = 0
+        self.completed = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        if self.mode != "process" or self._pool is not None:
+            return
+        # spawn: never fork a process that already runs an event loop and threads
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        # Start every worker now so the first requests don't pay process startup
+        for future in [self._pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self.in_flight += 1
+        try:
+            if self.mode == "process":
+                if self._pool is None:
+                    self.start()
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pool, fn, *args)
+            return await run_in_threadpool(fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers if self.mode == "process" else None,
+            "cpu_quota": cpu_quota(),
+            "in_flight": self.in_flight,
+            # Work waiting for a free worker process
+            "queue_depth": max(0, self.in_flight - self.workers) if self.mode == "process" else None,
+            "completed": self.completed,
+        }
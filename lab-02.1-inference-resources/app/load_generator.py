@@ -1,11 +1,19 @@
 import argparse
+import asyncio
 import json
+import math
 import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from statistics import mean
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
+import httpx
 import requests
 
+PAYLOAD = {"features": [1.0, 2.0, 3.0]}
+
 
 def send_requests(url: str, num_requests: int) -> None:
     latencies: List[float] = []
@@ -41,14 +49,313 @@ def send_requests(url: str, num_requests: int) -> None:
     print(json.dumps(summary))
 
 
-def parse_args() -> argparse.Namespace:
+class LatencyHistogram:
+    """
+    Log-linear latency histogram (HDR-style) with fixed bucket boundaries.
+
+    Every process uses the same boundaries, so merging is just adding bucket
+    counts: nothing is lost compared with recording everything in one process.
+    Values are stored in microseconds with under 0.4% relative error; count,
+    sum, min and max are kept exactly.
+    """
+
+    SUB_BUCKET_BITS = 8
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+    @classmethod
+    def bucket_index(cls, value_us: int) -> int:
+        if value_us < cls.SUB_BUCKETS:
+            return value_us
+        shift = value_us.bit_length() - cls.SUB_BUCKET_BITS
+        half = cls.SUB_BUCKETS // 2
+        return cls.SUB_BUCKETS + (shift - 1) * half + ((value_us >> shift) - half)
+
+    @classmethod
+    def bucket_midpoint_us(cls, index: int) -> float:
+        if index < cls.SUB_BUCKETS:
+            return float(index)
+        half = cls.SUB_BUCKETS // 2
+        shift = (index - cls.SUB_BUCKETS) // half + 1
+        mantissa = (index - cls.SUB_BUCKETS) % half + half
+        return ((mantissa << shift) + ((mantissa + 1) << shift) - 1) / 2.0
+
+    def record(self, latency_ms: float) -> None:
+        self.counts[self.bucket_index(int(latency_ms * 1000.0))] += 1
+        self.count += 1
+        self.sum_ms += latency_ms
+        self.min_ms = min(self.min_ms, latency_ms)
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, pct: float) -> float:
+        """Nearest-rank percentile, clamped to the exact min/max."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100.0 * self.count))
+        if rank >= self.count:
+            return self.max_ms
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                value_ms = self.bucket_midpoint_us(index) / 1000.0
+                return min(max(value_ms, self.min_ms), self.max_ms)
+        return self.max_ms
+
+    def mean(self) -> float:
+        return self.sum_ms / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "counts": {str(k): v for k, v in self.counts.items()},
+            "count": self.count,
+            "sum_ms": self.sum_ms,
+            "min_ms": self.min_ms if self.count else None,
+            "max_ms": self.max_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        hist = cls()
+        hist.counts = Counter({int(k): v for k, v in data["counts"].items()})
+        hist.count = data["count"]
+        hist.sum_ms = data["sum_ms"]
+        hist.min_ms = data["min_ms"] if data["min_ms"] is not None else math.inf
+        hist.max_ms = data["max_ms"]
+        return hist
+
+
+class LoadStats:
+    """
+    Latency histogram, errors by type and a per-second completion time series.
+
+    The timeline is keyed by whole seconds since `start_at` (epoch time), so
+    workers started with the same `start_at` line up when merged.
+    """
+
+    def __init__(self, start_at: Optional[float] = None) -> None:
+        self.histogram = LatencyHistogram()
+        self.errors: Counter = Counter()
+        self.timeline: Dict[int, Dict[str, int]] = {}
+        self.start_at = start_at if start_at is not None else time.time()
+        self.end_at = self.start_at
+
+    def record(self, latency_ms: float, error: Optional[str] = None) -> None:
+        now = time.time()
+        self.end_at = max(self.end_at, now)
+        second = max(0, int(now - self.start_at))
+        bucket = self.timeline.setdefault(second, {"ok": 0, "errors": 0})
+        if error is None:
+            self.histogram.record(latency_ms)
+            bucket["ok"] += 1
+        else:
+            self.errors[error] += 1
+            bucket["errors"] += 1
+
+    def finish(self) -> None:
+        self.end_at = max(self.end_at, time.time())
+
+    def merge(self, other: "LoadStats") -> None:
+        self.histogram.merge(other.histogram)
+        self.errors.update(other.errors)
+        # Re-key the other timeline onto this one's start time
+        offset = int(round(other.start_at - self.start_at))
+        for second, bucket in other.timeline.items():
+            mine = self.timeline.setdefault(max(0, second + offset), {"ok": 0, "errors": 0})
+            mine["ok"] += bucket["ok"]
+            mine["errors"] += bucket["errors"]
+        self.end_at = max(self.end_at, other.end_at)
+
+    def to_dict(self) -> dict:
+        return {
+            "histogram": self.histogram.to_dict(),
+            "errors": dict(self.errors),
+            "timeline": {str(k): v for k, v in self.timeline.items()},
+            "start_at": self.start_at,
+            "end_at": self.end_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LoadStats":
+        stats = cls(start_at=data["start_at"])
+        stats.histogram = LatencyHistogram.from_dict(data["histogram"])
+        stats.errors = Counter(data["errors"])
+        stats.timeline = {int(k): dict(v) for k, v in data["timeline"].items()}
+        stats.end_at = data["end_at"]
+        return stats
+
+    def summary(self, url: str, mode: str, num_requests: int) -> dict:
+        total_time = self.end_at - self.start_at
+        hist = self.histogram
+        last_second = max(self.timeline) if self.timeline else -1
+        return {
+            "url": url,
+            "mode": mode,
+            "requests": num_requests,
+            "total_time_sec": round(total_time, 3),
+            "throughput_rps": round(hist.count / total_time, 2) if total_time > 0 else 0.0,
+            "avg_latency_ms": round(hist.mean(), 2),
+            "p50_latency_ms": round(hist.percentile(50), 2),
+            "p95_latency_ms": round(hist.percentile(95), 2),
+            "p99_latency_ms": round(hist.percentile(99), 2),
+            "max_latency_ms": round(hist.max_ms, 2),
+            "errors": sum(self.errors.values()),
+            "errors_by_type": dict(self.errors),
+            "timeline": [
+                {"second": s, **self.timeline.get(s, {"ok": 0, "errors": 0})}
+                for s in range(last_second + 1)
+            ],
+        }
+
+
+async def _timed_post(client: httpx.AsyncClient, url: str, stats: LoadStats, t0: float) -> None:
+    # t0 is passed in so open-loop latency includes time spent waiting to be
+    # sent (avoids coordinated omission when the pool is saturated).
+    try:
+        resp = await client.post(url, json=PAYLOAD)
+        latency_ms = (time.perf_counter() - t0) * 1000.0
+        error = None if resp.status_code == 200 else f"http_{resp.status_code}"
+        stats.record(latency_ms, error)
+    except httpx.HTTPError as exc:
+        stats.record((time.perf_counter() - t0) * 1000.0, type(exc).__name__)
+
+
+async def closed_loop(client: httpx.AsyncClient, url: str, num_requests: int,
+                      concurrency: int, stats: LoadStats) -> None:
+    """N workers, each sending its next request as soon as the previous one returns."""
+    remaining = iter(range(num_requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            await _timed_post(client, url, stats, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def open_loop(client: httpx.AsyncClient, url: str, num_requests: int,
+                    rps: float, stats: LoadStats) -> None:
+    """Fixed arrival rate, independent of how fast the server answers."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = []
+    for i in range(num_requests):
+        delay = start + i / rps - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_timed_post(client, url, stats, time.perf_counter())))
+    await asyncio.gather(*tasks)
+
+
+async def collect_async(url: str, num_requests: int, concurrency: int = 10,
+                        rps: Optional[float] = None, timeout: float = 5.0,
+                        transport: Optional[httpx.AsyncBaseTransport] = None,
+                        start_at: Optional[float] = None) -> LoadStats:
+    """Run an open-loop (rps set) or closed-loop load test and return the raw stats."""
+    if start_at is not None and start_at > time.time():
+        await asyncio.sleep(start_at - time.time())
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    stats = LoadStats(start_at=start_at)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout, transport=transport) as client:
+        if rps:
+            await open_loop(client, url, num_requests, rps, stats)
+        else:
+            await closed_loop(client, url, num_requests, concurrency, stats)
+    stats.finish()
+    return stats
+
+
+def build_summary(stats: LoadStats, url: str, num_requests: int, concurrency: int,
+                  rps: Optional[float] = None) -> dict:
+    summary = stats.summary(url, "open" if rps else "closed", num_requests)
+    summary["concurrency"] = concurrency
+    if rps:
+        summary["target_rps"] = rps
+    return summary
+
+
+async def run_async(url: str, num_requests: int, concurrency: int = 10,
+                    rps: Optional[float] = None, timeout: float = 5.0,
+                    transport: Optional[httpx.AsyncBaseTransport] = None) -> dict:
+    """Run an open-loop (rps set) or closed-loop load test over pooled keep-alive connections."""
+    stats = await collect_async(url, num_requests, concurrency, rps, timeout, transport)
+    return build_summary(stats, url, num_requests, concurrency, rps)
+
+
+def _process_worker(args: Tuple[str, int, int, Optional[float], float]) -> dict:
+    url, num_requests, concurrency, rps, start_at = args
+    stats = asyncio.run(collect_async(url, num_requests, concurrency, rps, start_at=start_at))
+    return stats.to_dict()
+
+
+def split_load(num_requests: int, rps: Optional[float], processes: int) -> List[Tuple[int, Optional[float]]]:
+    """Share requests (and the target rate) across processes as evenly as possible."""
+    shares = []
+    for i in range(processes):
+        count = num_requests // processes + (1 if i < num_requests % processes else 0)
+        shares.append((count, rps * count / num_requests if rps and num_requests else rps))
+    return [share for share in shares if share[0] > 0]
+
+
+def merge_stats(parts: List[dict]) -> LoadStats:
+    ordered = sorted(parts, key=lambda part: part["start_at"])
+    merged = LoadStats.from_dict(ordered[0])
+    for part in ordered[1:]:
+        merged.merge(LoadStats.from_dict(part))
+    return merged
+
+
+def run_distributed(url: str, num_requests: int, processes: int, concurrency: int = 10,
+                    rps: Optional[float] = None) -> dict:
+    """
+    Fan the load out over N worker processes (one event loop each, so the
+    generator is no longer capped at one core) and merge their histograms.
+    `concurrency` applies per process.
+    """
+    start_at = time.time() + 1.0  # give every process time to start
+    jobs = [(url, count, concurrency, share_rps, start_at)
+            for count, share_rps in split_load(num_requests, rps, processes)]
+    with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        parts = list(pool.map(_process_worker, jobs))
+    return build_summary(merge_stats(parts), url, num_requests, concurrency, rps)
+
+
+def merge_stats_files(paths: List[str]) -> dict:
+    """
+    Coordinator side of a multi-host run: every host ran with the same
+    --start-at and wrote --emit-stats; this merges them into one report.
+    """
+    runs = [json.loads(Path(path).read_text()) for path in paths]
+    merged = merge_stats([run["stats"] for run in runs])
+    rates = [run["target_rps"] for run in runs if run.get("target_rps")]
+    return build_summary(
+        merged,
+        runs[0]["url"],
+        sum(run["requests"] for run in runs),
+        runs[0]["concurrency"],
+        sum(rates) if rates else None,
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Simple load generator for Lab 2.1 FREE API"
     )
     parser.add_argument(
         "--url",
         type=str,
-        required=True,
         help="Target /predict URL (e.g. http://localhost:8001/predict)",
     )
     parser.add_argument(
@@ -57,12 +364,86 @@ def parse_args() -> argparse.Namespace:
         default=20,
         help="Number of requests to send (default: 20)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--mode",
+        choices=["sequential", "closed", "open"],
+        default="sequential",
+        help="sequential (default), closed (N concurrent workers) or open (fixed RPS)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help="Workers in closed mode / max pooled connections (default: 10)",
+    )
+    parser.add_argument(
+        "--rps",
+        type=float,
+        default=50.0,
+        help="Target request rate in open mode (default: 50)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Worker processes for closed/open mode; histograms are merged (default: 1)",
+    )
+    parser.add_argument(
+        "--start-at",
+        type=float,
+        default=None,
+        help="Epoch time to start sending; use the same value on every host",
+    )
+    parser.add_argument(
+        "--emit-stats",
+        type=str,
+        default=None,
+        help="Write raw mergeable stats to this file instead of a summary",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        default=None,
+        help="Merge --emit-stats files from several hosts into one summary",
+    )
+    args = parser.parse_args(argv)
+    if not args.merge and not args.url:
+        parser.error("--url is required unless --merge is given")
+    # Reject combinations main() would otherwise ignore silently
+    if args.mode == "sequential":
+        for flag, given in (("--processes", args.processes != 1), ("--emit-stats", args.emit_stats),
+                            ("--start-at", args.start_at is not None)):
+            if given:
+                parser.error(f"{flag} needs --mode closed or open")
+    if args.emit_stats and args.processes != 1:
+        parser.error("--emit-stats writes one process's stats; run one process per host instead of --processes")
+    if args.start_at is not None and not args.emit_stats:
+        parser.error("--start-at only applies with --emit-stats")
+    return args
 
 
 def main() -> None:
     args = parse_args()
-    send_requests(args.url, args.requests)
+    if args.merge:
+        print(json.dumps(merge_stats_files(args.merge)))
+        return
+    if args.mode == "sequential":
+        send_requests(args.url, args.requests)
+        return
+
+    rps = args.rps if args.mode == "open" else None
+    if args.emit_stats:
+        stats = asyncio.run(collect_async(args.url, args.requests, args.concurrency, rps,
+                                          start_at=args.start_at))
+        run = {"url": args.url, "requests": args.requests, "concurrency": args.concurrency,
+               "target_rps": rps, "stats": stats.to_dict()}
+        Path(args.emit_stats).write_text(json.dumps(run))
+        return
+    if args.processes > 1:
+        summary = run_distributed(args.url, args.requests, args.processes, args.concurrency, rps)
+    else:
+        summary = asyncio.run(run_async(args.url, args.requests, args.concurrency, rps))
+    print(json.dumps(summary))
 
 
 if __name__ == "__main__":
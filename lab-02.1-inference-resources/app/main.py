@@ -1,10 +1,39 @@
+import os
 import time
+from contextlib import asynccontextmanager
 from typing import List
 
-from fastapi import FastAPI, HTTPException
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel, Field
 
-app = FastAPI(title="Lab 2.1 - Resource-Aware Inference API")
+from codec import PREDICT_OPENAPI, encode_response, read_features, response_format
+from executor import InferenceExecutor
+from limiter import AdaptiveLimiter
+
+# "thread": cpu_burn on the FastAPI threadpool (GIL-bound, one core at most)
+# "process": persistent process pool sized to the cgroup v2 CPU quota
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "thread")
+POOL_WORKERS = int(os.getenv("POOL_WORKERS", "0")) or None
+
+executor = InferenceExecutor(EXECUTION_MODE, POOL_WORKERS)
+
+# Adaptive concurrency limit in front of inference; excess load gets a fast 503
+limiter = AdaptiveLimiter(
+    initial_limit=int(os.getenv("LIMIT_INITIAL", "20")),
+    max_limit=int(os.getenv("LIMIT_MAX", "200")),
+    latency_target_ms=float(os.getenv("LATENCY_TARGET_MS", "0")) or None,
+)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    executor.start()
+    yield
+    executor.shutdown()
+
+
+app = FastAPI(title="Lab 2.1 - Resource-Aware Inference API", lifespan=lifespan)
 
 
 class Features(BaseModel):
@@ -28,20 +57,36 @@ def health():
         "status": "ok",
         "mode": "free",
         "cpu_burn_ms": CPU_BURN_MS,
+        "execution_mode": executor.mode,
     }
 
 
-@app.post("/predict")
-def predict(payload: Features):
+@app.get("/executor")
+def executor_stats():
+    return executor.stats()
+
+
+@app.get("/limiter")
+def limiter_stats():
+    return limiter.stats()
+
+
+@app.post("/predict", openapi_extra=PREDICT_OPENAPI)
+async def predict(request: Request):
+    # JSON, raw float32 (application/octet-stream) or MessagePack
+    features = await read_features(request, Features)
     try:
-        prediction = float(sum(payload.features))
+        prediction = float(features.sum(dtype=np.float64))
     except Exception as exc:  # pragma: no cover
         raise HTTPException(status_code=400, detail=str(exc))
 
-    cpu_burn(CPU_BURN_MS)
+    # Keep the CPU burn off the event loop: threadpool or process pool
+    async with limiter.slot():
+        await executor.run(cpu_burn, CPU_BURN_MS)
 
-    return {
+    result = {
         "prediction": prediction,
         "cpu_burn_ms": CPU_BURN_MS,
     }
+    return encode_response(result, response_format(request))
 
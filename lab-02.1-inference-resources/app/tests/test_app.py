@@ -1,3 +1,5 @@
+import msgpack
+import numpy as np
 from fastapi.testclient import TestClient
 from main import app, CPU_BURN_MS
 
@@ -20,3 +22,21 @@ def test_predict():
     data = resp.json()
     assert data["prediction"] == 6.0
     assert data["cpu_burn_ms"] == CPU_BURN_MS
+
+
+def test_predict_octet_stream():
+    body = np.array([1.0, 2.0, 3.0], dtype="<f4").tobytes()
+    resp = client.post(
+        "/predict", content=body, headers={"Content-Type": "application/octet-stream"}
+    )
+    assert resp.status_code == 200
+    assert np.frombuffer(resp.content, dtype="<f8").tolist() == [6.0]
+
+
+def test_predict_msgpack():
+    body = msgpack.packb({"features": [1.0, 2.0, 3.0]})
+    resp = client.post("/predict", content=body, headers={"Content-Type": "application/msgpack"})
+    assert resp.status_code == 200
+    data = msgpack.unpackb(resp.content)
+    assert data["prediction"] == 6.0
+    assert data["cpu_burn_ms"] == CPU_BURN_MS
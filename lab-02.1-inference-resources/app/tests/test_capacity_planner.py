@@ -0,0 +1,89 @@
+import pytest
+
+from capacity_planner import CgroupSampler, ProcSampler, fit_cpu_cost, plan, to_manifest_patch
+
+
+def _step(rps, achieved, p99, cpu, rss=80.0, errors=0.0):
+    return {"target_rps": rps, "achieved_rps": achieved, "p99_latency_ms": p99,
+            "error_rate": errors, "cpu_cores": cpu, "peak_rss_mb": rss}
+
+
+def test_proc_sampler_reads_stat_and_status(tmp_path):
+    proc = tmp_path / "42"
+    proc.mkdir()
+    # Command names may contain spaces and parentheses
+    fields = ["S"] + ["0"] * 10 + ["250", "50"] + ["0"] * 30
+    (proc / "stat").write_text("42 (uvicorn (w 1)) " + " ".join(fields) + "\n")
+    (proc / "status").write_text("Name:\tuvicorn\nVmRSS:\t  2048 kB\n")
+    sampler = ProcSampler([42], proc_root=tmp_path)
+    sampler.clock_ticks = 100
+    assert sampler.cpu_seconds() == 3.0
+    assert sampler.rss_bytes() == 2048 * 1024
+
+
+def test_proc_sampler_includes_pool_workers(tmp_path):
+    def process(pid, utime, cutime=0, rss_kb=1024, children=""):
+        proc = tmp_path / str(pid)
+        (proc / "task" / str(pid)).mkdir(parents=True)
+        fields = ["S"] + ["0"] * 10 + [str(utime), "0", str(cutime), "0"] + ["0"] * 28
+        (proc / "stat").write_text(f"{pid} (python) " + " ".join(fields) + "\n")
+        (proc / "status").write_text(f"VmRSS:\t{rss_kb} kB\n")
+        (proc / "task" / str(pid) / "children").write_text(children)
+
+    # uvicorn -> two pool workers, one of which forked a helper; a reaped worker left 50 ticks
+    process(42, 100, cutime=50, children="43 44 ")
+    process(43, 200, children="45 ")
+    process(44, 300)
+    process(45, 400)
+    process(99, 1000)  # unrelated
+    sampler = ProcSampler([42], proc_root=tmp_path)
+    sampler.clock_ticks = 100
+    assert sampler.processes() == [42, 43, 44, 45]
+    assert sampler.cpu_seconds() == 10.5
+    assert sampler.rss_bytes() == 4 * 1024 * 1024
+
+    # Listing a worker as well does not count it twice
+    assert ProcSampler([42, 44], proc_root=tmp_path).processes() == [42, 43, 44, 45]
+
+
+def test_cgroup_sampler(tmp_path):
+    (tmp_path / "cpu.stat").write_text("usage_usec 1500000\nuser_usec 1000000\n")
+    (tmp_path / "memory.current").write_text("104857600\n")
+    sampler = CgroupSampler(tmp_path)
+    assert sampler.cpu_seconds() == 1.5
+    assert sampler.rss_bytes() == 104857600
+
+
+def test_fit_recovers_cost_per_request():
+    # 0.05 idle cores + 30 ms of CPU per request
+    steps = [_step(r, r, 50, 0.05 + 0.03 * r) for r in (5, 10, 15, 20)]
+    fit = fit_cpu_cost(steps)
+    assert fit["idle_cores"] == pytest.approx(0.05)
+    assert fit["cpu_seconds_per_request"] == pytest.approx(0.03)
+
+
+def test_plan_stops_at_slo_and_sizes_replicas():
+    steps = [
+        _step(10, 10, 40, 0.35),
+        _step(20, 20, 60, 0.65),
+        _step(30, 30, 90, 0.95, rss=100.0),
+        _step(40, 33, 900, 1.0),  # saturated: throughput flat, p99 blown
+    ]
+    result = plan(steps, target_rps=100, slo_p99_ms=200, utilization=0.7)
+    assert result["saturation_rps"] == 30
+    assert result["per_pod_rps"] == 21
+    assert result["replicas"] == 5
+    assert result["cpu_ms_per_request"] == pytest.approx(30.0)
+    # 0.05 + 0.03 * 20 rps per pod = 0.65 cores
+    assert result["resources"]["requests"]["cpu"] == "650m"
+    assert result["resources"]["requests"]["memory"] == "128Mi"
+    assert result["resources"]["limits"]["memory"] == "160Mi"
+
+    patch = to_manifest_patch(result, "ai-lab-2-1-free")
+    assert "  replicas: 5" in patch
+    assert 'cpu: "650m"' in patch
+
+
+def test_plan_without_any_good_step():
+    with pytest.raises(ValueError):
+        plan([_step(10, 5, 900, 1.0)], target_rps=100, slo_p99_ms=200)
@@ -0,0 +1,46 @@
+import asyncio
+
+from executor import InferenceExecutor, cpu_quota, default_pool_size
+
+
+def test_cpu_quota_from_cgroup_v2(tmp_path):
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("150000 100000\n")
+    assert cpu_quota(cpu_max) == 1.5
+    assert default_pool_size(cpu_max) == 2
+
+    cpu_max.write_text("30000 100000\n")
+    assert default_pool_size(cpu_max) == 1
+
+
+def test_cpu_quota_unlimited_or_missing(tmp_path):
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("max 100000\n")
+    assert cpu_quota(cpu_max) is None
+    assert cpu_quota(tmp_path / "missing") is None
+    assert default_pool_size(cpu_max) >= 1
+
+
+def test_thread_mode_runs_and_counts():
+    executor = InferenceExecutor("thread")
+    assert asyncio.run(executor.run(pow, 2, 10)) == 1024
+    stats = executor.stats()
+    assert stats["mode"] == "thread"
+    assert stats["completed"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_process_mode_runs_in_pool():
+    executor = InferenceExecutor("process", workers=2)
+    executor.start()
+    try:
+        async def run_many():
+            return await asyncio.gather(*(executor.run(pow, 3, n) for n in range(4)))
+
+        assert asyncio.run(run_many()) == [1, 3, 9, 27]
+        stats = executor.stats()
+        assert stats["workers"] == 2
+        assert stats["queue_depth"] == 0
+        assert stats["completed"] == 4
+    finally:
+        executor.shutdown()
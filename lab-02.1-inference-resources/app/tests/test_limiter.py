@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from limiter import AdaptiveLimiter
+
+
+def test_sheds_when_limit_reached():
+    limiter = AdaptiveLimiter(initial_limit=2)
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    stats = limiter.stats()
+    assert stats["in_flight"] == 2
+    assert stats["shed"] == 1
+
+
+def test_slow_requests_shrink_limit():
+    limiter = AdaptiveLimiter(initial_limit=20, latency_target_ms=50)
+    limiter.try_acquire()
+    limiter.release(200.0)
+    assert limiter.stats()["limit"] == 18
+
+
+def test_fast_busy_requests_grow_limit():
+    limiter = AdaptiveLimiter(initial_limit=4, latency_target_ms=50)
+    for _ in range(50):
+        for _ in range(4):
+            limiter.try_acquire()
+        for _ in range(4):
+            limiter.release(10.0)
+    assert limiter.stats()["limit"] > 4
+
+
+def test_baseline_threshold_without_target():
+    limiter = AdaptiveLimiter(initial_limit=10, tolerance=2.0)
+    limiter.try_acquire()
+    limiter.release(30.0)
+    stats = limiter.stats()
+    assert stats["baseline_latency_ms"] == 30.0
+    assert stats["latency_threshold_ms"] == 60.0
+
+
+def test_slot_raises_503_when_full():
+    async def scenario():
+        limiter = AdaptiveLimiter(initial_limit=1)
+        async with limiter.slot():
+            with pytest.raises(HTTPException) as exc_info:
+                async with limiter.slot():
+                    pass
+        return limiter.stats(), exc_info.value
+
+    stats, exc = asyncio.run(scenario())
+    assert exc.status_code == 503
+    assert exc.headers["Retry-After"] == "1"
+    assert stats["in_flight"] == 0
+    assert stats["shed"] == 1
+
+
+def test_client_errors_do_not_shrink_limit():
+    async def scenario():
+        limiter = AdaptiveLimiter(initial_limit=10, latency_target_ms=50)
+        for status in (400, 500):
+            with pytest.raises(HTTPException):
+                async with limiter.slot():
+                    raise HTTPException(status_code=status)
+        return limiter.stats()
+
+    # Only the 500 backs off: 10 * 0.9
+    assert asyncio.run(scenario())["limit"] == 9
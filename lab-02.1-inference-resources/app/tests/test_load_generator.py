@@ -1,5 +1,10 @@
+import asyncio
+import math
 from types import SimpleNamespace
 
+import httpx
+import pytest
+
 import load_generator
 
 
@@ -18,3 +23,112 @@ def test_send_requests_monkeypatch(monkeypatch):
     monkeypatch.setattr(load_generator, "requests", SimpleNamespace(post=dummy_post))
     load_generator.send_requests("http://test/predict", 5)
     # No assertion needed; the function should run without raising exceptions.
+
+
+def exact_percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list: the reference for the histogram."""
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _mock_transport(statuses):
+    codes = iter(statuses)
+
+    def handler(request):
+        return httpx.Response(next(codes), json={"prediction": 6.0})
+
+    return httpx.MockTransport(handler)
+
+
+def test_run_async_closed_loop_reports_percentiles_and_errors():
+    transport = _mock_transport([200] * 8 + [503, 503])
+    summary = asyncio.run(
+        load_generator.run_async("http://test/predict", 10, concurrency=3, transport=transport)
+    )
+    assert summary["mode"] == "closed"
+    assert summary["errors"] == 2
+    assert summary["errors_by_type"] == {"http_503": 2}
+    assert summary["p50_latency_ms"] <= summary["p99_latency_ms"] <= summary["max_latency_ms"]
+    assert sum(b["ok"] + b["errors"] for b in summary["timeline"]) == 10
+
+
+def test_run_async_open_loop():
+    transport = _mock_transport([200] * 5)
+    summary = asyncio.run(
+        load_generator.run_async("http://test/predict", 5, rps=500, transport=transport)
+    )
+    assert summary["mode"] == "open"
+    assert summary["target_rps"] == 500
+    assert summary["errors"] == 0
+
+
+def test_histogram_percentiles_close_to_exact():
+    values = [0.5 + i * 0.37 for i in range(5000)]
+    hist = load_generator.LatencyHistogram()
+    for v in values:
+        hist.record(v)
+    ordered = sorted(values)
+    for pct in (50, 95, 99):
+        exact = exact_percentile(ordered, pct)
+        assert abs(hist.percentile(pct) - exact) / exact < 0.005
+    assert hist.max_ms == max(values)
+    assert hist.percentile(100) == max(values)
+
+
+def test_histogram_merge_is_lossless():
+    values = [1.0 + (i * 7919 % 1000) / 10.0 for i in range(3000)]
+    whole = load_generator.LatencyHistogram()
+    parts = [load_generator.LatencyHistogram() for _ in range(3)]
+    for i, v in enumerate(values):
+        whole.record(v)
+        parts[i % 3].record(v)
+
+    merged = load_generator.LatencyHistogram.from_dict(parts[0].to_dict())
+    for part in parts[1:]:
+        merged.merge(load_generator.LatencyHistogram.from_dict(part.to_dict()))
+
+    assert merged.counts == whole.counts
+    assert merged.count == whole.count
+    assert merged.max_ms == whole.max_ms
+    for pct in (50, 95, 99):
+        assert merged.percentile(pct) == whole.percentile(pct)
+
+
+def test_merged_summary_matches_single_process_format():
+    async def collect(statuses):
+        return await load_generator.collect_async(
+            "http://test/predict", len(statuses), concurrency=2, transport=_mock_transport(statuses)
+        )
+
+    first = asyncio.run(collect([200, 200, 503]))
+    second = asyncio.run(collect([200, 200]))
+    merged = load_generator.merge_stats([first.to_dict(), second.to_dict()])
+    summary = load_generator.build_summary(merged, "http://test/predict", 5, 2)
+
+    single = asyncio.run(
+        load_generator.run_async("http://test/predict", 5, concurrency=2,
+                                 transport=_mock_transport([200] * 5))
+    )
+    assert summary.keys() == single.keys()
+    assert summary["errors_by_type"] == {"http_503": 1}
+    assert sum(b["ok"] for b in summary["timeline"]) == 4
+
+
+def test_split_load_shares_requests_and_rate():
+    shares = load_generator.split_load(10, 100.0, 3)
+    assert [count for count, _ in shares] == [4, 3, 3]
+    assert sum(rate for _, rate in shares) == 100.0
+
+
+def test_parse_args_rejects_ignored_flag_combinations():
+    url = ["--url", "http://test/predict"]
+    for argv in (
+        ["--processes", "4"],
+        ["--emit-stats", "out.json"],
+        ["--mode", "open", "--emit-stats", "out.json", "--processes", "2"],
+        ["--mode", "closed", "--start-at", "1700000000"],
+    ):
+        with pytest.raises(SystemExit):
+            load_generator.parse_args(url + argv)
+    args = load_generator.parse_args(url + ["--mode", "open", "--emit-stats", "out.json", "--start-at", "1"])
+    assert args.emit_stats == "out.json" and args.start_at == 1.0
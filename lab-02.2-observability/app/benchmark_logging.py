@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import logging
+
+import httpx
+import numpy as np
+
+# Keep the limiter out of the way; this measures logging, not load shedding
+os.environ.setdefault("LIMIT_INITIAL", "100000")
+os.environ.setdefault("LIMIT_MAX", "100000")
+os.environ.setdefault("LATENCY_TARGET_MS", "60000")
+
+from logging_setup import setup_logging  # noqa: E402
+from main import app  # noqa: E402
+
+# name -> setup_logging kwargs
+MODES = {
+    "off": {"level": "WARNING", "queued": False},
+    "sync_full_payload": {"queued": False, "max_items": 10 ** 9},  # the old f-string behaviour
+    "sync": {"queued": False},
+    "queued": {"queued": True},
+    "queued_sampled_1pct": {"queued": True, "sample_rates": {"/predict": 0.01}},
+}
+
+
+async def drive(num_requests: int, concurrency: int, body: bytes) -> dict:
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Content-Type": "application/octet-stream"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                t0 = time.perf_counter()
+                resp = await client.post("/predict", content=body, headers=headers)
+                resp.raise_for_status()
+                latencies.append((time.perf_counter() - t0) * 1000.0)
+
+        cpu0, t0 = time.process_time(), time.perf_counter()
+        per_worker = num_requests // concurrency
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        wall, cpu = time.perf_counter() - t0, time.process_time() - cpu0
+
+    latencies.sort()
+    return {
+        "throughput_rps": round(len(latencies) / wall, 1),
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+        # CPU includes the log thread, so queued modes are not flattered
+        "cpu_ms_per_request": round(cpu / len(latencies) * 1000.0, 3),
+    }
+
+
+def run(num_requests: int, concurrency: int, features: int) -> list:
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # only the service's own logs
+    body = np.random.default_rng(0).random(features, dtype=np.float32).astype("<f4").tobytes()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, kwargs in MODES.items():
+            with open(os.path.join(tmp, f"{name}.log"), "w") as stream:
+                listener = setup_logging(stream=stream, **kwargs)
+                row = {"mode": name, **asyncio.run(drive(num_requests, concurrency, body))}
+                if listener is not None:
+                    listener.stop()
+                row["log_bytes"] = os.path.getsize(stream.name)
+            results.append(row)
+    setup_logging()
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="In-process /predict latency with logging off, synchronous, queued and sampled"
+    )
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per mode (default: 2000)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients (default: 50)")
+    parser.add_argument("--features", type=int, default=4096, help="Features per request (default: 4096)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for row in run(args.requests, args.concurrency, args.features):
+        print(json.dumps(row))
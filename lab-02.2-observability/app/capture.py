@@ -0,0 +1,233 @@
+import logging
+import os
+import queue
+import random
+import struct
+import threading
+import time
+from typing import Iterator, List, NamedTuple, Optional
+
+MAGIC = b"L22CAP1\n"
+# arrival (unix seconds), content-type length, path length, body length
+HEADER = struct.Struct("<dBHI")
+# A record with an empty path marks the start of a recorder session
+SESSION_PATH = ""
+
+log = logging.getLogger(__name__)
+
+
+class CapturedRequest(NamedTuple):
+    arrival: float
+    path: str
+    content_type: str
+    body: bytes
+
+
+def write_record(f, req: CapturedRequest) -> int:
+    ctype = req.content_type.encode()[:255]
+    path = req.path.encode()
+    f.write(HEADER.pack(req.arrival, len(ctype), len(path), len(req.body)))
+    f.write(ctype)
+    f.write(path)
+    f.write(req.body)
+    return HEADER.size + len(ctype) + len(path) + len(req.body)
+
+
+def _read_records(path: str) -> Iterator[CapturedRequest]:
+    """Yield every complete record, session markers included, in file order."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a traffic capture")
+        while True:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return
+            arrival, ctype_len, path_len, body_len = HEADER.unpack(header)
+            data = f.read(ctype_len + path_len + body_len)
+            if len(data) < ctype_len + path_len + body_len:
+                return
+            yield CapturedRequest(
+                arrival,
+                data[ctype_len:ctype_len + path_len].decode(),
+                data[:ctype_len].decode(),
+                data[ctype_len + path_len:],
+            )
+
+
+def read_capture(path: str) -> Iterator[CapturedRequest]:
+    """
+    Yield captured requests in the order they were written; a truncated
+    last record is ignored.
+
+    Records are written when a body has been read in full, so concurrent
+    requests can be slightly out of arrival order. Use read_sessions()
+    to get them sorted.
+    """
+    for req in _read_records(path):
+        if req.path != SESSION_PATH:
+            yield req
+
+
+def read_sessions(path: str) -> Iterator[List[CapturedRequest]]:
+    """
+    Yield the requests of each recorder session (one per service start)
+    sorted by arrival. Gaps between sessions are downtime, not traffic.
+    """
+    session: List[CapturedRequest] = []
+    for req in _read_records(path):
+        if req.path == SESSION_PATH:
+            if session:
+                yield sorted(session, key=lambda r: r.arrival)
+            session = []
+        else:
+            session.append(req)
+    if session:
+        yield sorted(session, key=lambda r: r.arrival)
+
+
+def complete_length(path: str) -> int:
+    """Byte length of the complete records in a capture (0 if it is empty)."""
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if not magic:
+            return 0
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a traffic capture")
+        size = os.fstat(f.fileno()).st_size
+        end = len(MAGIC)
+        while end + HEADER.size <= size:
+            f.seek(end)
+            _, ctype_len, path_len, body_len = HEADER.unpack(f.read(HEADER.size))
+            record_end = end + HEADER.size + ctype_len + path_len + body_len
+            if record_end > size:
+                break
+            end = record_end
+        return end
+
+
+class TrafficRecorder:
+    """
+    Appends captured requests to a compact binary log from a writer thread.
+
+    Records are length-prefixed: a fixed header (arrival time and lengths)
+    followed by content type, path and raw body, so binary payloads are
+    stored as-is. The request path only enqueues, into a queue bounded to
+    `max_queue` records (overflow is dropped); capture stops once the file
+    holds `max_bytes`, or after a write error.
+
+    An existing capture is appended to, so restarts do not lose it; a
+    record cut short by a crash is trimmed first, and each recorder starts
+    with a session marker so replay can skip the downtime in between.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 1.0, max_bytes: int = 100 * 1024 * 1024,
+                 max_queue: int = 10000):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.captured = 0
+        self.dropped = 0
+        self.error: Optional[str] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._file = open(path, "ab", buffering=1024 * 1024)
+        try:
+            length = complete_length(path)
+            self._file.truncate(length)
+            if length == 0:
+                self._file.write(MAGIC)
+                length = len(MAGIC)
+            length += write_record(self._file, CapturedRequest(time.time(), SESSION_PATH, "", b""))
+        except BaseException:
+            self._file.close()
+            raise
+        self.written_bytes = length
+        self._thread = threading.Thread(target=self._drain, name="traffic-capture", daemon=True)
+        self._thread.start()
+
+    @property
+    def full(self) -> bool:
+        return self.written_bytes >= self.max_bytes
+
+    def sampled(self) -> bool:
+        return (not self.full and self.error is None
+                and (self.sample_rate >= 1.0 or random.random() < self.sample_rate))
+
+    def record(self, req: CapturedRequest) -> None:
+        try:
+            self._queue.put_nowait(req)
+        except queue.Full:
+            # The writer cannot keep up: drop rather than grow without bound
+            self.dropped += 1
+
+    def _drain(self) -> None:
+        while True:
+            req = self._queue.get()
+            if req is None:
+                break
+            if self.full or self.error is not None:
+                self.dropped += 1
+                continue
+            try:
+                self.written_bytes += write_record(self._file, req)
+                if self._queue.empty():
+                    self._file.flush()
+            except OSError as exc:
+                # A half-written record would break every later one: stop capturing
+                self.error = str(exc)
+                self.dropped += 1
+                log.error("traffic capture to %s stopped: %s", self.path, exc)
+                continue
+            self.captured += 1
+        try:
+            self._file.close()
+        except OSError as exc:
+            log.error("closing traffic capture %s failed: %s", self.path, exc)
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "written_bytes": self.written_bytes,
+            "max_bytes": self.max_bytes,
+            "sample_rate": self.sample_rate,
+            "error": self.error,
+        }
+
+
+class CaptureMiddleware:
+    """Pure ASGI middleware that tees request bodies of `routes` into a TrafficRecorder."""
+
+    def __init__(self, app, recorder: Optional[TrafficRecorder], routes=("/predict",)):
+        self.app = app
+        self.recorder = recorder
+        self.routes = set(routes)
+
+    async def __call__(self, scope, receive, send):
+        recorder = self.recorder
+        if (recorder is None or scope["type"] != "http" or scope["path"] not in self.routes
+                or not recorder.sampled()):
+            await self.app(scope, receive, send)
+            return
+
+        arrival = time.time()
+        content_type = ""
+        for key, value in scope["headers"]:
+            if key == b"content-type":
+                content_type = value.decode("latin-1")
+                break
+        chunks = []
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    recorder.record(CapturedRequest(arrival, scope["path"], content_type, b"".join(chunks)))
+            return message
+
+        await self.app(scope, receive_wrapper, send)
@@ -0,0 +1,151 @@
+"""
+Content negotiation for feature-vector payloads.
+
+Besides JSON (`{"features": [...]}`) the predict endpoint accepts:
+
+- application/octet-stream: raw little-endian float32 values, decoded
+  zero-copy with np.frombuffer
+- application/msgpack: a map with "features" holding either a list of
+  numbers or a bin of little-endian float32 (the bin form is zero-copy)
+
+Responses follow the Accept header (q-values honoured), or mirror the
+request format when the client does not ask for one. Binary responses
+carry the prediction(s) as little-endian float64. Non-finite features
+(NaN, Inf) are rejected with 400 in every format.
+
+lab-01.3, lab-02.1 and lab-02.2 each ship an identical copy of this module:
+every lab builds its own image from its own app/ directory. Change all three.
+"""
+
+from typing import List, Optional, Tuple, Type
+
+import msgpack
+import numpy as np
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+JSON = "application/json"
+OCTET_STREAM = "application/octet-stream"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = (MSGPACK, "application/x-msgpack")
+
+FLOAT32_LE = np.dtype("<f4")
+FLOAT64_LE = np.dtype("<f8")
+
+# Request body documentation for endpoints that parse the body themselves
+PREDICT_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            JSON: {"schema": {"type": "object", "properties": {"features": {"type": "array", "items": {"type": "number"}}}}},
+            OCTET_STREAM: {"schema": {"type": "string", "format": "binary", "description": "little-endian float32 values"}},
+            MSGPACK: {"schema": {"type": "string", "format": "binary", "description": "{\"features\": [...] | bin<float32 LE>}"}},
+        },
+    }
+}
+
+
+def media_type(header: Optional[str]) -> str:
+    return (header or JSON).split(";", 1)[0].strip().lower()
+
+
+def decode_binary(body: bytes) -> np.ndarray:
+    if not body or len(body) % FLOAT32_LE.itemsize:
+        raise HTTPException(status_code=400, detail="body must be a non-empty sequence of float32 values")
+    return np.frombuffer(body, dtype=FLOAT32_LE)
+
+
+def decode_msgpack(body: bytes) -> np.ndarray:
+    try:
+        obj = msgpack.unpackb(body, raw=False)
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=f"invalid msgpack body: {exc}")
+    if not isinstance(obj, dict) or "features" not in obj:
+        raise HTTPException(status_code=400, detail="msgpack body must be a map with 'features'")
+
+    features = obj["features"]
+    if isinstance(features, (bytes, bytearray)):
+        return decode_binary(features)
+    try:
+        array = np.asarray(features, dtype=np.float64)
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"features must be numbers: {exc}")
+    if array.ndim != 1 or array.size == 0:
+        raise HTTPException(status_code=400, detail="features must be a non-empty list of numbers")
+    return array
+
+
+def decode_json(body: bytes, model: Type[BaseModel]) -> np.ndarray:
+    try:
+        payload = model.model_validate_json(body)
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors())
+    return np.asarray(payload.features, dtype=np.float64)
+
+
+def decode_features(body: bytes, content_type: Optional[str], model: Type[BaseModel]) -> np.ndarray:
+    kind = media_type(content_type)
+    if kind == OCTET_STREAM:
+        features = decode_binary(body)
+    elif kind in MSGPACK_TYPES:
+        features = decode_msgpack(body)
+    elif kind == JSON:
+        features = decode_json(body, model)
+    else:
+        raise HTTPException(status_code=415, detail=f"unsupported content type: {kind}")
+    # Any float32 bit pattern is a valid body, NaN and Inf included; they would
+    # only fail later, as a 500, when the prediction is rendered as JSON
+    if not np.isfinite(features).all():
+        raise HTTPException(status_code=400, detail="features must be finite numbers")
+    return features
+
+
+async def read_features(request: Request, model: Type[BaseModel]) -> np.ndarray:
+    body = await request.body()
+    return decode_features(body, request.headers.get("content-type"), model)
+
+
+def parse_accept(header: str) -> List[Tuple[str, float]]:
+    """(media range, q) pairs from an Accept header, highest q first; q=0 entries dropped."""
+    ranges = []
+    for position, part in enumerate(header.split(",")):
+        fields = part.split(";")
+        kind = fields[0].strip().lower()
+        q = 1.0
+        for param in fields[1:]:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if kind and q > 0:
+            ranges.append((position, kind, q))
+    # Stable on header order among equal q-values
+    ranges.sort(key=lambda item: (-item[2], item[0]))
+    return [(kind, q) for _, kind, q in ranges]
+
+
+def response_format(request: Request) -> str:
+    for kind, _ in parse_accept(request.headers.get("accept", "")):
+        if kind in MSGPACK_TYPES:
+            return MSGPACK
+        if kind in (OCTET_STREAM, JSON):
+            return kind
+        if kind in ("*/*", "application/*"):
+            break  # anything goes: mirror the request below
+    # No explicit preference: answer in the format the client sent
+    kind = media_type(request.headers.get("content-type"))
+    if kind in MSGPACK_TYPES:
+        return MSGPACK
+    return kind if kind == OCTET_STREAM else JSON
+
+
+def encode_response(result: dict, fmt: str, value_key: str = "prediction"):
+    if fmt == MSGPACK:
+        return Response(msgpack.packb(result, use_bin_type=True), media_type=MSGPACK)
+    if fmt == OCTET_STREAM:
+        values = np.asarray(result[value_key], dtype=FLOAT64_LE)
+        return Response(values.tobytes(), media_type=OCTET_STREAM)
+    return result
@@ -0,0 +1,119 @@
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit driven by observed latency.
+
+    While latency stays under the threshold and the limit is actually being
+    used, the limit grows by about one slot per limit's worth of requests
+    (additive increase). When a request is slower than the threshold, or
+    fails, the limit is multiplied by `backoff` (multiplicative decrease),
+    at most once per baseline latency so one burst of slow requests does
+    not collapse it. Requests over the limit are shed immediately with 503
+    instead of queueing until the probes time out.
+
+    The threshold is `latency_target_ms` when set, otherwise `tolerance`
+    times the baseline: the lowest latency seen over the last
+    `baseline_window` requests (the no-queueing cost of one request).
+
+    lab-02.1 and lab-02.2 ship identical copies of this module (and of
+    tests/test_limiter.py): each lab builds its own image. Change both.
+    """
+
+    def __init__(self, initial_limit: int = 20, min_limit: int = 1, max_limit: int = 200,
+                 latency_target_ms: Optional[float] = None, tolerance: float = 2.0,
+                 backoff: float = 0.9, baseline_window: int = 500):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target_ms = latency_target_ms
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.baseline_window = baseline_window
+
+        self.in_flight = 0
+        self.accepted = 0
+        self.shed = 0
+        self.baseline_ms: Optional[float] = None
+        self._window_min = float("inf")
+        self._window_count = 0
+        self._last_decrease = 0.0
+
+    def threshold_ms(self) -> Optional[float]:
+        if self.latency_target_ms:
+            return self.latency_target_ms
+        if self.baseline_ms is None:
+            return None
+        return self.baseline_ms * self.tolerance
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        self.accepted += 1
+        return True
+
+    def release(self, latency_ms: float, ok: bool = True) -> None:
+        in_flight_before = self.in_flight
+        self.in_flight -= 1
+        self._update_baseline(latency_ms)
+
+        threshold = self.threshold_ms()
+        if not ok or (threshold is not None and latency_ms > threshold):
+            now = time.monotonic()
+            cooldown_s = (self.baseline_ms or latency_ms) / 1000.0
+            if now - self._last_decrease >= cooldown_s:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif in_flight_before * 2 >= self.limit:
+            # Only grow when the current limit is actually being used
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _update_baseline(self, latency_ms: float) -> None:
+        self._window_min = min(self._window_min, latency_ms)
+        self._window_count += 1
+        if self.baseline_ms is None or latency_ms < self.baseline_ms:
+            self.baseline_ms = latency_ms
+        if self._window_count >= self.baseline_window:
+            # Start a fresh window so the baseline can also move up
+            self.baseline_ms = self._window_min
+            self._window_min = float("inf")
+            self._window_count = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if not self.try_acquire():
+            raise HTTPException(
+                status_code=503,
+                detail="overloaded, request shed by concurrency limiter",
+                headers={"Retry-After": "1"},
+            )
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        except (HTTPException, RequestValidationError) as exc:
+            # A malformed request says nothing about overload; only 5xx count as failures
+            ok = getattr(exc, "status_code", 422) < 500
+            raise
+        finally:
+            self.release((time.perf_counter() - t0) * 1000.0, ok)
+
+    def stats(self) -> dict:
+        threshold = self.threshold_ms()
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "accepted": self.accepted,
+            "shed": self.shed,
+            "baseline_latency_ms": round(self.baseline_ms, 2) if self.baseline_ms is not None else None,
+            "latency_threshold_ms": round(threshold, 2) if threshold is not None else None,
+        }
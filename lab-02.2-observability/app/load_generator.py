@@ -1,7 +1,16 @@
 import argparse
+import asyncio
+import json
+import math
 import time
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+import httpx
 import requests
 
+from capture import CapturedRequest, read_sessions
+
 
 def load(url: str, count: int):
     payload = {"features": [1.0, 2.0, 3.0]}
@@ -15,9 +24,104 @@ def load(url: str, count: int):
             print(f"{i} -> error: {e}")
 
 
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def schedule(sessions: Iterable[List[CapturedRequest]]) -> List[Tuple[float, CapturedRequest]]:
+    """
+    Offset of each request from the start of the replay, in captured seconds:
+    the original gaps within a session, and none between sessions.
+    """
+    offsets: List[Tuple[float, CapturedRequest]] = []
+    base = 0.0
+    for session in sessions:
+        first = session[0].arrival
+        offsets.extend((base + req.arrival - first, req) for req in session)
+        base = offsets[-1][0]
+    return offsets
+
+
+async def replay(url: str, capture_path: str, speed: float = 1.0, concurrency: int = 50,
+                 limit: Optional[int] = None, timeout: float = 5.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None) -> dict:
+    """
+    Re-send captured requests with their original inter-arrival gaps
+    divided by `speed`, each to the captured path on the origin of `url`.
+    Downtime between recorder sessions (service restarts) is skipped.
+
+    Latency is measured from the time a request was due, not from when a
+    connection became free, so a saturated replay shows up as queueing
+    instead of being hidden (no coordinated omission).
+    """
+    records = schedule(read_sessions(capture_path))[:limit]
+    if not records:
+        raise ValueError(f"no requests in {capture_path}")
+    origin = httpx.URL(url)
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    lags: List[float] = []
+    statuses: Counter = Counter()
+    loop = asyncio.get_running_loop()
+
+    async def send(client: httpx.AsyncClient, req, due: float) -> None:
+        async with slots:
+            lags.append(loop.time() - due)
+            headers = {"content-type": req.content_type} if req.content_type else None
+            try:
+                resp = await client.post(origin.copy_with(path=req.path), content=req.body, headers=headers)
+                statuses[str(resp.status_code)] += 1
+            except httpx.HTTPError as exc:
+                statuses[type(exc).__name__] += 1
+            latencies.append((loop.time() - due) * 1000.0)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(transport=transport, timeout=timeout, limits=limits) as client:
+        start = loop.time()
+        tasks = []
+        for offset, req in records:
+            due = start + offset / speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(client, req, due)))
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - start
+
+    latencies.sort()
+    captured_sec = records[-1][0]
+    return {
+        "requests": len(records),
+        "speed": speed,
+        "captured_duration_sec": round(captured_sec, 3),
+        "replay_duration_sec": round(elapsed, 3),
+        "offered_rps": round(len(records) / (captured_sec / speed), 1) if captured_sec else None,
+        "achieved_rps": round(len(records) / elapsed, 1) if elapsed else None,
+        "p50_latency_ms": round(percentile(latencies, 50), 2),
+        "p95_latency_ms": round(percentile(latencies, 95), 2),
+        "p99_latency_ms": round(percentile(latencies, 99), 2),
+        "max_latency_ms": round(latencies[-1], 2),
+        # How late requests left because all `concurrency` slots were busy
+        "max_send_lag_ms": round(max(lags) * 1000.0, 2),
+        "statuses": dict(statuses),
+    }
+
+
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--url", required=True)
     ap.add_argument("--count", type=int, default=10)
+    ap.add_argument("--replay", help="Replay a traffic capture (CAPTURE_PATH) instead of the fixed payload")
+    ap.add_argument("--speed", type=float, default=1.0, help="Replay speed-up factor (default: 1.0)")
+    ap.add_argument("--concurrency", type=int, default=50, help="Max in-flight replayed requests (default: 50)")
+    ap.add_argument("--limit", type=int, help="Replay only the first N captured requests")
     args = ap.parse_args()
-    load(args.url, args.count)
+    if args.replay:
+        summary = asyncio.run(replay(args.url, args.replay, args.speed, args.concurrency, args.limit))
+        print(json.dumps(summary, indent=2))
+    else:
+        load(args.url, args.count)
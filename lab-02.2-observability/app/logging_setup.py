@@ -0,0 +1,134 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+import numpy as np
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def truncate(value, max_items: int):
+    """Cap arrays, lists and strings at `max_items` so one big payload can't flood the logs."""
+    if isinstance(value, np.ndarray):
+        value = value.ravel()
+        if value.size > max_items:
+            return value[:max_items].tolist() + [f"...(+{value.size - max_items} more)"]
+        return value.tolist()
+    if isinstance(value, (list, tuple)) and len(value) > max_items:
+        return list(value[:max_items]) + [f"...(+{len(value) - max_items} more)"]
+    if isinstance(value, str) and len(value) > max_items * 8:
+        return value[:max_items * 8] + f"...(+{len(value) - max_items * 8} chars)"
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra={...}` keys become top-level fields."""
+
+    def __init__(self, max_items: int = 16):
+        super().__init__()
+        self.max_items = max_items
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = truncate(value, self.max_items)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler that defers all formatting to the listener thread.
+
+    The stock `prepare()` renders the message on the calling thread; here the
+    record goes onto the queue as-is, so the request only pays for building
+    the LogRecord. Pass values that are not mutated afterwards (the feature
+    arrays from the codec are read-only views of the request body).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class RouteSampler(logging.Filter):
+    """
+    Keep a fraction of INFO/DEBUG records per route (`extra={"route": ...}`).
+
+    Warnings and errors always pass. Records without a route use `default`.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, default: float = 1.0):
+        super().__init__()
+        self.rates = rates or {}
+        self.default = default
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "route", None), self.default)
+        return rate >= 1.0 or random.random() < rate
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """"/predict=0.01,/health=0" -> {"/predict": 0.01, "/health": 0.0}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, rate = item.partition("=")
+        rates[route.strip()] = float(rate)
+    return rates
+
+
+def setup_logging(level: str = "INFO", sample_rates: Optional[Dict[str, float]] = None,
+                  max_items: int = 16, stream=None, queued: bool = True) -> Optional[QueueListener]:
+    """
+    Route the root logger through a JSON formatter, off the request thread.
+
+    With `queued` the request thread only enqueues the record; a
+    QueueListener thread formats and writes it. Returns the listener (already
+    started, stopped at exit) or None when logging synchronously.
+    """
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter(max_items))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        if isinstance(handler, QueueHandler) and hasattr(handler, "listener"):
+            atexit.unregister(_stop_listener)
+            _stop_listener(handler.listener)
+    root.setLevel(level)
+
+    sampler = RouteSampler(sample_rates)
+    if not queued:
+        output.addFilter(sampler)
+        root.addHandler(output)
+        return None
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue)
+    handler.addFilter(sampler)  # drop sampled-out records before they are queued
+    listener = QueueListener(log_queue, output, respect_handler_level=True)
+    handler.listener = listener
+    root.addHandler(handler)
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    return listener
+
+
+def _stop_listener(listener: QueueListener) -> None:
+    # stop() flushes the queue; calling it on a stopped listener raises
+    if listener._thread is not None:
+        listener.stop()
@@ -1,14 +1,91 @@
+import atexit
+import hmac
+import os
 import time
+import asyncio
 import logging
-from typing import List
+from typing import List, Optional
 
-from fastapi import FastAPI
+import numpy as np
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 from pydantic import BaseModel, Field
 
-logging.basicConfig(level=logging.INFO)
+from capture import CaptureMiddleware, TrafficRecorder
+from codec import PREDICT_OPENAPI, decode_features, encode_response, response_format
+from limiter import AdaptiveLimiter
+from logging_setup import parse_sample_rates, setup_logging
+from metrics import START_TIME, PrometheusMiddleware, requests_total
+from profiler import SamplingProfiler, to_collapsed, to_svg
+from slo import SLOCollector, SLOMiddleware, SLOTracker, parse_thresholds
+from tracing import Tracer, TracingMiddleware, span, to_otlp
+
+# JSON lines written by a background thread; LOG_SAMPLE_RATES="/predict=0.01,/health=0"
+setup_logging(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    sample_rates=parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", "")),
+    max_items=int(os.getenv("LOG_MAX_ITEMS", "16")),
+)
 log = logging.getLogger("lab-2.2-free")
 
+# Per-phase spans for /predict; slow and failed requests are always kept
+tracer = Tracer(
+    capacity=int(os.getenv("TRACE_BUFFER_SIZE", "1000")),
+    head_rate=float(os.getenv("TRACE_HEAD_RATE", "1.0")),
+    slow_ms=float(os.getenv("TRACE_SLOW_MS", "100")),
+    keep_rate=float(os.getenv("TRACE_KEEP_RATE", "0.01")),
+)
+TRACE_EXPORT_DIR = os.getenv("TRACE_EXPORT_DIR", "/tmp/traces")
+
+# Debug endpoints with side effects are off unless a token is configured
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")
+
+# On-demand statistical profiler behind /debug/profile
+profiler = SamplingProfiler(max_seconds=float(os.getenv("PROFILE_MAX_SECONDS", "60")))
+PROFILE_HZ = int(os.getenv("PROFILE_HZ", "100"))
+
+# Rolling 5m/30m/1h/6h SLIs and burn rates for /predict, also exported on /metrics
+slo = SLOTracker(
+    availability_target=float(os.getenv("SLO_AVAILABILITY_TARGET", "0.999")),
+    latency_target=float(os.getenv("SLO_LATENCY_TARGET", "0.99")),
+    latency_thresholds_ms=parse_thresholds(os.getenv("SLO_LATENCY_THRESHOLDS_MS", "50,100,250")),
+)
+REGISTRY.register(SLOCollector(slo))
+
+# Optional traffic capture for offline replay: CAPTURE_PATH=/tmp/predict.cap
+recorder = None
+if os.getenv("CAPTURE_PATH"):
+    recorder = TrafficRecorder(
+        os.environ["CAPTURE_PATH"],
+        sample_rate=float(os.getenv("CAPTURE_SAMPLE_RATE", "1.0")),
+        max_bytes=int(float(os.getenv("CAPTURE_MAX_MB", "100")) * 1024 * 1024),
+    )
+    atexit.register(recorder.close)
+
 app = FastAPI(title="Lab 2.2 Free - Observability Lite API")
+app.add_middleware(PrometheusMiddleware)
+app.add_middleware(SLOMiddleware, tracker=slo)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+app.add_middleware(CaptureMiddleware, recorder=recorder)
+
+# Adaptive concurrency limit in front of inference; excess load gets a fast 503
+limiter = AdaptiveLimiter(
+    initial_limit=int(os.getenv("LIMIT_INITIAL", "20")),
+    max_limit=int(os.getenv("LIMIT_MAX", "200")),
+    latency_target_ms=float(os.getenv("LATENCY_TARGET_MS", "0")) or None,
+)
+
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)) -> None:
+    """
+    Guard for debug endpoints that write files or burn CPU: 404 unless
+    DEBUG_TOKEN is set, 403 unless the X-Debug-Token header matches it.
+    """
+    if not DEBUG_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_debug_token is None or not hmac.compare_digest(x_debug_token, DEBUG_TOKEN):
+        raise HTTPException(status_code=403, detail="invalid debug token")
 
 
 class Features(BaseModel):
@@ -17,35 +94,112 @@ class Features(BaseModel):
 
 @app.get("/health")
 def health():
-    log.info("Health check called")
+    log.info("Health check called", extra={"route": "/health"})
     return {
         "status": "ok",
         "version": "free",
     }
 
 
+@app.get("/metrics")
+def metrics():
+    """Prometheus exposition format, for scraping, HPA adapters and alerts."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/metrics-lite")
 def metrics_lite():
     """
-    Lightweight metrics endpoint.
-    This is intentionally NOT Prometheus-compatible.
+    Lightweight JSON summary for quick curl checks.
+    Scrape /metrics for the full Prometheus series.
     """
-    ts = time.time()
     return {
-        "uptime_ms": int(ts * 1000),
-        "cpu_simulated_ms": 25,
-        "requests_total_estimate": 100,
+        "uptime_ms": int((time.time() - START_TIME) * 1000),
+        "process_cpu_seconds": round(time.process_time(), 3),
+        "requests_total": requests_total(),
     }
 
 
-@app.post("/predict")
-def predict(payload: Features):
-    log.info(f"Prediction requested with {payload.features}")
-    result = float(sum(payload.features))
+@app.get("/slo")
+def slo_report():
+    return slo.report()
 
-    # simulate inference latency
-    time.sleep(0.02)
 
-    return {
-        "prediction": result,
-    }
+@app.get("/limiter")
+def limiter_stats():
+    return limiter.stats()
+
+
+@app.get("/debug/traces")
+def debug_traces(min_ms: Optional[float] = None, limit: int = 20, format: str = "json"):
+    """Slowest recent traces (default: at least TRACE_SLOW_MS); format=otlp for OTLP/JSON."""
+    traces = tracer.recent(tracer.slow_ms if min_ms is None else min_ms, limit)
+    if format == "otlp":
+        return to_otlp(traces)
+    return {"stats": tracer.stats(), "traces": [t.to_dict() for t in traces]}
+
+
+@app.post("/debug/traces/export", dependencies=[Depends(require_debug_token)])
+def export_traces():
+    return tracer.export(TRACE_EXPORT_DIR)
+
+
+@app.get("/debug/capture")
+def capture_stats():
+    return recorder.stats() if recorder else {"enabled": False}
+
+
+@app.get("/debug/profile", dependencies=[Depends(require_debug_token)])
+async def debug_profile(seconds: float = 5.0, hz: int = PROFILE_HZ, format: str = "collapsed"):
+    """
+    Sample every thread for `seconds` and return collapsed stacks
+    (flamegraph.pl / speedscope input) or, with format=svg, a flamegraph.
+    """
+    if not 0 < seconds <= profiler.max_seconds:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {profiler.max_seconds}]")
+    if not 1 <= hz <= profiler.max_hz:
+        raise HTTPException(status_code=400, detail=f"hz must be in [1, {profiler.max_hz}]")
+    if not profiler.try_start():
+        raise HTTPException(status_code=409, detail="a profile is already running")
+    try:
+        # Sample from a worker thread so the event loop keeps serving (and gets profiled)
+        stacks = await asyncio.to_thread(profiler.sample, seconds, hz)
+    finally:
+        profiler.release()
+
+    if format == "svg":
+        title = f"{sum(stacks.values())} samples, {seconds:g}s at {hz} Hz"
+        return Response(to_svg(stacks, title=title), media_type="image/svg+xml")
+    return PlainTextResponse(to_collapsed(stacks))
+
+
+@app.post("/predict", openapi_extra=PREDICT_OPENAPI)
+async def predict(request: Request):
+    with span("read"):
+        body = await request.body()
+
+    # Everything after the body is read runs inside the limit, so the latency
+    # the limiter sees grows with real contention for the event loop
+    async with limiter.slot():
+        # JSON, raw float32 (application/octet-stream) or MessagePack, validated
+        with span("parse", bytes=len(body)):
+            features = decode_features(body, request.headers.get("content-type"), Features)
+
+        with span("inference", features=int(features.size)):
+            result = float(features.sum(dtype=np.float64))
+            # simulate inference latency
+            await asyncio.sleep(0.02)
+
+        # Formatting and payload truncation happen on the log thread, not here
+        log.info(
+            "Prediction requested",
+            extra={"route": "/predict", "n_features": features.size, "features": features, "prediction": result},
+        )
+
+        # Render the body here: a plain dict would be serialized by FastAPI
+        # after the handler returns, outside the span
+        with span("serialize"):
+            response = encode_response({"prediction": result}, response_format(request))
+            if not isinstance(response, Response):
+                response = JSONResponse(response)
+        return response
@@ -0,0 +1,109 @@
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.routing import Match
+
+# process_cpu_seconds_total, process_resident_memory_bytes and
+# process_start_time_seconds come from the default ProcessCollector (/proc)
+
+START_TIME = time.time()
+
+# The method comes from the client: anything else is labelled "other"
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+http_requests_total = Counter(
+    "http_requests_total",
+    "HTTP requests handled, by route, method and status code",
+    ["route", "method", "status"],
+)
+
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+)
+
+predict_latency_seconds = Histogram(
+    "predict_latency_seconds",
+    "End-to-end /predict latency (parse, inference, serialize)",
+    buckets=(0.005, 0.01, 0.02, 0.025, 0.03, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+app_uptime_seconds = Gauge(
+    "app_uptime_seconds",
+    "Seconds since the service started",
+)
+# Computed at scrape time, never on the request path
+app_uptime_seconds.set_function(lambda: time.time() - START_TIME)
+
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware that counts requests and times /predict.
+
+    Routes are labelled with their template ("/items/{item_id}"), unknown
+    paths collapse into "unmatched" and unknown methods into "other", so
+    scanners cannot blow up label cardinality. Label
+    children are cached, so the hot path is a dict lookup and a few
+    lock-protected increments rather than a `.labels()` call per request.
+    """
+
+    def __init__(self, app, latency_routes=("/predict",)):
+        self.app = app
+        self.latency_routes = set(latency_routes)
+        self._counters = {}
+
+    def _route(self, scope) -> str:
+        # Same matching as the router; a path that only matches with another
+        # method (a 405) still gets its route's template
+        partial = None
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", "unmatched")
+            if match == Match.PARTIAL and partial is None:
+                partial = getattr(route, "path", "unmatched")
+        return partial or "unmatched"
+
+    def _counter(self, route: str, method: str, status: int):
+        key = (route, method, status)
+        child = self._counters.get(key)
+        if child is None:
+            child = http_requests_total.labels(route, method, str(status))
+            self._counters[key] = child
+        return child
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - t0
+            http_requests_in_flight.dec()
+            route = self._route(scope)
+            method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+            self._counter(route, method, status).inc()
+            if route in self.latency_routes:
+                predict_latency_seconds.observe(elapsed)
+
+
+def requests_total() -> int:
+    """Sum of http_requests_total over all label sets (scrape-time cost only)."""
+    return int(sum(
+        sample.value
+        for metric in http_requests_total.collect()
+        for sample in metric.samples
+        if sample.name == "http_requests_total"
+    ))
@@ -0,0 +1,132 @@
+import html
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+
+def frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler over every thread in the process.
+
+    The sampling thread wakes `hz` times a second, snapshots all stacks with
+    sys._current_frames() and counts them in collapsed form
+    ("thread;outer;...;inner"). Nothing is hooked into the interpreter, so
+    the profiled code runs at full speed; the cost is one stack walk per
+    thread per sample. Only one profile runs at a time.
+    """
+
+    def __init__(self, max_seconds: float = 60.0, max_hz: int = 1000):
+        self.max_seconds = max_seconds
+        self.max_hz = max_hz
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def try_start(self) -> bool:
+        return self._lock.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def sample(self, seconds: float, hz: int) -> Dict[str, int]:
+        """Blocking: sample for `seconds` and return {collapsed stack: count}."""
+        me = threading.get_ident()
+        interval = 1.0 / hz
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        next_tick = time.monotonic()
+        while next_tick < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}"))
+                stacks[";".join(reversed(labels))] += 1
+            next_tick += interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()  # fell behind; don't burst to catch up
+        return dict(stacks)
+
+
+def to_collapsed(stacks: Dict[str, int]) -> str:
+    """Brendan Gregg's collapsed format, readable by flamegraph.pl and speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def _build_tree(stacks: Dict[str, int]) -> dict:
+    root = {"name": "all", "value": 0, "children": {}}
+    for stack, count in stacks.items():
+        root["value"] += count
+        node = root
+        for name in stack.split(";"):
+            node = node["children"].setdefault(name, {"name": name, "value": 0, "children": {}})
+            node["value"] += count
+    return root
+
+
+def _color(name: str) -> str:
+    h = sum(map(ord, name))
+    return f"rgb({205 + h % 50},{80 + (h * 7) % 120},{40 + (h * 13) % 40})"
+
+
+def to_svg(stacks: Dict[str, int], width: int = 1200, row_height: int = 16,
+           title: Optional[str] = None) -> str:
+    """Self-contained flamegraph (root at the bottom); hover a frame for its sample count."""
+    tree = _build_tree(stacks)
+    total = tree["value"] or 1
+    rects = []
+
+    def depth_of(node) -> int:
+        return 1 + max((depth_of(c) for c in node["children"].values()), default=0)
+
+    height = (depth_of(tree) + 1) * row_height + 24
+
+    def layout(node, x: float, depth: int) -> None:
+        w = node["value"] / total * width
+        if w < 0.5:
+            return
+        y = height - (depth + 1) * row_height - 4
+        pct = 100.0 * node["value"] / total
+        # ~7px per character at font-size 11; shorten labels that don't fit
+        fits = int(w / 7)
+        if fits >= len(node["name"]):
+            label = node["name"]
+        elif fits >= 3:
+            label = node["name"][: fits - 2] + ".."
+        else:
+            label = ""
+        name, label = html.escape(node["name"]), html.escape(label)
+        rects.append(
+            f'<g><title>{name} ({node["value"]} samples, {pct:.1f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row_height - 1}" fill="{_color(node["name"])}"/>'
+            f'<text x="{x + 3:.1f}" y="{y + row_height - 4}">{label}</text></g>'
+        )
+        for child in sorted(node["children"].values(), key=lambda c: c["name"]):
+            layout(child, x, depth + 1)
+            x += child["value"] / total * width
+
+    layout(tree, 0.0, 0)
+    heading = html.escape(title or f"{total} samples")
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="monospace" font-size="11">'
+        f'<text x="{width / 2}" y="16" text-anchor="middle" font-size="14">{heading}</text>'
+        + "".join(rects)
+        + "</svg>"
+    )
@@ -0,0 +1,181 @@
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from prometheus_client.core import GaugeMetricFamily
+
+DEFAULT_WINDOWS = {"5m": 300, "30m": 1800, "1h": 3600, "6h": 21600}
+
+# Multi-window, multi-burn-rate alerts (Google SRE workbook, 30-day budget):
+# both the long and the short window must burn faster than the factor
+ALERT_RULES = (
+    {"severity": "page", "long": "1h", "short": "5m", "burn_rate": 14.4},
+    {"severity": "ticket", "long": "6h", "short": "30m", "burn_rate": 6.0},
+)
+
+
+class SLOTracker:
+    """
+    Rolling request, error and slow-request counts in fixed time buckets.
+
+    The counters are ring buffers covering the longest window
+    (6h / 10s buckets = 2160 slots). Each slot remembers which bucket it
+    holds, so stale slots are reset lazily on the next write. A request
+    costs a handful of list increments whatever the traffic; window sums are
+    computed only when someone reads /slo or scrapes /metrics.
+    """
+
+    def __init__(self, availability_target: float = 0.999, latency_target: float = 0.99,
+                 latency_thresholds_ms: Sequence[float] = (100.0,), bucket_seconds: int = 10,
+                 windows: Optional[Dict[str, int]] = None, clock: Callable[[], float] = time.time):
+        self.availability_target = availability_target
+        self.latency_target = latency_target
+        self.thresholds_ms = sorted(latency_thresholds_ms)
+        self.bucket_seconds = bucket_seconds
+        self.windows = windows or DEFAULT_WINDOWS
+        self.clock = clock
+
+        self.size = max(self.windows.values()) // bucket_seconds
+        self._bucket = [-1] * self.size
+        self._total = [0] * self.size
+        self._errors = [0] * self.size
+        # One row per threshold: requests slower than it
+        self._slow = [[0] * self.size for _ in self.thresholds_ms]
+
+    def record(self, latency_ms: float, ok: bool) -> None:
+        bucket = int(self.clock()) // self.bucket_seconds
+        slot = bucket % self.size
+        if self._bucket[slot] != bucket:
+            self._bucket[slot] = bucket
+            self._total[slot] = 0
+            self._errors[slot] = 0
+            for row in self._slow:
+                row[slot] = 0
+        self._total[slot] += 1
+        if not ok:
+            self._errors[slot] += 1
+        for row, threshold in zip(self._slow, self.thresholds_ms):
+            if latency_ms <= threshold:
+                break  # thresholds are sorted; faster than this one means faster than the rest
+            row[slot] += 1
+
+    def window_counts(self, seconds: int) -> dict:
+        now_bucket = int(self.clock()) // self.bucket_seconds
+        oldest = now_bucket - seconds // self.bucket_seconds
+        slots = [i for i, b in enumerate(self._bucket) if oldest < b <= now_bucket]
+        return {
+            "total": sum(self._total[i] for i in slots),
+            "errors": sum(self._errors[i] for i in slots),
+            "slow": [sum(row[i] for i in slots) for row in self._slow],
+        }
+
+    @staticmethod
+    def _sli(good: int, total: int) -> Optional[float]:
+        return good / total if total else None
+
+    @staticmethod
+    def _burn_rate(sli: Optional[float], target: float) -> Optional[float]:
+        # 1.0 means the error budget runs out exactly at the end of the SLO period
+        return (1.0 - sli) / (1.0 - target) if sli is not None else None
+
+    def report(self) -> dict:
+        windows = {}
+        for name, seconds in self.windows.items():
+            counts = self.window_counts(seconds)
+            total = counts["total"]
+            availability = self._sli(total - counts["errors"], total)
+            latency = {
+                f"{threshold:g}ms": self._sli(total - slow, total)
+                for threshold, slow in zip(self.thresholds_ms, counts["slow"])
+            }
+            windows[name] = {
+                "requests": total,
+                "errors": counts["errors"],
+                "availability": availability,
+                "availability_burn_rate": self._burn_rate(availability, self.availability_target),
+                "latency": latency,
+                "latency_burn_rate": {
+                    key: self._burn_rate(sli, self.latency_target) for key, sli in latency.items()
+                },
+            }
+        return {
+            "objectives": {
+                "availability": self.availability_target,
+                "latency": self.latency_target,
+                "latency_thresholds_ms": self.thresholds_ms,
+            },
+            "windows": windows,
+            "alerts": self.alerts(windows),
+        }
+
+    def alerts(self, windows: dict) -> List[dict]:
+        firing = []
+        for rule in ALERT_RULES:
+            if rule["long"] not in windows or rule["short"] not in windows:
+                continue
+            long_w, short_w = windows[rule["long"]], windows[rule["short"]]
+            sources = [("availability", long_w["availability_burn_rate"], short_w["availability_burn_rate"])]
+            sources += [
+                (f"latency_{key}", rate, short_w["latency_burn_rate"][key])
+                for key, rate in long_w["latency_burn_rate"].items()
+            ]
+            for sli, long_rate, short_rate in sources:
+                if long_rate is not None and short_rate is not None \
+                        and long_rate > rule["burn_rate"] and short_rate > rule["burn_rate"]:
+                    firing.append({"severity": rule["severity"], "sli": sli,
+                                   "long_window": rule["long"], "short_window": rule["short"],
+                                   "burn_rate": round(long_rate, 2)})
+        return firing
+
+
+class SLOCollector:
+    """Prometheus collector exposing the tracker's SLIs and burn rates at scrape time."""
+
+    def __init__(self, tracker: SLOTracker):
+        self.tracker = tracker
+
+    def collect(self):
+        sli = GaugeMetricFamily("slo_sli_ratio", "Good/total requests over the window", labels=["sli", "window"])
+        burn = GaugeMetricFamily("slo_burn_rate", "Error budget burn rate over the window",
+                                 labels=["sli", "window"])
+        for window, data in self.tracker.report()["windows"].items():
+            if data["availability"] is not None:
+                sli.add_metric(["availability", window], data["availability"])
+                burn.add_metric(["availability", window], data["availability_burn_rate"])
+            for key, value in data["latency"].items():
+                if value is not None:
+                    sli.add_metric([f"latency_{key}", window], value)
+                    burn.add_metric([f"latency_{key}", window], data["latency_burn_rate"][key])
+        yield sli
+        yield burn
+
+
+class SLOMiddleware:
+    """Pure ASGI middleware feeding SLOTracker; 5xx responses count as errors."""
+
+    def __init__(self, app, tracker: SLOTracker, routes=("/predict",)):
+        self.app = app
+        self.tracker = tracker
+        self.routes = set(routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.routes:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.tracker.record((time.perf_counter() - t0) * 1000.0, status < 500)
+
+
+def parse_thresholds(spec: str) -> List[float]:
+    return [float(part) for part in spec.split(",") if part.strip()]
@@ -1,5 +1,9 @@
+import msgpack
+import numpy as np
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from main import app
+from metrics import PrometheusMiddleware
 
 client = TestClient(app)
 
@@ -14,3 +18,69 @@ def test_predict():
     r = client.post("/predict", json={"features": [1, 2, 3]})
     assert r.status_code == 200
     assert r.json()["prediction"] == 6
+
+
+def test_predict_octet_stream():
+    body = np.array([1, 2, 3], dtype="<f4").tobytes()
+    r = client.post("/predict", content=body, headers={"Content-Type": "application/octet-stream"})
+    assert r.status_code == 200
+    assert np.frombuffer(r.content, dtype="<f8").tolist() == [6.0]
+
+
+def test_predict_msgpack():
+    body = msgpack.packb({"features": [1, 2, 3]})
+    r = client.post("/predict", content=body, headers={"Content-Type": "application/msgpack"})
+    assert r.status_code == 200
+    assert msgpack.unpackb(r.content)["prediction"] == 6
+
+
+def _sample(text, prefix):
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_prometheus_metrics():
+    before = _sample(client.get("/metrics").text, 'http_requests_total{method="POST",route="/predict",status="200"}')
+    client.post("/predict", json={"features": [1, 2, 3]})
+    client.get("/no-such-route")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    text = r.text
+    after = _sample(text, 'http_requests_total{method="POST",route="/predict",status="200"}')
+    assert after == before + 1
+    assert _sample(text, 'http_requests_total{method="GET",route="unmatched",status="404"}') >= 1
+    assert _sample(text, "predict_latency_seconds_count") >= 1
+    assert "http_requests_in_flight" in text
+    assert 0 <= _sample(text, "app_uptime_seconds") < 3600
+
+
+def test_metrics_label_templates_and_bounded_methods():
+    mini = FastAPI()
+    mini.add_middleware(PrometheusMiddleware)
+
+    @mini.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    mini_client = TestClient(mini)
+    for item_id in (1, 2, 3):
+        assert mini_client.get(f"/items/{item_id}").status_code == 200
+    assert mini_client.post("/items/4").status_code == 405
+    mini_client.request("BREW", "/items/5")
+
+    text = client.get("/metrics").text
+    assert _sample(text, 'http_requests_total{method="GET",route="/items/{item_id}",status="200"}') >= 3
+    assert _sample(text, 'http_requests_total{method="POST",route="/items/{item_id}",status="405"}') >= 1
+    assert _sample(text, 'http_requests_total{method="other",route="/items/{item_id}",status="405"}') >= 1
+    assert 'route="/items/1"' not in text and 'method="BREW"' not in text
+
+
+def test_metrics_lite_is_real():
+    client.get("/health")
+    body = client.get("/metrics-lite").json()
+    assert 0 <= body["uptime_ms"] < 3600 * 1000
+    assert body["requests_total"] >= 1
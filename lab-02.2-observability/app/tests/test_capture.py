@@ -0,0 +1,123 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import capture
+from capture import CaptureMiddleware, CapturedRequest, TrafficRecorder, read_capture, read_sessions
+
+
+def _app(recorder):
+    app = FastAPI()
+    app.add_middleware(CaptureMiddleware, recorder=recorder)
+
+    @app.post("/predict")
+    async def predict(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.post("/other")
+    async def other():
+        return {}
+
+    return app
+
+
+def test_capture_round_trip(tmp_path):
+    path = tmp_path / "traffic.cap"
+    recorder = TrafficRecorder(str(path))
+    client = TestClient(_app(recorder))
+
+    assert client.post("/predict", json={"features": [1, 2, 3]}).json()["size"] > 0
+    client.post("/predict", content=b"\x00\x00\x80?", headers={"Content-Type": "application/octet-stream"})
+    client.post("/other", json={})
+    recorder.close()
+
+    records = list(read_capture(str(path)))
+    assert [r.path for r in records] == ["/predict", "/predict"]
+    assert records[0].content_type == "application/json"
+    assert records[1].body == b"\x00\x00\x80?"
+    assert records[0].arrival <= records[1].arrival
+    assert recorder.stats()["captured"] == 2
+
+
+def test_capture_stops_at_max_bytes(tmp_path):
+    path = tmp_path / "traffic.cap"
+    recorder = TrafficRecorder(str(path), max_bytes=150)
+    client = TestClient(_app(recorder))
+    for _ in range(10):
+        client.post("/predict", content=b"x" * 40)
+    recorder.close()
+    # 8-byte magic + 15-byte session marker + 63 bytes per record: the third write crosses the limit
+    assert len(list(read_capture(str(path)))) == 3
+
+
+def test_restart_appends_and_trims_partial_record(tmp_path):
+    path = tmp_path / "traffic.cap"
+    recorder = TrafficRecorder(str(path))
+    recorder.record(CapturedRequest(1.0, "/predict", "application/json", b"first"))
+    recorder.close()
+    # A crash in the middle of the next record leaves a partial header behind
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 5)
+
+    recorder = TrafficRecorder(str(path))
+    recorder.record(CapturedRequest(2.0, "/predict", "application/json", b"second"))
+    recorder.close()
+    assert [r.body for r in read_capture(str(path))] == [b"first", b"second"]
+    assert recorder.written_bytes == path.stat().st_size
+    assert [[r.body for r in s] for s in read_sessions(str(path))] == [[b"first"], [b"second"]]
+
+
+def test_sessions_are_sorted_by_arrival(tmp_path):
+    path = tmp_path / "traffic.cap"
+    recorder = TrafficRecorder(str(path))
+    # A slow upload finishes after a later, smaller request
+    recorder.record(CapturedRequest(2.0, "/predict", "", b"late"))
+    recorder.record(CapturedRequest(1.0, "/predict", "", b"early"))
+    recorder.close()
+    assert [r.body for r in read_capture(str(path))] == [b"late", b"early"]
+    assert [[r.body for r in s] for s in read_sessions(str(path))] == [[b"early", b"late"]]
+
+
+def test_foreign_file_is_rejected_and_closed(tmp_path, monkeypatch):
+    path = tmp_path / "traffic.cap"
+    path.write_bytes(b"not a capture")
+    opened = []
+
+    def tracking_open(*args, **kwargs):
+        opened.append(open(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(capture, "open", tracking_open, raising=False)
+    with pytest.raises(ValueError):
+        TrafficRecorder(str(path))
+    assert opened and all(f.closed for f in opened)
+    assert path.read_bytes() == b"not a capture"
+
+
+def test_full_queue_drops_instead_of_growing(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path / "traffic.cap"), max_queue=1)
+    recorder._queue.put(None)  # stop the writer so nothing drains
+    recorder._thread.join()
+    recorder.record(CapturedRequest(1.0, "/predict", "", b"a"))
+    recorder.record(CapturedRequest(2.0, "/predict", "", b"b"))
+    assert recorder.stats()["dropped"] == 1 and recorder._queue.qsize() == 1
+
+
+def test_write_error_stops_capture_without_killing_writer(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path / "traffic.cap"))
+
+    class BrokenFile:
+        def write(self, data):
+            raise OSError(28, "No space left on device")
+
+        def close(self):
+            pass
+
+    recorder._file = BrokenFile()
+    recorder.record(CapturedRequest(1.0, "/predict", "", b"a"))
+    recorder.record(CapturedRequest(2.0, "/predict", "", b"b"))
+    recorder.close()
+    stats = recorder.stats()
+    assert "No space left" in stats["error"]
+    assert stats["dropped"] == 2 and stats["captured"] == 0
+    assert not recorder.sampled()
@@ -1,5 +1,10 @@
+import asyncio
 import types
+
+import httpx
+
 import load_generator
+from capture import MAGIC, SESSION_PATH, CapturedRequest, write_record
 
 
 class DummyResponse:
@@ -40,3 +45,47 @@ def test_load_generator_runs_without_errors(monkeypatch):
 
     # If no exception, the test passes.
     assert True
+
+
+def test_replay_preserves_timing_and_payloads(tmp_path):
+    capture = tmp_path / "traffic.cap"
+    with open(capture, "wb") as f:
+        f.write(MAGIC)
+        for i, gap in enumerate([0.0, 0.2, 0.4]):
+            write_record(f, CapturedRequest(1000.0 + gap, "/predict", "application/octet-stream", bytes([i]) * 4))
+
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.url.path, request.headers["content-type"], request.content))
+        return httpx.Response(200, json={"prediction": 0})
+
+    summary = asyncio.run(load_generator.replay(
+        "http://fake-host:8002/ignored", str(capture), speed=2.0, transport=httpx.MockTransport(handler)
+    ))
+    assert summary["requests"] == 3
+    assert summary["statuses"] == {"200": 3}
+    assert summary["captured_duration_sec"] == 0.4
+    assert summary["replay_duration_sec"] >= 0.2  # 0.4s of gaps at 2x
+    assert seen[1] == ("/predict", "application/octet-stream", b"\x01" * 4)
+
+
+def test_replay_skips_downtime_between_sessions(tmp_path):
+    capture = tmp_path / "traffic.cap"
+    with open(capture, "wb") as f:
+        f.write(MAGIC)
+        for session_start in [1000.0, 90000.0]:  # a day of downtime in between
+            write_record(f, CapturedRequest(session_start, SESSION_PATH, "", b""))
+            for gap in [0.0, 0.1]:
+                write_record(f, CapturedRequest(session_start + gap, "/predict", "", b"x"))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200)
+
+    summary = asyncio.run(load_generator.replay(
+        "http://fake-host:8002", str(capture), limit=3, transport=httpx.MockTransport(handler)
+    ))
+    assert summary["requests"] == 3
+    assert summary["captured_duration_sec"] == 0.1
+    assert summary["replay_duration_sec"] < 5
+    assert summary["max_send_lag_ms"] >= 0
@@ -0,0 +1,59 @@
+import io
+import json
+import logging
+
+import numpy as np
+
+from logging_setup import (JsonFormatter, LazyQueueHandler, RouteSampler, parse_sample_rates,
+                           setup_logging, truncate)
+
+
+def _record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_truncate_payloads():
+    assert truncate(np.arange(20, dtype="<f4"), 4) == [0.0, 1.0, 2.0, 3.0, "...(+16 more)"]
+    assert truncate([1, 2, 3], 4) == [1, 2, 3]
+    assert truncate("x" * 100, 4).endswith("...(+68 chars)")
+    assert truncate(7, 4) == 7
+
+
+def test_json_formatter_includes_extra_fields():
+    line = JsonFormatter(max_items=2).format(_record(route="/predict", features=np.ones(5)))
+    entry = json.loads(line)
+    assert entry["msg"] == "hello world"
+    assert entry["route"] == "/predict"
+    assert entry["features"] == [1.0, 1.0, "...(+3 more)"]
+
+
+def test_lazy_queue_handler_does_not_format():
+    record = _record()
+    prepared = LazyQueueHandler(None).prepare(record)
+    assert prepared.msg == "hello %s"
+    assert prepared.args == ("world",)
+
+
+def test_route_sampler():
+    sampler = RouteSampler({"/predict": 0.0, "/health": 1.0})
+    assert not sampler.filter(_record(route="/predict"))
+    assert sampler.filter(_record(level=logging.WARNING, route="/predict"))
+    assert sampler.filter(_record(route="/health"))
+    assert sampler.filter(_record())
+    assert parse_sample_rates("/predict=0.01, /health=0") == {"/predict": 0.01, "/health": 0.0}
+
+
+def test_queued_logging_writes_json_lines():
+    stream = io.StringIO()
+    listener = setup_logging(sample_rates={"/health": 0.0}, stream=stream)
+    try:
+        log = logging.getLogger("lab-2.2-free")
+        log.info("kept", extra={"route": "/predict"})
+        log.info("dropped", extra={"route": "/health"})
+        listener.stop()  # drains the queue
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line["msg"] for line in lines] == ["kept"]
+    finally:
+        setup_logging()
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+import main
+from profiler import SamplingProfiler, to_collapsed, to_svg
+
+client = TestClient(main.app)
+
+
+def busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_sees_other_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        stacks = SamplingProfiler().sample(seconds=0.2, hz=200)
+    finally:
+        stop.set()
+        worker.join()
+    busy = [s for s in stacks if s.startswith("busy-worker;") and "busy_loop (test_profiler.py" in s]
+    assert busy
+    assert sum(stacks[s] for s in busy) >= 10
+
+
+def test_collapsed_and_svg_output():
+    stacks = {"MainThread;main (a.py:1);work (a.py:9)": 3, "MainThread;main (a.py:1);<lambda> (b.py:2)": 1}
+    assert to_collapsed(stacks).splitlines() == [
+        "MainThread;main (a.py:1);<lambda> (b.py:2) 1",
+        "MainThread;main (a.py:1);work (a.py:9) 3",
+    ]
+    svg = to_svg(stacks)
+    assert svg.startswith("<svg") and svg.endswith("</svg>")
+    assert "&lt;lambda&gt;" in svg
+    assert "work (a.py:9) (3 samples, 75.0%)" in svg
+
+
+@pytest.fixture
+def debug_headers(monkeypatch):
+    monkeypatch.setattr(main, "DEBUG_TOKEN", "s3cret")
+    return {"X-Debug-Token": "s3cret"}
+
+
+def test_profile_endpoint_needs_debug_token(monkeypatch):
+    assert client.get("/debug/profile", params={"seconds": 0.1}).status_code == 404
+    monkeypatch.setattr(main, "DEBUG_TOKEN", "s3cret")
+    assert client.get("/debug/profile", params={"seconds": 0.1}).status_code == 403
+    r = client.get("/debug/profile", params={"seconds": 0.1}, headers={"X-Debug-Token": "nope"})
+    assert r.status_code == 403
+
+
+def test_profile_endpoint(debug_headers):
+    r = client.get("/debug/profile", params={"seconds": 0.1, "hz": 100}, headers=debug_headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert r.text.strip()
+
+    r = client.get("/debug/profile", params={"seconds": 0.1, "format": "svg"}, headers=debug_headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/svg+xml"
+
+
+def test_profile_endpoint_guards(debug_headers):
+    assert client.get("/debug/profile", params={"seconds": 3600}, headers=debug_headers).status_code == 400
+    assert client.get("/debug/profile", params={"seconds": 1, "hz": 0}, headers=debug_headers).status_code == 400
+    assert main.profiler.try_start()
+    try:
+        assert client.get("/debug/profile", params={"seconds": 0.1}, headers=debug_headers).status_code == 409
+    finally:
+        main.profiler.release()
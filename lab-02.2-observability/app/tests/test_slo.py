@@ -0,0 +1,72 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from slo import SLOTracker, parse_thresholds
+
+client = TestClient(main.app)
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_sli_and_burn_rate():
+    clock = FakeClock()
+    tracker = SLOTracker(availability_target=0.99, latency_target=0.9,
+                         latency_thresholds_ms=[100, 50], clock=clock)
+    for i in range(100):
+        tracker.record(latency_ms=75 if i < 20 else 10, ok=i >= 2)
+    window = tracker.report()["windows"]["5m"]
+    assert window["requests"] == 100
+    assert window["availability"] == pytest.approx(0.98)
+    assert window["availability_burn_rate"] == pytest.approx(2.0)
+    assert window["latency"] == {"50ms": pytest.approx(0.8), "100ms": 1.0}
+    assert window["latency_burn_rate"]["50ms"] == pytest.approx(2.0)
+
+
+def test_windows_roll_and_buckets_reset():
+    clock = FakeClock()
+    tracker = SLOTracker(clock=clock)
+    tracker.record(10, ok=False)
+    clock.now += 600  # 10 minutes later
+    tracker.record(10, ok=True)
+
+    report = tracker.report()["windows"]
+    assert report["5m"]["requests"] == 1
+    assert report["5m"]["errors"] == 0
+    assert report["1h"]["requests"] == 2
+
+    clock.now += 6 * 3600  # same ring slots come around again
+    tracker.record(10, ok=True)
+    assert tracker.report()["windows"]["6h"]["requests"] == 1
+
+
+def test_empty_window_has_no_sli():
+    window = SLOTracker(clock=FakeClock()).report()["windows"]["1h"]
+    assert window["availability"] is None
+    assert window["availability_burn_rate"] is None
+
+
+def test_fast_burn_pages():
+    tracker = SLOTracker(clock=FakeClock())
+    for i in range(100):
+        tracker.record(10, ok=i >= 5)  # 5% errors: 50x burn for a 99.9% target
+    alerts = tracker.report()["alerts"]
+    assert {"page", "ticket"} <= {a["severity"] for a in alerts}
+    assert all(a["sli"] == "availability" for a in alerts)
+
+
+def test_parse_thresholds():
+    assert parse_thresholds("50, 100,250") == [50.0, 100.0, 250.0]
+
+
+def test_slo_endpoint_and_metrics():
+    client.post("/predict", json={"features": [1, 2, 3]})
+    report = client.get("/slo").json()
+    assert report["windows"]["5m"]["requests"] >= 1
+    assert 'slo_burn_rate{sli="availability",window="5m"}' in client.get("/metrics").text
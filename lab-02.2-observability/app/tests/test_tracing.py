@@ -0,0 +1,93 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import main
+from tracing import Trace, Tracer, _current, span, to_otlp
+
+client = TestClient(main.app)
+
+
+def test_span_is_noop_without_trace():
+    with span("parse"):
+        pass
+    assert _current.get() is None
+
+
+def test_span_records_into_current_trace():
+    trace = Trace("/predict")
+    token = _current.set(trace)
+    try:
+        with span("inference", features=3):
+            pass
+    finally:
+        _current.reset(token)
+    assert [s[0] for s in trace.spans] == ["inference"]
+    assert trace.spans[0][3] == {"features": 3}
+
+
+def test_tail_sampling_keeps_slow_and_errors():
+    tracer = Tracer(slow_ms=50.0, keep_rate=0.0)
+    assert tracer.start("/health") is None
+
+    fast = tracer.start("/predict")
+    tracer.finish(fast, 200)
+    assert len(tracer.buffer) == 0
+
+    failed = tracer.start("/predict")
+    tracer.finish(failed, 503)
+    assert list(tracer.buffer) == [failed]
+
+    tracer.slow_ms = 0.0
+    tracer.finish(tracer.start("/predict"), 200)
+    assert len(tracer.buffer) == 2
+
+
+def test_ring_buffer_is_bounded():
+    tracer = Tracer(capacity=3, slow_ms=0.0)
+    for _ in range(10):
+        tracer.finish(tracer.start("/predict"), 200)
+    assert len(tracer.buffer) == 3
+    assert tracer.stats()["kept"] == 10
+
+
+def test_otlp_export(tmp_path):
+    tracer = Tracer(slow_ms=0.0)
+    trace = tracer.start("/predict")
+    trace.spans.append(("parse", trace.start_ns, trace.start_ns + 1000, {"bytes": 12}))
+    tracer.finish(trace, 200)
+
+    result = tracer.export(str(tmp_path))
+    assert result["traces"] == 1
+    with open(result["path"]) as f:
+        spans = json.load(f)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root, child = spans
+    assert root["traceId"] == child["traceId"] == trace.trace_id
+    assert child["parentSpanId"] == root["spanId"]
+    assert child["attributes"] == [{"key": "bytes", "value": {"intValue": "12"}}]
+    assert to_otlp([])["resourceSpans"][0]["scopeSpans"][0]["spans"] == []
+
+
+def test_debug_traces_endpoint():
+    main.tracer.slow_ms = 0.0
+    try:
+        client.post("/predict", json={"features": [1, 2, 3]})
+        body = client.get("/debug/traces", params={"min_ms": 0}).json()
+    finally:
+        main.tracer.slow_ms = 100.0
+    names = [s["name"] for s in body["traces"][0]["spans"]]
+    assert names == ["read", "parse", "inference", "serialize"]
+    otlp = client.get("/debug/traces", params={"min_ms": 0, "format": "otlp"}).json()
+    assert otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+
+def test_trace_export_requires_debug_token(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "TRACE_EXPORT_DIR", str(tmp_path))
+    assert client.post("/debug/traces/export").status_code == 404
+
+    monkeypatch.setattr(main, "DEBUG_TOKEN", "s3cret")
+    assert client.post("/debug/traces/export").status_code == 403
+    assert client.post("/debug/traces/export", headers={"X-Debug-Token": "wrong"}).status_code == 403
+    r = client.post("/debug/traces/export", headers={"X-Debug-Token": "s3cret"})
+    assert r.status_code == 200
+    assert r.json()["path"].startswith(str(tmp_path))
@@ -0,0 +1,209 @@
+import json
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+SERVICE_NAME = "lab-2.2-free"
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+
+class Trace:
+    """One request: a root server span plus child spans for each phase."""
+
+    __slots__ = ("trace_id", "name", "start_ns", "end_ns", "status", "spans")
+
+    def __init__(self, name: str):
+        self.trace_id = os.urandom(16).hex()
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status = 0
+        self.spans: List[tuple] = []  # (name, start_ns, end_ns, attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 3),
+            "spans": [
+                {
+                    "name": name,
+                    "offset_ms": round((start - self.start_ns) / 1e6, 3),
+                    "duration_ms": round((end - start) / 1e6, 3),
+                    **({"attributes": attrs} if attrs else {}),
+                }
+                for name, start, end, attrs in self.spans
+            ],
+        }
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a phase of the current request; a no-op when it is not being traced."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.time_ns()
+    try:
+        yield
+    finally:
+        trace.spans.append((name, start, time.time_ns(), attributes))
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(traces: List[Trace], service_name: str = SERVICE_NAME) -> dict:
+    """OTLP/JSON ExportTraceServiceRequest, loadable by collectors and Jaeger/Tempo tooling."""
+    spans = []
+    for trace in traces:
+        root_id = os.urandom(8).hex()
+        spans.append({
+            "traceId": trace.trace_id,
+            "spanId": root_id,
+            "name": trace.name,
+            "kind": SPAN_KIND_SERVER,
+            "startTimeUnixNano": str(trace.start_ns),
+            "endTimeUnixNano": str(trace.end_ns),
+            "attributes": _otlp_attributes({"http.response.status_code": trace.status}),
+            # STATUS_CODE_ERROR for 5xx, otherwise UNSET
+            "status": {"code": 2 if trace.status >= 500 else 0},
+        })
+        for name, start, end, attrs in trace.spans:
+            spans.append({
+                "traceId": trace.trace_id,
+                "spanId": os.urandom(8).hex(),
+                "parentSpanId": root_id,
+                "name": name,
+                "kind": SPAN_KIND_INTERNAL,
+                "startTimeUnixNano": str(start),
+                "endTimeUnixNano": str(end),
+                "attributes": _otlp_attributes(attrs),
+            })
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+            "scopeSpans": [{"scope": {"name": "lab-2.2-tracing"}, "spans": spans}],
+        }]
+    }
+
+
+class Tracer:
+    """
+    Keeps recent request traces in a bounded ring buffer.
+
+    Head sampling (`head_rate`) decides up front whether a request is traced
+    at all. Tail sampling decides afterwards whether a traced request is
+    kept: slow (>= `slow_ms`) and 5xx traces always are, fast successful
+    ones only with probability `keep_rate`. The buffer is a deque with
+    maxlen, so appends are atomic under the GIL and old traces fall off
+    without any locking.
+    """
+
+    def __init__(self, capacity: int = 1000, head_rate: float = 1.0, slow_ms: float = 100.0,
+                 keep_rate: float = 0.01, routes=("/predict",)):
+        self.buffer: deque = deque(maxlen=capacity)
+        self.head_rate = head_rate
+        self.slow_ms = slow_ms
+        self.keep_rate = keep_rate
+        self.routes = set(routes)
+        self.traced = 0
+        self.kept = 0
+
+    def start(self, path: str) -> Optional[Trace]:
+        if path not in self.routes or (self.head_rate < 1.0 and random.random() >= self.head_rate):
+            return None
+        self.traced += 1
+        return Trace(path)
+
+    def finish(self, trace: Trace, status: int) -> None:
+        trace.end_ns = time.time_ns()
+        trace.status = status
+        if status >= 500 or trace.duration_ms >= self.slow_ms or random.random() < self.keep_rate:
+            self.buffer.append(trace)
+            self.kept += 1
+
+    def recent(self, min_ms: float = 0.0, limit: int = 20) -> List[Trace]:
+        """Slowest traces first among those at least `min_ms` long."""
+        traces = [t for t in list(self.buffer) if t.duration_ms >= min_ms]
+        traces.sort(key=lambda t: t.duration_ms, reverse=True)
+        return traces[:limit]
+
+    def export(self, directory: str) -> dict:
+        """Write every buffered trace to an OTLP/JSON file and return where it went."""
+        traces = list(self.buffer)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"traces-{time.time_ns()}.json")
+        with open(path, "w") as f:
+            json.dump(to_otlp(traces), f)
+        return {"path": path, "traces": len(traces)}
+
+    def stats(self) -> dict:
+        return {
+            "traced": self.traced,
+            "kept": self.kept,
+            "buffered": len(self.buffer),
+            "capacity": self.buffer.maxlen,
+            "head_rate": self.head_rate,
+            "slow_ms": self.slow_ms,
+            "keep_rate": self.keep_rate,
+        }
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware that opens a trace per sampled request."""
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace = self.tracer.start(scope["path"])
+        if trace is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _current.set(trace)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self.tracer.finish(trace, status)
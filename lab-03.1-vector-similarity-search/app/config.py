@@ -5,6 +5,30 @@ class Settings(BaseSettings):
     app_host: str = "0.0.0.0"
     app_port: int = 8000
 
+    # "qdrant" (external service) or "numpy" (in-process, memory-mapped)
+    vector_backend: str = "qdrant"
+    vector_store_dir: str = "./vector_store"
+    # numpy backend: "flat" (exact) or "ivf" (approximate, built after ingest)
+    vector_index: str = "flat"
+    ivf_nlist: int = 0  # 0 = about 2 * sqrt(n)
+    ivf_nprobe: int = 8
+    ivf_min_points: int = 10000
+    # First-pass vector codes: "none", "int8" (4x smaller) or "binary" (32x smaller);
+    # the best limit * rescore_oversample candidates are rescored at full precision
+    quantization: str = "none"
+    rescore_oversample: int = 4
+
+    # Embeddings keyed by content hash, reused across ingests ("" disables)
+    embedding_cache_dir: str = "./embedding_cache"
+    # Streaming ingest: documents per embedding batch, threads upserting finished batches
+    ingest_batch_size: int = 256
+    ingest_upsert_workers: int = 2
+    # BM25 index for mode=lexical/hybrid searches, kept in step by /ingest
+    lexical_index_dir: str = "./lexical_index"
+    # In-memory LRU entries for /search: query -> embedding, request -> hits (0 disables)
+    query_embedding_cache_size: int = 1024
+    search_result_cache_size: int = 1024
+
     qdrant_url: str = "http://localhost:6333"
     qdrant_collection: str = "runbooks"
 
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, Collection, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Disk cache of embeddings keyed by a hash of (model name, text).
+
+    Layout under `<directory>/<model>/`:
+      meta.json    model name and vector dim
+      keys.txt     one sha256 hex key per line, row-aligned with vectors.f32
+      vectors.f32  float32 rows, append-only
+
+    Both data files are append-only, so adding a batch costs only that
+    batch. Vectors are written before their keys. On open, both files are
+    cut back to the rows complete in both (whole vector, whole key line),
+    and every append starts at the end of that consistent prefix, so a
+    crash or failed write mid-append never maps a key to the wrong vector.
+    A different model gets its own directory, so its entries are never
+    mixed up with another model's.
+
+    Superseded rows (texts no longer in the corpus) stay until compact()
+    rewrites the live ones, once they are more than `compact_ratio` of
+    the file.
+    """
+
+    def __init__(self, directory: str, model_name: str, compact_ratio: float = 0.5):
+        self.model_name = model_name
+        self.compact_ratio = compact_ratio
+        self.path = Path(directory) / re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+        self.dim: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self._row_of: Dict[str, int] = {}
+        # Consistent prefix of the data files: rows in vectors.f32, bytes in keys.txt
+        self._rows = 0
+        self._key_bytes = 0
+        self._matrix: Optional[np.ndarray] = None
+        if (self.path / "meta.json").exists():
+            self._open()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def _open(self) -> None:
+        self.dim = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))["dim"]
+        raw = (self.path / "keys.txt").read_bytes()
+        # Only newline-terminated lines are complete keys
+        lines = raw[: raw.rfind(b"\n") + 1].splitlines(keepends=True)
+        rows = min(len(lines), (self.path / "vectors.f32").stat().st_size // (self.dim * 4))
+        self._rows = rows
+        self._key_bytes = sum(len(line) for line in lines[:rows])
+        self._truncate()
+        self._row_of = {line.decode("ascii").strip(): row for row, line in enumerate(lines[:rows])}
+
+    def _truncate(self) -> None:
+        # Drop anything past the consistent prefix (a partial or unmatched row or key)
+        os.truncate(self.path / "vectors.f32", self._rows * self.dim * 4)
+        os.truncate(self.path / "keys.txt", self._key_bytes)
+
+    def _vectors(self) -> np.ndarray:
+        # Re-mapped lazily after appends; the memmap only covers complete rows
+        if self._matrix is None or len(self._matrix) < self._rows:
+            self._matrix = np.memmap(
+                self.path / "vectors.f32", dtype=np.float32, mode="r", shape=(self._rows, self.dim)
+            )
+        return self._matrix
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def _append(self, keys: List[str], vectors: np.ndarray) -> None:
+        if self.dim is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.dim = vectors.shape[1]
+            (self.path / "meta.json").write_text(
+                json.dumps({"model": self.model_name, "dim": self.dim}), encoding="utf-8"
+            )
+            # Truncate leftovers from a crash before meta.json was written
+            open(self.path / "vectors.f32", "wb").close()
+            open(self.path / "keys.txt", "w").close()
+        lines = "".join(k + "\n" for k in keys).encode("ascii")
+        # Also clears whatever an earlier failed append in this process left behind
+        self._truncate()
+        with open(self.path / "vectors.f32", "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.path / "keys.txt", "ab") as f:
+            f.write(lines)
+        for row, key in enumerate(keys, start=self._rows):
+            self._row_of[key] = row
+        self._rows += len(keys)
+        self._key_bytes += len(lines)
+
+    def embed(self, texts: Sequence[str], embed_fn: Callable[[List[str]], Sequence]) -> np.ndarray:
+        """Embeddings for `texts` (n x dim float32); only cache misses are sent to `embed_fn`."""
+        keys = [self.key(t) for t in texts]
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in self._row_of and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = np.asarray(embed_fn(list(missing.values())), dtype=np.float32)
+            self._append(list(missing), vectors)
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        if not keys:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return np.asarray(self._vectors()[[self._row_of[k] for k in keys]])
+
+    def compact(self, live_keys: Collection[str]) -> int:
+        """
+        Drop rows whose key is not in `live_keys` if they are more than
+        `compact_ratio` of all rows; returns the number of rows dropped.
+
+        The live rows are written to temporary files first. meta.json is
+        removed while the data files are swapped, so a crash at any point
+        leaves either the old cache, the new one or an empty cache, never
+        keys paired with the wrong vectors.
+        """
+        live = [(key, row) for key, row in self._row_of.items() if key in live_keys]
+        dead = self._rows - len(live)
+        if dead <= self.compact_ratio * self._rows:
+            return 0
+        live.sort(key=lambda item: item[1])
+        keys = [key for key, _ in live]
+        vectors = np.asarray(self._vectors()[[row for _, row in live]])
+        lines = "".join(k + "\n" for k in keys).encode("ascii")
+        (self.path / "vectors.f32.tmp").write_bytes(vectors.tobytes())
+        (self.path / "keys.txt.tmp").write_bytes(lines)
+
+        meta = (self.path / "meta.json").read_bytes()
+        os.remove(self.path / "meta.json")
+        self._matrix = None
+        os.replace(self.path / "vectors.f32.tmp", self.path / "vectors.f32")
+        os.replace(self.path / "keys.txt.tmp", self.path / "keys.txt")
+        (self.path / "meta.json").write_bytes(meta)
+
+        self._row_of = {key: row for row, key in enumerate(keys)}
+        self._rows = len(keys)
+        self._key_bytes = len(lines)
+        return dead
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
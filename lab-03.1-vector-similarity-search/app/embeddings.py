@@ -8,18 +8,25 @@ from sentence_transformers import SentenceTransformer
 class EmbeddingModel:
     def __init__(self, model_name: str):
         self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        # Uncased tokenizers lowercase their input, so query case cannot change the
+        # embedding and the query cache may fold it; unknown means cased
+        self.lowercases = bool(getattr(self.model.tokenizer, "do_lower_case", False))
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def embed_texts(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """(len(texts), dimension) float32 array, straight from the encoder."""
         # normalize_embeddings improves cosine similarity behavior
         vectors = self.model.encode(
             texts,
+            batch_size=batch_size,
             normalize_embeddings=True,
             convert_to_numpy=True,
             show_progress_bar=False,
         )
         if not isinstance(vectors, np.ndarray):
             vectors = np.asarray(vectors)
-        return vectors.astype("float32").tolist()
+        # No-op when the encoder already returned float32
+        return vectors.astype(np.float32, copy=False)
 
-    def embed_one(self, text: str) -> List[float]:
+    def embed_one(self, text: str) -> np.ndarray:
         return self.embed_texts([text])[0]
\ No newline at end of file
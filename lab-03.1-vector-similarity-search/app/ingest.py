@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from app.embedding_cache import EmbeddingCache
+from app.lexical import FILTER_FIELDS, BM25Index
+from app.vector_store import VectorStore
+
+# Fixed namespace: the same doc_id maps to the same point id on every run and machine
+ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "ai-agents-for-devops/lab-03.1/runbooks")
+PAYLOAD_FIELDS = ("title", "service", "severity", "content")
+
+
+def point_id(doc_id: str) -> str:
+    """Stable point id for a document (a UUID, which both backends accept)."""
+    return str(uuid.uuid5(ID_NAMESPACE, doc_id))
+
+
+def document_text(doc: Dict[str, Any]) -> str:
+    return f"{doc['title']}\n{doc['content']}"
+
+
+def content_hash(doc: Dict[str, Any]) -> str:
+    fields = {key: doc.get(key) for key in PAYLOAD_FIELDS}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """One document per line; the file is read incrementally, never whole."""
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}:{lineno}: invalid JSON ({exc.msg})") from None
+
+
+def iter_documents(path: str) -> Iterator[Dict[str, Any]]:
+    if path.endswith(".jsonl"):
+        return iter_jsonl(path)
+    with open(path, encoding="utf-8") as f:
+        return iter(json.load(f))
+
+
+def _batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def sync_documents(
+    docs: Iterable[Dict[str, Any]],
+    embedder: Any,
+    store: VectorStore,
+    cache: Optional[EmbeddingCache] = None,
+    batch_size: int = 256,
+    upsert_workers: int = 2,
+    max_pending: int = 4,
+    delete_missing: bool = True,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    lexical: Optional[BM25Index] = None,
+) -> Dict[str, Any]:
+    """
+    Make the collection match `docs`, touching only what changed.
+
+    Each point stores the content hash of its document. Documents whose
+    hash matches are skipped; new or edited ones are embedded (through the
+    cache, so an edit to severity alone costs no model time) and upserted;
+    points whose doc_id is gone are deleted. Re-running on an unchanged
+    corpus reads the stored hashes and does nothing else.
+
+    `docs` is consumed as a stream in batches of `batch_size`. The encoder
+    runs on the calling thread while up to `max_pending` earlier batches are
+    upserted by `upsert_workers` threads, so memory holds a few batches of
+    documents and vectors, plus one id -> hash entry per stored point.
+    doc_ids are expected to be unique; with delete_missing=False, points
+    absent from `docs` are kept (for appending a partial file).
+
+    `lexical`, if given, is kept in step with the collection (documents it
+    is missing are added even when their vectors are unchanged), then
+    compiled and saved at the end if anything changed. With delete_missing,
+    `cache` is compacted to the texts of `docs` once enough of it is stale.
+    """
+    t0 = time.perf_counter()
+    store.ensure_collection(embedder.dimension)
+    stored = {pid: p.get("content_hash") for pid, p in store.payloads_by_id(fields=("content_hash",)).items()}
+    stats = {"read": 0, "inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0, "embedded": 0,
+             "upserted": 0}
+    seen = set()
+    # Cache keys of every current text, for compaction: only a full corpus knows what is stale
+    live_keys = set()
+    track_live = cache is not None and delete_missing
+
+    def report() -> None:
+        if progress is not None:
+            elapsed = time.perf_counter() - t0
+            progress({**stats, "elapsed_s": round(elapsed, 2),
+                      "docs_per_sec": round(stats["read"] / elapsed, 1) if elapsed else None})
+
+    def upsert(ids: List[str], vectors: Any, payloads: List[Dict[str, Any]]) -> int:
+        store.upsert_arrays(ids, vectors, payloads)
+        return len(ids)
+
+    pending: Deque[Future] = deque()
+
+    def settle(limit: int) -> None:
+        # Collect finished upserts (surfacing their errors), waiting while more than `limit` are in flight
+        while pending and (len(pending) > limit or pending[0].done()):
+            stats["upserted"] += pending.popleft().result()
+
+    with store.bulk(), ThreadPoolExecutor(max_workers=max(1, upsert_workers),
+                                          thread_name_prefix="ingest-upsert") as pool:
+        try:
+            for batch in _batches(docs, batch_size):
+                stats["read"] += len(batch)
+                changed = []
+                for doc in batch:
+                    pid = point_id(doc["id"])
+                    seen.add(pid)
+                    if track_live:
+                        live_keys.add(cache.key(document_text(doc)))
+                    digest = content_hash(doc)
+                    previous = stored.get(pid, False)
+                    if lexical is not None and (previous != digest or pid not in lexical):
+                        lexical.add(pid, document_text(doc), {f: doc.get(f) for f in FILTER_FIELDS})
+                    if previous == digest:
+                        stats["unchanged"] += 1
+                        continue
+                    stats["inserted" if previous is False else "updated"] += 1
+                    changed.append((pid, doc, digest))
+
+                if changed:
+                    texts = [document_text(doc) for _, doc, _ in changed]
+                    if cache is not None:
+                        misses = cache.misses
+                        vectors = cache.embed(texts, embedder.embed_texts)
+                        stats["embedded"] += cache.misses - misses
+                    else:
+                        vectors = embedder.embed_texts(texts)
+                        stats["embedded"] += len(texts)
+                    payloads = [
+                        {**{key: doc[key] for key in PAYLOAD_FIELDS}, "doc_id": doc["id"], "content_hash": digest}
+                        for _, doc, digest in changed
+                    ]
+                    settle(max_pending - 1)
+                    pending.append(pool.submit(upsert, [pid for pid, _, _ in changed], vectors, payloads))
+                report()
+            settle(0)
+        finally:
+            for future in pending:
+                future.cancel()
+
+        if delete_missing:
+            removed = [pid for pid in stored if pid not in seen]
+            for chunk in _batches(removed, 4096):
+                store.delete_points(chunk)
+            stats["deleted"] = len(removed)
+            if lexical is not None:
+                for pid in [pid for pid in lexical.docs if pid not in seen]:
+                    lexical.remove(pid)
+            if track_live:
+                cache.compact(live_keys)
+    index = store.build_index()
+    if lexical is not None:
+        lexical.commit()
+    report()
+
+    return {
+        **{key: stats[key] for key in ("inserted", "updated", "deleted", "unchanged", "embedded")},
+        "index": index,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000.0, 2),
+    }
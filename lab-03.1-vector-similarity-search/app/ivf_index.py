@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iters: int = 10, seed: int = 0) -> np.ndarray:
+    """k-means on the unit sphere: assign by dot product, re-normalize centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        # Per-cluster sums via sort + reduceat (np.add.at is unbuffered and slow)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=k)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        sums = np.zeros_like(centroids)
+        nonempty = counts > 0
+        sums[nonempty] = np.add.reduceat(vectors[order], starts[nonempty], axis=0)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty clusters from random points so nlist stays as asked
+            sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = (sums / np.maximum(norms, 1e-12)).astype(np.float32)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file (IVF-Flat) index over L2-normalized vectors.
+
+    Vectors are clustered into `nlist` lists with spherical k-means. The
+    index holds only the centroids and each list's row ids; a query scores
+    the centroids, gathers the rows of the `nprobe` best lists from the
+    caller's matrix and ranks those candidates exactly. nprobe trades recall
+    for speed: each list holds about n / nlist vectors.
+
+    Not copying the vectors keeps the index at 8 bytes per vector instead of
+    a second float32 matrix, at the cost of a gather instead of contiguous
+    slices. The matrix passed to search() must be the one it was built on.
+
+    Saved as .npy files and memory-mapped on load, so opening a large index
+    costs no copying.
+    """
+
+    FILES = ("centroids", "offsets", "rows")
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, rows: np.ndarray):
+        self.centroids = centroids  # (nlist, dim)
+        self.offsets = offsets  # (nlist + 1,) list i is [offsets[i], offsets[i + 1])
+        self.rows = rows  # row id of each vector, in list order
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def count(self) -> int:
+        return len(self.rows)
+
+    @staticmethod
+    def default_nlist(n: int) -> int:
+        return max(1, min(n // 39, int(2 * math.sqrt(n))))
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, nlist: Optional[int] = None, iters: int = 10,
+              seed: int = 0, max_train: int = 128) -> "IVFIndex":
+        n = len(vectors)
+        nlist = min(nlist or cls.default_nlist(n), n)
+        # Train on a sample (max_train points per list is plenty), then assign everything
+        rng = np.random.default_rng(seed)
+        train = vectors
+        if n > nlist * max_train:
+            train = vectors[np.sort(rng.choice(n, size=nlist * max_train, replace=False))]
+        centroids = spherical_kmeans(np.asarray(train, dtype=np.float32), nlist, iters, seed)
+
+        assign = np.empty(n, dtype=np.int64)
+        for start in range(0, n, 65536):  # bounded temporary (chunk x nlist)
+            block = vectors[start:start + 65536]
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        rows = np.argsort(assign, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=nlist), out=offsets[1:])
+        return cls(centroids, offsets, rows)
+
+    def search(self, query: np.ndarray, vectors: np.ndarray, k: int, nprobe: int = 8,
+               allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k (rows, scores) of `vectors` among the nprobe closest lists;
+        `allowed` is a row mask.
+        """
+        nprobe = min(nprobe, self.nlist)
+        centroid_scores = self.centroids @ query
+        lists = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        candidates = np.concatenate([self.rows[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+        if allowed is not None:
+            candidates = candidates[allowed[candidates]]
+        # Ascending rows read a memory-mapped matrix front to back
+        candidates.sort()
+        scores = vectors[candidates] @ query
+
+        k = min(k, len(scores))
+        if k == 0:
+            return candidates[:0], scores[:0]
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return candidates[top], scores[top]
+
+    def save(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / "index.json").unlink(missing_ok=True)
+        # Indexes before row-id-only lists kept their own copy of the vectors
+        (directory / "vectors.npy").unlink(missing_ok=True)
+        for name in self.FILES:
+            # New file + rename: a previous index may still be memory-mapped,
+            # and truncating a mapped file in place would crash its readers
+            tmp = directory / f"{name}.tmp.npy"
+            np.save(tmp, getattr(self, name))
+            os.replace(tmp, directory / f"{name}.npy")
+        (directory / "index.json").write_text(
+            json.dumps({"type": "ivf-flat", "nlist": self.nlist, "count": self.count}),
+            encoding="utf-8",
+        )
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional["IVFIndex"]:
+        if not (directory / "index.json").exists():
+            return None
+        arrays = [np.load(directory / f"{name}.npy", mmap_mode="r") for name in cls.FILES]
+        return cls(*arrays)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Identifier-friendly: "ERR-1042", "db.pool", "http_requests_total" and "p95"
+# stay whole tokens; their parts are indexed too, so "1042" or "requests" match
+TOKEN = re.compile(r"[a-z0-9_]+(?:[.\-:/][a-z0-9_]+)*")
+PART = re.compile(r"[.\-:/_]")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how if in into is it its of on or that the this to was "
+    "were what when where which why with".split()
+)
+FILTER_FIELDS = ("service", "severity")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for match in TOKEN.findall(text.lower()):
+        if match in STOPWORDS:
+            continue
+        tokens.append(match)
+        parts = PART.split(match)
+        if len(parts) > 1:
+            tokens.extend(p for p in parts if p and p not in STOPWORDS)
+    return tokens
+
+
+class BM25Index:
+    """
+    In-process BM25 inverted index, kept next to the vectors.
+
+    Documents are added and removed one by one during ingest (term counts
+    per document, persisted as JSON). compile() then turns them into one
+    posting array per term, holding rows and precomputed BM25 weights.
+    The weights depend only on the corpus, so a query just concatenates
+    the postings of its terms and sums them per row (np.bincount). Its cost
+    follows the postings it touches, not the corpus size.
+
+    Searches use the last compiled snapshot, which compile() swaps in with a
+    single assignment, so an ingest never disturbs in-flight queries.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.2, b: float = 0.75,
+                 common_cutoff: float = 0.1):
+        self.path = Path(path) if path else None
+        self.k1 = k1
+        self.b = b
+        self.common_cutoff = common_cutoff
+        # id -> (term counts, token count, filterable fields)
+        self.docs: Dict[Hashable, Tuple[Dict[str, int], int, Dict[str, Any]]] = {}
+        self._snapshot: Optional[dict] = None
+        self._dirty = False
+        if self.path is not None and self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.docs = {pid: (tf, length, attrs) for pid, tf, length, attrs in data["docs"]}
+            self.compile()
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def __contains__(self, pid: Hashable) -> bool:
+        return pid in self.docs
+
+    def add(self, pid: Hashable, text: str, attrs: Optional[Dict[str, Any]] = None) -> None:
+        tokens = tokenize(text)
+        self.docs[pid] = (dict(Counter(tokens)), len(tokens), attrs or {})
+        self._dirty = True
+
+    def remove(self, pid: Hashable) -> None:
+        if self.docs.pop(pid, None) is not None:
+            self._dirty = True
+
+    def commit(self) -> None:
+        """Compile and persist pending adds/removes (no-op when nothing changed)."""
+        if self._dirty or self._snapshot is None:
+            self.compile()
+            self.save()
+            self._dirty = False
+
+    def compile(self) -> None:
+        ids = list(self.docs)
+        lengths = np.array([self.docs[pid][1] for pid in ids], dtype=np.float32)
+        avgdl = float(lengths.mean()) if len(ids) else 0.0
+        gathered: Dict[str, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+        for row, pid in enumerate(ids):
+            for term, tf in self.docs[pid][0].items():
+                rows, tfs = gathered[term]
+                rows.append(row)
+                tfs.append(tf)
+
+        n = len(ids)
+        norm = self.k1 * (1.0 - self.b + self.b * lengths / max(avgdl, 1e-9))
+        postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, (rows, tfs) in gathered.items():
+            rows_arr = np.asarray(rows, dtype=np.int32)
+            tf = np.asarray(tfs, dtype=np.float32)
+            idf = math.log(1.0 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+            postings[term] = (rows_arr, (idf * tf * (self.k1 + 1.0) / (tf + norm[rows_arr])).astype(np.float32))
+
+        columns = {}
+        for field in FILTER_FIELDS:
+            column = np.empty(n, dtype=object)
+            column[:] = [self.docs[pid][2].get(field) for pid in ids]
+            columns[field] = column
+        self._snapshot = {"ids": ids, "postings": postings, "columns": columns}
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(
+            json.dumps({"k1": self.k1, "b": self.b,
+                        "docs": [[pid, tf, length, attrs] for pid, (tf, length, attrs) in self.docs.items()]}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _accumulate(lists: List[Tuple[np.ndarray, np.ndarray]], n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Sum per-row weights over several postings: (rows, scores)."""
+        if len(lists) == 1:
+            return lists[0]
+        rows = np.concatenate([r for r, _ in lists])
+        weights = np.concatenate([w for _, w in lists])
+        if len(rows) * 8 > n:
+            # Long postings: accumulate densely, O(postings + n) and no sort
+            dense = np.bincount(rows, weights=weights, minlength=n)
+            nonzero = np.flatnonzero(dense)
+            return nonzero, dense[nonzero]
+        unique, inverse = np.unique(rows, return_inverse=True)
+        return unique, np.bincount(inverse, weights=weights)
+
+    def search(self, query: str, limit: int = 10,
+               filters: Optional[Dict[str, Any]] = None) -> List[Tuple[Hashable, float]]:
+        """Top (id, bm25 score) pairs, best first; filters are exact matches on FILTER_FIELDS."""
+        snap = self._snapshot
+        if snap is None:
+            return []
+        lists = [snap["postings"][t] for t in set(tokenize(query)) if t in snap["postings"]]
+        if not lists:
+            return []
+        # Common-terms split (as in Lucene's CommonTermsQuery): terms in more than
+        # common_cutoff of the docs never pick candidates when a rarer term is in the
+        # query; they only add their weight to the rare terms' candidates, found by
+        # binary search. Their huge postings are never scanned.
+        cutoff = self.common_cutoff * len(snap["ids"])
+        rare = [pl for pl in lists if len(pl[0]) <= cutoff]
+        common = [pl for pl in lists if len(pl[0]) > cutoff] if rare else []
+        rows, scores = self._accumulate(rare or lists, len(snap["ids"]))
+        for term_rows, term_weights in common:
+            pos = np.minimum(np.searchsorted(term_rows, rows), len(term_rows) - 1)
+            scores = scores + np.where(term_rows[pos] == rows, term_weights[pos], 0.0)
+        if filters:
+            keep = np.ones(len(rows), dtype=bool)
+            for key, value in filters.items():
+                column = snap["columns"].get(key)
+                keep &= (column[rows] == value) if column is not None else False
+            rows, scores = rows[keep], scores[keep]
+
+        k = min(limit, len(rows))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        ids = snap["ids"]
+        return [(ids[r], float(s)) for r, s in zip(rows[top].tolist(), scores[top].tolist())]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], weights: Sequence[float],
+                           k: int = 60) -> List[Tuple[Hashable, float]]:
+    """
+    Weighted RRF: score(d) = sum_i weights[i] / (k + rank_i(d)), ranks from 1.
+    Only ranks matter, so cosine and BM25 scores never need calibrating
+    against each other; k damps the advantage of the very top ranks.
+    """
+    fused: Dict[Hashable, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        if weight <= 0:
+            continue
+        for rank, pid in enumerate(ranking, start=1):
+            fused[pid] += weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import importlib
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+from app.config import Settings
+from app.embedding_cache import EmbeddingCache
+from app.lexical import BM25Index
+from app.vector_store import build_store, store_modules
+
+log = logging.getLogger(__name__)
+
+# Imported on the loader thread so uvicorn can bind and answer /health
+# before torch / sentence-transformers (and qdrant-client) have finished loading.
+HEAVY_MODULES = ("sentence_transformers",)
+
+
+class ComponentLoader:
+    """Builds the embedder and vector store in the background behind a readiness gate."""
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.status = "starting"  # starting -> importing -> loading -> ready | failed
+        self.error: Optional[str] = None
+        self.embedder: Any = None
+        self.store: Any = None
+        self.cache: Optional[EmbeddingCache] = None
+        self.lexical: Optional[BM25Index] = None
+        self.import_profile: List[Dict[str, Any]] = []
+        self.import_time_s: Optional[float] = None
+        self.load_time_s: Optional[float] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._load, name="component-loader", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def _timed_import(self, name: str) -> ModuleType:
+        # Cumulative time: the module plus every dependency it pulls in,
+        # same meaning as the "cumulative" column of `python -X importtime`.
+        modules_before = len(sys.modules)
+        t0 = time.perf_counter()
+        module = importlib.import_module(name)
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        self.import_profile.append(
+            {
+                "module": name,
+                "cumulative_ms": round(elapsed_ms, 2),
+                "modules_loaded": len(sys.modules) - modules_before,
+            }
+        )
+        log.info("Imported %s in %.0fms", name, elapsed_ms)
+        return module
+
+    def _load(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            self.status = "importing"
+            for name in HEAVY_MODULES + store_modules(self.settings):
+                self._timed_import(name)
+            embeddings = self._timed_import("app.embeddings")
+            self.import_time_s = time.perf_counter() - t0
+
+            self.status = "loading"
+            self.embedder = embeddings.EmbeddingModel(self.settings.embed_model)
+            self.store = build_store(self.settings)
+            if self.settings.embedding_cache_dir:
+                self.cache = EmbeddingCache(self.settings.embedding_cache_dir, self.settings.embed_model)
+            self.lexical = BM25Index(
+                str(Path(self.settings.lexical_index_dir) / f"{self.settings.qdrant_collection}.json")
+            )
+            self.load_time_s = time.perf_counter() - t0
+            self.status = "ready"
+            self._ready.set()
+            log.info("components ready in %.2fs", self.load_time_s)
+        except Exception as exc:
+            self.status = "failed"
+            self.error = str(exc)
+            log.exception("component loading failed")
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "import_time_s": round(self.import_time_s, 3) if self.import_time_s else None,
+            "load_time_s": round(self.load_time_s, 3) if self.load_time_s else None,
+            "imports": sorted(
+                self.import_profile, key=lambda m: m["cumulative_ms"], reverse=True
+            ),
+        }
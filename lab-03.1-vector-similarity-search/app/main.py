@@ -1,28 +1,61 @@
 from __future__ import annotations
 
-import json
+import threading
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field, model_validator
 
 from app.config import settings
-from app.embeddings import EmbeddingModel
-from app.qdrant_store import QdrantVectorStore
-from qdrant_client.http import models as rest
+from app.ingest import iter_documents, sync_documents
+from app.lexical import reciprocal_rank_fusion
+from app.loader import ComponentLoader
+from app.query_cache import QueryCache, normalize_query
+from app.vector_store import SearchSpec
 
 DATA_PATH = Path(__file__).parent / "data" / "runbooks.json"
 
-app = FastAPI(title="Lab 03.1 - Vector Similarity Search API", version="1.0.0")
+# The embedding model and vector store are built on a background thread so the
+# server binds and answers /health immediately; /ready gates real traffic.
+components = ComponentLoader(settings)
+query_cache = QueryCache(settings.query_embedding_cache_size, settings.search_result_cache_size)
+# One sync at a time: the embedding cache files, the lexical index and the
+# store's diff are not safe to update from two requests at once.
+ingest_lock = threading.Lock()
 
-embedder = EmbeddingModel(settings.embed_model)
-store = QdrantVectorStore(settings.qdrant_url, settings.qdrant_collection)
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    components.start()
+    yield
+
+
+app = FastAPI(
+    title="Lab 03.1 - Vector Similarity Search API", version="1.0.0", lifespan=lifespan
+)
+
+
+def require_components() -> Tuple[Any, Any]:
+    if not components.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=f"components not ready (status={components.status})",
+        )
+    return components.embedder, components.store
 
 
 class IngestResponse(BaseModel):
     collection: str
     inserted: int
+    updated: int
+    deleted: int
+    unchanged: int
+    embedded: int  # texts sent to the model (embedding cache misses)
+    index: Dict[str, Any]
+    elapsed_ms: float
 
 
 class SearchRequest(BaseModel):
@@ -31,6 +64,23 @@ class SearchRequest(BaseModel):
     score_threshold: Optional[float] = Field(default=None, ge=0.0, le=1.0)
     service: Optional[str] = None
     severity: Optional[str] = None
+    # ANN tuning: more lists / a wider beam = higher recall, slower search
+    nprobe: Optional[int] = Field(default=None, ge=1, le=4096, description="IVF lists to scan (numpy backend)")
+    ef_search: Optional[int] = Field(default=None, ge=1, le=4096, description="HNSW beam width (qdrant backend)")
+    exact: bool = False
+    # "lexical" is BM25 only; "hybrid" fuses the vector and BM25 rankings with weighted RRF
+    mode: Literal["vector", "lexical", "hybrid"] = "vector"
+    vector_weight: float = Field(default=1.0, ge=0.0, le=10.0)
+    lexical_weight: float = Field(default=1.0, ge=0.0, le=10.0)
+    rrf_k: int = Field(default=60, ge=1, le=1000)
+    candidates: int = Field(default=50, ge=1, le=200, description="hits per ranking fed into fusion")
+
+    @model_validator(mode="after")
+    def threshold_needs_cosine(self) -> "SearchRequest":
+        # BM25 and RRF scores are on other scales: a cosine cutoff means nothing there
+        if self.score_threshold is not None and self.mode != "vector":
+            raise ValueError("score_threshold is a cosine threshold and only applies to mode='vector'")
+        return self
 
 
 class SearchHit(BaseModel):
@@ -45,73 +95,73 @@ class SearchHit(BaseModel):
 class SearchResponse(BaseModel):
     query: str
     top_k: int
+    score_type: Literal["cosine", "bm25", "rrf"]  # scores of different types are not comparable
     hits: List[SearchHit]
 
 
+class BatchSearchRequest(BaseModel):
+    queries: List[SearchRequest] = Field(..., min_length=1, max_length=64)
+
+
+class BatchSearchResponse(BaseModel):
+    results: List[SearchResponse]  # same order as the request's queries
+
+
 @app.get("/health")
 def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def ready() -> JSONResponse:
+    body = {"ready": components.ready, "status": components.status}
+    return JSONResponse(body, status_code=200 if components.ready else 503)
+
+
+@app.get("/startup-profile")
+def startup_profile() -> Dict[str, Any]:
+    return components.report()
+
+
 @app.post("/ingest", response_model=IngestResponse)
 def ingest() -> IngestResponse:
+    embedder, store = require_components()
+
     if not DATA_PATH.exists():
         raise HTTPException(status_code=500, detail="runbooks.json not found")
 
-    runbooks: List[Dict[str, Any]] = json.loads(DATA_PATH.read_text(encoding="utf-8"))
-    texts = [f"{rb['title']}\n{rb['content']}" for rb in runbooks]
-
-    vectors = embedder.embed_texts(texts)
-    vector_size = len(vectors[0])
-    store.ensure_collection(vector_size)
-
-    points: List[rest.PointStruct] = []
-    for idx, (rb, v) in enumerate(zip(runbooks, vectors), start=1):
-        payload = {
-            "title": rb["title"],
-            "service": rb["service"],
-            "severity": rb["severity"],
-            "content": rb["content"],
-        }
-        points.append(
-            rest.PointStruct(
-                id=idx,
-                vector=v,
-                payload={**payload, "doc_id": rb["id"]},
-            )
+    if not ingest_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="an ingest is already running")
+    try:
+        result = sync_documents(
+            iter_documents(str(DATA_PATH)),
+            embedder,
+            store,
+            components.cache,
+            batch_size=settings.ingest_batch_size,
+            upsert_workers=settings.ingest_upsert_workers,
+            lexical=components.lexical,
         )
+    finally:
+        ingest_lock.release()
+    if result["inserted"] or result["updated"] or result["deleted"]:
+        query_cache.bump()
+    return IngestResponse(collection=store.collection, **result)
 
-    store.upsert_points(points)
-    return IngestResponse(collection=settings.qdrant_collection, inserted=len(points))
-
-
-@app.post("/search", response_model=SearchResponse)
-def search(req: SearchRequest) -> SearchResponse:
-    qvec = embedder.embed_one(req.query)
 
-    conditions: List[rest.FieldCondition] = []
+def _filters(req: SearchRequest) -> Optional[Dict[str, Any]]:
+    filters: Dict[str, Any] = {}
     if req.service:
-        conditions.append(
-            rest.FieldCondition(
-                key="service", match=rest.MatchValue(value=req.service)
-            )
-        )
+        filters["service"] = req.service
     if req.severity:
-        conditions.append(
-            rest.FieldCondition(
-                key="severity", match=rest.MatchValue(value=req.severity)
-            )
-        )
+        filters["severity"] = req.severity
+    return filters or None
 
-    filter_ = rest.Filter(must=conditions) if conditions else None
 
-    results = store.search(
-        query_vector=qvec,
-        limit=req.top_k,
-        score_threshold=req.score_threshold,
-        filter_=filter_,
-    )
+SCORE_TYPES = {"vector": "cosine", "lexical": "bm25", "hybrid": "rrf"}
 
+
+def _response(req: SearchRequest, results: List[Dict[str, Any]]) -> SearchResponse:
     hits: List[SearchHit] = []
     for r in results:
         p = r["payload"]
@@ -125,5 +175,106 @@ def search(req: SearchRequest) -> SearchResponse:
                 content=str(p.get("content", "")),
             )
         )
+    return SearchResponse(query=req.query, top_k=req.top_k, score_type=SCORE_TYPES[req.mode], hits=hits)
+
+
+def _fold_case(embedder: Any) -> bool:
+    # Case-insensitive cache keys only when the model cannot tell the difference
+    return bool(getattr(embedder, "lowercases", False))
+
+
+def _result_key(req: SearchRequest, fold_case: bool) -> tuple:
+    return query_cache.result_key(
+        normalize_query(req.query, fold_case), req.top_k, req.score_threshold, req.service, req.severity,
+        req.nprobe, req.ef_search, req.exact, req.mode, req.vector_weight, req.lexical_weight,
+        req.rrf_k, req.candidates,
+    )
+
+
+def _spec(req: SearchRequest) -> SearchSpec:
+    return SearchSpec(
+        limit=req.top_k if req.mode == "vector" else max(req.top_k, req.candidates),
+        score_threshold=req.score_threshold,
+        filters=_filters(req),
+        nprobe=req.nprobe,
+        ef_search=req.ef_search,
+        exact=req.exact,
+    )
+
+
+def _rank(req: SearchRequest, vector_results: List[Dict[str, Any]], store: Any) -> List[Dict[str, Any]]:
+    """Final hits for the request's mode, given its vector hits (empty in lexical mode)."""
+    if req.mode == "vector":
+        return vector_results
+    lexical = []
+    if components.lexical is not None:
+        lexical = components.lexical.search(req.query, max(req.top_k, req.candidates), _filters(req))
+    if req.mode == "lexical":
+        ranked = lexical[: req.top_k]
+    else:
+        ranked = reciprocal_rank_fusion(
+            [[r["id"] for r in vector_results], [pid for pid, _ in lexical]],
+            [req.vector_weight, req.lexical_weight],
+            k=req.rrf_k,
+        )[: req.top_k]
+
+    payloads = {r["id"]: r["payload"] for r in vector_results}
+    missing = [pid for pid, _ in ranked if pid not in payloads]
+    if missing:
+        payloads.update(store.payloads_by_id(ids=missing))
+    return [{"id": pid, "score": score, "payload": payloads[pid]} for pid, score in ranked if pid in payloads]
+
+
+@app.post("/search", response_model=SearchResponse)
+def search(req: SearchRequest) -> SearchResponse:
+    embedder, store = require_components()
+
+    fold_case = _fold_case(embedder)
+    key = _result_key(req, fold_case)
+    results = query_cache.results.get(key)
+    if results is None:
+        vector_results: List[Dict[str, Any]] = []
+        if req.mode != "lexical":
+            qvec = query_cache.embed([req.query], embedder.embed_texts, fold_case)[0]
+            spec = _spec(req)
+            vector_results = store.search(
+                query_vector=qvec,
+                limit=spec.limit,
+                score_threshold=spec.score_threshold,
+                filters=spec.filters,
+                nprobe=spec.nprobe,
+                ef_search=spec.ef_search,
+                exact=spec.exact,
+            )
+        results = _rank(req, vector_results, store)
+        query_cache.results.put(key, results)
+    return _response(req, results)
+
+
+@app.post("/search/batch", response_model=BatchSearchResponse)
+def search_batch(req: BatchSearchRequest) -> BatchSearchResponse:
+    embedder, store = require_components()
+
+    fold_case = _fold_case(embedder)
+    keys = [_result_key(q, fold_case) for q in req.queries]
+    results = [query_cache.results.get(key) for key in keys]
+    todo = [i for i, r in enumerate(results) if r is None]
+    vector_results: Dict[int, List[Dict[str, Any]]] = {i: [] for i in todo}
+    embed = [i for i in todo if req.queries[i].mode != "lexical"]
+    if embed:
+        # One encoder pass for the uncached queries, then one batched store query
+        qvecs = query_cache.embed([req.queries[i].query for i in embed], embedder.embed_texts, fold_case)
+        found = store.search_batch(qvecs, [_spec(req.queries[i]) for i in embed])
+        vector_results.update(zip(embed, found))
+    for i in todo:
+        results[i] = _rank(req.queries[i], vector_results[i], store)
+        query_cache.results.put(keys[i], results[i])
+    return BatchSearchResponse(results=[_response(q, r) for q, r in zip(req.queries, results)])
+
 
-    return SearchResponse(query=req.query, top_k=req.top_k, hits=hits)
+@app.get("/cache/stats")
+def cache_stats() -> Dict[str, Any]:
+    out = query_cache.stats()
+    if components.cache is not None:
+        out["ingest_embeddings"] = components.cache.stats()
+    return out
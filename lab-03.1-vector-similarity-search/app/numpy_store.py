@@ -0,0 +1,444 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.ivf_index import IVFIndex
+from app.quantization import QUANTIZATIONS, QuantizedVectors
+from app.vector_store import Point, SearchSpec
+
+
+def _write_json(path: Path, data: Any) -> None:
+    # Write-then-rename so a crash never leaves half a file behind
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class _ReadWriteLock:
+    """
+    Many readers or one writer. A waiting writer holds off new readers, so a
+    steady stream of searches cannot starve an ingest. Not reentrant.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class NumpyVectorStore:
+    """
+    In-process exact cosine search over a memory-mapped float32 matrix.
+
+    Layout under `<directory>/<collection>/`:
+      vectors.f32    rows of L2-normalized float32, capacity x dim (grows 2x)
+      meta.json      dim, count, capacity
+      payloads.json  point ids and payloads, row-aligned with the matrix
+
+    Vectors are normalized on upsert, so cosine similarity is a single
+    matrix-vector product; top-k uses argpartition (O(n)) and only sorts
+    the k winners. Filters are exact matches on payload fields.
+
+    With index_type="ivf", build_index() adds an IVF index under `ivf/`
+    once there are at least `index_min_points` vectors. Searches then scan
+    only `nprobe` lists. Any upsert makes the index stale, and searches fall
+    back to exact until it is rebuilt.
+
+    With quantization="int8" or "binary", build_index() also writes compact
+    codes under `quantized/` (see QuantizedVectors). Searches without an IVF
+    index then scan the codes and rescore the best `limit * rescore_oversample`
+    candidates against the float32 rows. exact=True always scans float32.
+
+    Thread safety: writes (upsert, delete, resize, compaction) take an
+    exclusive lock, and searches a shared one, so a search never sees a
+    half-applied write. Searches still run concurrently with each other.
+    """
+
+    def __init__(self, directory: str, collection: str, initial_capacity: int = 1024,
+                 index_type: str = "flat", nlist: int = 0, nprobe: int = 8,
+                 index_min_points: int = 10000, quantization: str = "none",
+                 rescore_oversample: int = 4):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATIONS}")
+        self.collection = collection
+        self.path = Path(directory) / collection
+        self.initial_capacity = initial_capacity
+        self.index_type = index_type
+        self.nlist = nlist or None
+        self.nprobe = nprobe
+        self.index_min_points = index_min_points
+        self.index: Optional[IVFIndex] = None
+        self.quantization = quantization
+        self.rescore_oversample = rescore_oversample
+        self.quantized: Optional[QuantizedVectors] = None
+        self.dim: Optional[int] = None
+        self.count = 0
+        self.capacity = 0
+        self.ids: List[Any] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self._matrix: Optional[np.memmap] = None
+        self._row_of: Dict[Any, int] = {}
+        self._columns: Dict[str, np.ndarray] = {}
+        # Searches share it; upserts, deletes and bulk() saves hold it exclusively
+        self._lock = _ReadWriteLock()
+        # One derived-structure build at a time (it runs under the shared lock)
+        self._build_lock = threading.Lock()
+        self._bulk_depth = 0
+        self._dirty = False
+        if (self.path / "meta.json").exists():
+            self._open()
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The live rows (a view into the memory map, no copy)."""
+        if self._matrix is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self._matrix[: self.count]
+
+    def _open(self) -> None:
+        meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        self.dim, self.count = meta["dim"], meta["count"]
+        self.capacity = meta["capacity"]
+        self._matrix = np.memmap(
+            self.path / "vectors.f32", dtype=np.float32, mode="r+", shape=(self.capacity, self.dim)
+        )
+        data = json.loads((self.path / "payloads.json").read_text(encoding="utf-8"))
+        self.ids, self.payloads = data["ids"], data["payloads"]
+        self._row_of = {pid: row for row, pid in enumerate(self.ids)}
+        if self.index_type == "ivf":
+            index = IVFIndex.load(self.path / "ivf")
+            self.index = index if index is not None and index.count == self.count else None
+        if self.quantization != "none":
+            quantized = QuantizedVectors.load(self.path / "quantized")
+            if quantized is not None and quantized.kind == self.quantization and quantized.count == self.count:
+                self.quantized = quantized
+
+    def _resize(self, capacity: int) -> None:
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        with open(self.path / "vectors.f32", "a+b") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._matrix = np.memmap(
+            self.path / "vectors.f32", dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+        )
+        self.capacity = capacity
+
+    @contextmanager
+    def bulk(self) -> Iterator[None]:
+        """Upserts/deletes inside the block skip the per-call save; it happens once at the end."""
+        with self._lock.write():
+            self._bulk_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock.write():
+                self._bulk_depth -= 1
+                if not self._bulk_depth and self._dirty:
+                    self._save()
+
+    def _save(self) -> None:
+        # payloads.json is rewritten whole, so a streaming ingest defers it to the end of bulk()
+        if self._bulk_depth:
+            self._dirty = True
+            return
+        self._dirty = False
+        self._matrix.flush()
+        _write_json(self.path / "payloads.json", {"ids": self.ids, "payloads": self.payloads})
+        _write_json(
+            self.path / "meta.json",
+            {"dim": self.dim, "count": self.count, "capacity": self.capacity},
+        )
+
+    def ensure_collection(self, vector_size: int) -> None:
+        with self._lock.write():
+            self._ensure_collection(vector_size)
+
+    def _ensure_collection(self, vector_size: int) -> None:
+        if self.dim is not None:
+            if self.dim != vector_size:
+                raise ValueError(
+                    f"Collection '{self.collection}' exists with vector size {self.dim}, "
+                    f"but model produces {vector_size}. Use a new collection name."
+                )
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = vector_size
+        self._resize(self.initial_capacity)
+        self._save()
+
+    def upsert_points(self, points: List[Point]) -> None:
+        if not points:
+            return
+        self.upsert_arrays(
+            [p.id for p in points],
+            np.asarray([p.vector for p in points], dtype=np.float32),
+            [p.payload for p in points],
+        )
+
+    def upsert_arrays(self, ids: Sequence[Any], vectors: np.ndarray,
+                      payloads: Sequence[Dict[str, Any]]) -> None:
+        """Columnar upsert: row i of `vectors` (n x dim) is point ids[i] with payloads[i]."""
+        with self._lock.write():
+            self._upsert_arrays(ids, vectors, payloads)
+
+    def _upsert_arrays(self, ids: Sequence[Any], vectors: np.ndarray,
+                       payloads: Sequence[Dict[str, Any]]) -> None:
+        if self.dim is None:
+            raise ValueError(f"Collection '{self.collection}' does not exist; call ensure_collection first")
+        if not len(ids):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        rows = np.empty(len(ids), dtype=np.int64)
+        for i, (pid, payload) in enumerate(zip(ids, payloads)):
+            row = self._row_of.get(pid)
+            if row is None:
+                row = len(self.ids)
+                self._row_of[pid] = row
+                self.ids.append(pid)
+                self.payloads.append(payload)
+            else:
+                self.payloads[row] = payload
+            rows[i] = row
+
+        if len(self.ids) > self.capacity:
+            capacity = self.capacity
+            while capacity < len(self.ids):
+                capacity *= 2
+            self._resize(capacity)
+        norms = np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        first = int(rows[0])
+        if np.all(np.diff(rows) == 1):
+            # Contiguous rows (the usual append): normalize straight into the map, no temporary
+            np.divide(vectors, norms, out=self._matrix[first:first + len(rows)])
+        else:
+            self._matrix[rows] = vectors / norms
+        self.count = len(self.ids)
+        self._columns.clear()
+        self._invalidate_index()
+        self._save()
+
+    def delete_points(self, ids: Sequence[Any]) -> None:
+        with self._lock.write():
+            self._delete_points(ids)
+
+    def _delete_points(self, ids: Sequence[Any]) -> None:
+        rows = sorted({self._row_of[pid] for pid in ids if pid in self._row_of})
+        if not rows:
+            return
+        keep = np.ones(self.count, dtype=bool)
+        keep[rows] = False
+        kept = np.flatnonzero(keep)
+        # Rows before the first deleted one stay put; only the tail is compacted
+        tail = kept[kept > rows[0]]
+        self._matrix[rows[0]:rows[0] + len(tail)] = self._matrix[tail]
+        self.ids = [self.ids[row] for row in kept.tolist()]
+        self.payloads = [self.payloads[row] for row in kept.tolist()]
+        self._row_of = {pid: row for row, pid in enumerate(self.ids)}
+        self.count = len(self.ids)
+        self._columns.clear()
+        self._invalidate_index()
+        self._save()
+
+    def payloads_by_id(self, fields: Optional[Sequence[str]] = None,
+                       ids: Optional[Sequence[Any]] = None) -> Dict[Any, Dict[str, Any]]:
+        with self._lock.read():
+            if ids is None:
+                pairs = zip(self.ids, self.payloads)
+            else:
+                pairs = ((pid, self.payloads[self._row_of[pid]]) for pid in ids if pid in self._row_of)
+            if fields is None:
+                return dict(pairs)
+            return {pid: {k: p[k] for k in fields if k in p} for pid, p in pairs}
+
+    def _invalidate_index(self) -> None:
+        self.index = None
+        self.quantized = None
+        (self.path / "ivf" / "index.json").unlink(missing_ok=True)
+        (self.path / "quantized" / "quantized.json").unlink(missing_ok=True)
+
+    def build_index(self) -> Dict[str, Any]:
+        """Build whatever derived search structures are stale (IVF, quantized codes), persist and load them."""
+        # Shared lock: vectors cannot change underneath, and searches keep running
+        with self._build_lock, self._lock.read():
+            return self._build_index()
+
+    def _build_index(self) -> Dict[str, Any]:
+        info: Dict[str, Any] = {"index": "flat", "count": self.count}
+        if self.index_type == "ivf" and self.count >= self.index_min_points:
+            if self.index is None:
+                IVFIndex.build(self.vectors, nlist=self.nlist).save(self.path / "ivf")
+                self.index = IVFIndex.load(self.path / "ivf")
+            info.update(index="ivf", nlist=self.index.nlist)
+        if self.quantization != "none" and self.count:
+            if self.quantized is None:
+                QuantizedVectors.build(self.quantization, self.vectors).save(self.path / "quantized")
+                self.quantized = QuantizedVectors.load(self.path / "quantized")
+            info.update(quantization=self.quantization, quantized_mb=round(self.quantized.nbytes / 2**20, 2))
+        return info
+
+    def _column(self, key: str) -> np.ndarray:
+        # Payload field as an object array, built once per upsert for vectorized filtering
+        column = self._columns.get(key)
+        if column is None:
+            column = np.empty(self.count, dtype=object)
+            column[:] = [p.get(key) for p in self.payloads]
+            self._columns[key] = column
+        return column
+
+    def _filter_rows(self, filters: Dict[str, Any]) -> np.ndarray:
+        mask = np.ones(self.count, dtype=bool)
+        for key, value in filters.items():
+            mask &= self._column(key) == value
+        return np.flatnonzero(mask)
+
+    def search(
+        self,
+        query_vector: np.ndarray,
+        limit: int = 5,
+        score_threshold: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        exact: bool = False,
+    ) -> List[Dict[str, Any]]:
+        # ef_search is the Qdrant/HNSW knob; this backend uses nprobe
+        with self._lock.read():
+            return self._search(query_vector, limit, score_threshold, filters, nprobe, exact)
+
+    def _search(self, query_vector: np.ndarray, limit: int, score_threshold: Optional[float],
+                filters: Optional[Dict[str, Any]], nprobe: Optional[int], exact: bool) -> List[Dict[str, Any]]:
+        if not self.count:
+            return []
+        query = normalize(np.asarray(query_vector, dtype=np.float32))
+        if self.index is not None and not exact:
+            allowed = None
+            if filters:
+                allowed = np.zeros(self.count, dtype=bool)
+                allowed[self._filter_rows(filters)] = True
+            rows, scores = self.index.search(query, self.vectors, limit, nprobe or self.nprobe, allowed)
+            return self._hits(rows, scores, score_threshold)
+
+        rows = self._filter_rows(filters) if filters else None
+        if self.quantized is not None and not exact:
+            return self._rescored(query, rows, limit, score_threshold)
+        if rows is None:
+            scores = np.asarray(self.vectors @ query)
+        elif len(rows) * 2 > self.count:
+            # Broad filter: one product over everything beats gathering most rows
+            scores = np.asarray(self.vectors @ query)[rows]
+        else:
+            scores = self.vectors[rows] @ query
+        return self._top_k(scores, rows, limit, score_threshold)
+
+    def search_batch(self, query_vectors: np.ndarray, specs: Sequence[SearchSpec],
+                     chunk: int = 64) -> List[List[Dict[str, Any]]]:
+        """
+        Several queries at once. Queries that scan exactly share one matrix
+        product (m x n scores per chunk of m queries) instead of m passes over
+        the vectors; each then applies its own filters, threshold and limit.
+        Queries that can use the IVF index or quantized codes run one by one.
+        """
+        with self._lock.read():
+            return self._search_batch(query_vectors, specs, chunk)
+
+    def _search_batch(self, query_vectors: np.ndarray, specs: Sequence[SearchSpec],
+                      chunk: int) -> List[List[Dict[str, Any]]]:
+        results: List[List[Dict[str, Any]]] = [[] for _ in specs]
+        if not self.count or not len(specs):
+            return results
+        queries = normalize(np.asarray(query_vectors, dtype=np.float32))
+
+        exact = []
+        for i, spec in enumerate(specs):
+            if (self.index is not None or self.quantized is not None) and not spec.exact:
+                results[i] = self._search(queries[i], spec.limit, spec.score_threshold, spec.filters,
+                                          spec.nprobe, False)
+            else:
+                exact.append(i)
+
+        for start in range(0, len(exact), chunk):
+            batch = exact[start:start + chunk]
+            scores = np.asarray(queries[batch] @ self.vectors.T)  # (len(batch), count)
+            for row_scores, i in zip(scores, batch):
+                spec = specs[i]
+                rows = self._filter_rows(spec.filters) if spec.filters else None
+                if rows is not None:
+                    row_scores = row_scores[rows]
+                results[i] = self._top_k(row_scores, rows, spec.limit, spec.score_threshold)
+        return results
+
+    def _rescored(self, query: np.ndarray, rows: Optional[np.ndarray], limit: int,
+                  score_threshold: Optional[float]) -> List[Dict[str, Any]]:
+        # First pass on the compact codes, then exact cosine for a few candidates only
+        approx = self.quantized.scores(query, rows)
+        k = min(limit * self.rescore_oversample, len(approx))
+        if k == 0:
+            return []
+        candidates = np.argpartition(-approx, k - 1)[:k]
+        if rows is not None:
+            candidates = rows[candidates]
+        candidates.sort()  # ascending rows: sequential reads from the memory map
+        return self._top_k(self._matrix[candidates] @ query, candidates, limit, score_threshold)
+
+    def _top_k(self, scores: np.ndarray, rows: Optional[np.ndarray], limit: int,
+               score_threshold: Optional[float]) -> List[Dict[str, Any]]:
+        # scores[j] belongs to rows[j], or to row j when rows is None
+        k = min(limit, scores.shape[0])
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return self._hits(top if rows is None else rows[top], scores[top], score_threshold)
+
+    def _hits(self, rows: np.ndarray, scores: np.ndarray,
+              score_threshold: Optional[float]) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        for row, score in zip(rows.tolist(), scores.tolist()):
+            if score_threshold is not None and score < score_threshold:
+                break
+            out.append({"id": self.ids[row], "score": score, "payload": self.payloads[row]})
+        return out
@@ -1,14 +1,31 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, List, Optional, Sequence
+
+import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as rest
 
+from app.vector_store import Point, SearchSpec
+
 
 class QdrantVectorStore:
-    def __init__(self, url: str, collection: str):
+    def __init__(self, url: str, collection: str, quantization: str = "none", rescore_oversample: int = 4):
         self.client = QdrantClient(url=url)
         self.collection = collection
+        self.quantization = quantization
+        self.rescore_oversample = rescore_oversample
+
+    def _quantization_config(self) -> Optional[Any]:
+        # Quantized codes stay in RAM; Qdrant rescores with the original vectors
+        if self.quantization == "int8":
+            return rest.ScalarQuantization(
+                scalar=rest.ScalarQuantizationConfig(type=rest.ScalarType.INT8, quantile=0.999, always_ram=True)
+            )
+        if self.quantization == "binary":
+            return rest.BinaryQuantization(binary=rest.BinaryQuantizationConfig(always_ram=True))
+        return None
 
     def ensure_collection(self, vector_size: int) -> None:
         collections = self.client.get_collections().collections
@@ -22,6 +39,11 @@ class QdrantVectorStore:
                     f"Collection '{self.collection}' exists with vector size {existing_size}, "
                     f"but model produces {vector_size}. Use a new collection name."
                 )
+            if self.quantization != "none" and info.config.quantization_config is None:
+                # Qdrant builds the codes for existing points in the background
+                self.client.update_collection(
+                    collection_name=self.collection, quantization_config=self._quantization_config()
+                )
             return
 
         self.client.create_collection(
@@ -29,27 +51,144 @@ class QdrantVectorStore:
             vectors_config=rest.VectorParams(
                 size=vector_size,
                 distance=rest.Distance.COSINE,
+                # Full-precision vectors go to disk when quantized codes serve the first pass
+                on_disk=self.quantization != "none",
             ),
+            quantization_config=self._quantization_config(),
+        )
+
+    def upsert_points(self, points: List[Point]) -> None:
+        self.client.upsert(
+            collection_name=self.collection,
+            points=[
+                rest.PointStruct(id=p.id, vector=[float(x) for x in p.vector], payload=p.payload)
+                for p in points
+            ],
+        )
+
+    def upsert_arrays(self, ids: Sequence[Any], vectors: np.ndarray,
+                      payloads: Sequence[Dict[str, Any]], batch_size: int = 1024) -> None:
+        # Columnar Batch instead of one PointStruct per row; vectors become JSON
+        # lists only one batch at a time, right before they go over the wire
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            self.client.upsert(
+                collection_name=self.collection,
+                points=rest.Batch(
+                    ids=list(ids[start:end]),
+                    vectors=np.asarray(vectors[start:end], dtype=np.float32).tolist(),
+                    payloads=list(payloads[start:end]),
+                ),
+            )
+
+    def bulk(self) -> ContextManager[None]:
+        # Every upsert is already its own durable request; the client is thread-safe
+        return nullcontext()
+
+    def delete_points(self, ids: Sequence[Any]) -> None:
+        if not ids:
+            return
+        self.client.delete(
+            collection_name=self.collection,
+            points_selector=rest.PointIdsList(points=list(ids)),
+        )
+
+    def payloads_by_id(
+        self, fields: Optional[Sequence[str]] = None, ids: Optional[Sequence[Any]] = None
+    ) -> Dict[Any, Dict[str, Any]]:
+        # Only ids and the requested payload keys cross the wire, never vectors
+        with_payload: Any = rest.PayloadSelectorInclude(include=list(fields)) if fields is not None else True
+        if ids is not None:
+            records = self.client.retrieve(
+                collection_name=self.collection, ids=list(ids), with_payload=with_payload, with_vectors=False
+            )
+            return {r.id: r.payload or {} for r in records}
+
+        out: Dict[Any, Dict[str, Any]] = {}
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=self.collection,
+                limit=1000,
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=False,
+            )
+            for r in records:
+                out[r.id] = r.payload or {}
+            if offset is None:
+                return out
+
+    @staticmethod
+    def _filter(filters: Optional[Dict[str, Any]]) -> Optional[rest.Filter]:
+        if not filters:
+            return None
+        return rest.Filter(
+            must=[
+                rest.FieldCondition(key=key, match=rest.MatchValue(value=value))
+                for key, value in filters.items()
+            ]
         )
 
-    def upsert_points(self, points: List[rest.PointStruct]) -> None:
-        self.client.upsert(collection_name=self.collection, points=points)
+    def build_index(self) -> Dict[str, Any]:
+        # Qdrant maintains its HNSW graph itself as points are upserted
+        return {"index": "hnsw"}
 
     def search(
         self,
-        query_vector: List[float],
+        query_vector: np.ndarray,
         limit: int = 5,
         score_threshold: Optional[float] = None,
-        filter_: Optional[rest.Filter] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        exact: bool = False,
     ) -> List[Dict[str, Any]]:
+        # nprobe is the NumPy/IVF knob; Qdrant's HNSW uses ef_search (hnsw_ef)
         hits = self.client.search(
             collection_name=self.collection,
-            query_vector=query_vector,
+            query_vector=np.asarray(query_vector, dtype=np.float32).tolist(),
             limit=limit,
             score_threshold=score_threshold,
-            query_filter=filter_,
+            query_filter=self._filter(filters),
+            search_params=self._params(ef_search, exact),
             with_payload=True,
         )
+        return self._results(hits)
+
+    def search_batch(
+        self, query_vectors: np.ndarray, specs: Sequence[SearchSpec]
+    ) -> List[List[Dict[str, Any]]]:
+        # One round trip; Qdrant runs the requests together server-side
+        vectors = np.asarray(query_vectors, dtype=np.float32).tolist()
+        batches = self.client.search_batch(
+            collection_name=self.collection,
+            requests=[
+                rest.SearchRequest(
+                    vector=vector,
+                    limit=spec.limit,
+                    score_threshold=spec.score_threshold,
+                    filter=self._filter(spec.filters),
+                    params=self._params(spec.ef_search, spec.exact),
+                    with_payload=True,
+                )
+                for vector, spec in zip(vectors, specs)
+            ],
+        )
+        return [self._results(hits) for hits in batches]
+
+    def _params(self, ef_search: Optional[int], exact: bool) -> Optional[rest.SearchParams]:
+        quantization = None
+        if self.quantization != "none":
+            quantization = rest.QuantizationSearchParams(
+                rescore=True, oversampling=float(self.rescore_oversample)
+            )
+        if ef_search is None and not exact and quantization is None:
+            return None
+        return rest.SearchParams(hnsw_ef=ef_search, exact=exact, quantization=quantization)
+
+    @staticmethod
+    def _results(hits) -> List[Dict[str, Any]]:
         out: List[Dict[str, Any]] = []
         for h in hits:
             out.append(
@@ -59,4 +198,4 @@ class QdrantVectorStore:
                     "payload": h.payload or {},
                 }
             )
-        return out
\ No newline at end of file
+        return out
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+QUANTIZATIONS = ("none", "int8", "binary")
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def popcount64(x: np.ndarray) -> np.ndarray:
+    """Set bits per uint64 element (SWAR; numpy < 2.0 has no bitwise_count)."""
+    x = x - ((x >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return (x * _H01) >> np.uint64(56)
+
+
+def pack_bits(vectors: np.ndarray) -> np.ndarray:
+    """Sign bits, packed and zero-padded to whole uint64 words: (n, ceil(dim / 64))."""
+    packed = np.packbits(vectors > 0, axis=-1)
+    pad = (-packed.shape[-1]) % 8
+    if pad:
+        packed = np.pad(packed, [(0, 0)] * (packed.ndim - 1) + [(0, pad)])
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+class QuantizedVectors:
+    """
+    Compact copies of L2-normalized vectors for a first-pass scan.
+
+      int8    one signed byte per dimension, with one scale for the whole
+              collection (the 99.9th percentile |value| maps to 127):
+              4x smaller than float32
+      binary  one sign bit per dimension, scored by Hamming distance:
+              32x smaller
+
+    Approximate scores only pick candidates; the store rescores them
+    against the full-precision vectors. Codes are saved as .npy and loaded
+    into RAM, since they are the hot set, while the float32 matrix stays a
+    memory map that the rescoring step touches only for a few rows.
+    """
+
+    def __init__(self, kind: str, codes: np.ndarray, scale: float = 1.0):
+        self.kind = kind
+        self.codes = codes
+        self.scale = scale
+
+    @property
+    def count(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes)
+
+    @classmethod
+    def build(cls, kind: str, vectors: np.ndarray, chunk: int = 65536, seed: int = 0) -> "QuantizedVectors":
+        if kind == "binary":
+            codes = np.concatenate([pack_bits(vectors[s:s + chunk]) for s in range(0, len(vectors), chunk)])
+            return cls(kind, codes)
+        if kind != "int8":
+            raise ValueError(f"Unknown quantization '{kind}', expected one of {QUANTIZATIONS[1:]}")
+        rng = np.random.default_rng(seed)
+        sample = vectors if len(vectors) <= 10000 else vectors[np.sort(rng.choice(len(vectors), 10000, replace=False))]
+        # A high quantile rather than the max, so one outlier does not waste the range
+        scale = max(float(np.quantile(np.abs(sample), 0.999)), 1e-6) / 127.0
+        codes = np.empty(vectors.shape, dtype=np.int8)
+        for s in range(0, len(vectors), chunk):
+            block = np.rint(np.asarray(vectors[s:s + chunk]) / scale)
+            codes[s:s + chunk] = np.clip(block, -127, 127)
+        return cls(kind, codes, scale)
+
+    def scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None, chunk: int = 16384) -> np.ndarray:
+        """Approximate similarity of `query` to every row (or to `rows`); higher is closer."""
+        codes = self.codes if rows is None else self.codes[rows]
+        if self.kind == "binary":
+            distance = popcount64(codes ^ pack_bits(query[None, :])[0]).sum(axis=1, dtype=np.int32)
+            return -distance.astype(np.float32)
+        # BLAS has no int8 kernels: widen one bounded chunk at a time
+        out = np.empty(len(codes), dtype=np.float32)
+        q = query.astype(np.float32) * self.scale
+        for s in range(0, len(codes), chunk):
+            out[s:s + chunk] = codes[s:s + chunk].astype(np.float32) @ q
+        return out
+
+    def save(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / "quantized.json").unlink(missing_ok=True)
+        tmp = directory / "codes.tmp.npy"
+        np.save(tmp, self.codes)
+        os.replace(tmp, directory / "codes.npy")
+        (directory / "quantized.json").write_text(
+            json.dumps({"type": self.kind, "scale": self.scale, "count": self.count}), encoding="utf-8"
+        )
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional["QuantizedVectors"]:
+        if not (directory / "quantized.json").exists():
+            return None
+        meta = json.loads((directory / "quantized.json").read_text(encoding="utf-8"))
+        return cls(meta["type"], np.load(directory / "codes.npy"), meta["scale"])
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+
+def normalize_query(text: str, fold_case: bool = False) -> str:
+    """
+    Cache key for a query. Whitespace runs never change what a tokenizer
+    sees, so they are always collapsed. Case is folded only when asked:
+    right for an uncased model (all-MiniLM-L6-v2 lowercases its input),
+    wrong for a cased one, where "OOM" and "oom" embed differently.
+    """
+    text = " ".join(text.split())
+    return text.lower() if fold_case else text
+
+
+class LRUCache:
+    """Thread-safe LRU map bounded to `maxsize` entries (0 disables it)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class QueryCache:
+    """
+    Two cache levels in front of /search:
+
+      L1 embeddings: normalized query text -> embedding. A hit skips the model.
+                     The model always sees the original text.
+      L2 results:    full request (query, top_k, filters, knobs) -> store hits.
+                     A hit skips both the model and the store.
+
+    L2 keys carry the collection version. bump() (called when an ingest
+    changes the collection) moves to a new version and drops the old
+    results, so a search never returns hits from before an ingest.
+    Embeddings do not depend on the collection and survive ingests.
+    """
+
+    def __init__(self, embedding_size: int = 1024, result_size: int = 1024):
+        self.embeddings = LRUCache(embedding_size)
+        self.results = LRUCache(result_size)
+        self.version = 0
+
+    def bump(self) -> None:
+        self.version += 1
+        self.results.clear()
+
+    def result_key(self, *parts: Hashable) -> tuple:
+        # Take the key before searching: a result computed while an ingest
+        # lands is stored under the old version and is never served
+        return (self.version,) + parts
+
+    def embed(self, texts: Sequence[str], embed_fn: Callable[[List[str]], np.ndarray],
+              fold_case: bool = False) -> np.ndarray:
+        """
+        Embeddings for `texts`; only L1 misses go to `embed_fn`, in one call.
+        Pass fold_case=True only for an uncased model (see normalize_query).
+        """
+        keys = [normalize_query(t, fold_case) for t in texts]
+        vectors: List[Optional[np.ndarray]] = [self.embeddings.get(k) for k in keys]
+        # The model sees the original text (first occurrence per key); the
+        # normalized form is only the cache key
+        missing: Dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+        if missing:
+            # Copy rows so a cached vector does not pin the whole batch array
+            fresh = {
+                k: np.array(v, dtype=np.float32)
+                for k, v in zip(missing, embed_fn(list(missing.values())))
+            }
+            for key, vector in fresh.items():
+                self.embeddings.put(key, vector)
+            vectors = [fresh[k] if v is None else v for k, v in zip(keys, vectors)]
+        return np.stack(vectors)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "embeddings": self.embeddings.stats(),
+            "results": self.results.stats(),
+        }
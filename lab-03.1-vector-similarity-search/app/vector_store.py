@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, ContextManager, Dict, List, Optional, Protocol, Sequence
+
+import numpy as np
+
+from app.config import Settings
+
+VECTOR_BACKENDS = ("qdrant", "numpy")
+
+
+@dataclass
+class Point:
+    id: Any
+    vector: Sequence[float]
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class SearchSpec:
+    """Per-query options for search_batch; same meaning as the search() keywords."""
+
+    limit: int = 5
+    score_threshold: Optional[float] = None
+    filters: Optional[Dict[str, Any]] = None
+    nprobe: Optional[int] = None
+    ef_search: Optional[int] = None
+    exact: bool = False
+
+
+class VectorStore(Protocol):
+    """What main.py needs from a backend; filters are exact payload matches."""
+
+    collection: str
+
+    def ensure_collection(self, vector_size: int) -> None: ...
+
+    def upsert_points(self, points: List[Point]) -> None: ...
+
+    def upsert_arrays(self, ids: Sequence[Any], vectors: np.ndarray,
+                      payloads: Sequence[Dict[str, Any]]) -> None: ...
+
+    def delete_points(self, ids: Sequence[Any]) -> None: ...
+
+    def bulk(self) -> ContextManager[None]:
+        """Group many writes (possibly from several threads) into one load."""
+        ...
+
+    def payloads_by_id(
+        self, fields: Optional[Sequence[str]] = None, ids: Optional[Sequence[Any]] = None
+    ) -> Dict[Any, Dict[str, Any]]:
+        """Payloads (optionally only `fields`) of all points, or of `ids` that exist."""
+        ...
+
+    def build_index(self) -> Dict[str, Any]: ...
+
+    def search(
+        self,
+        query_vector: np.ndarray,
+        limit: int = 5,
+        score_threshold: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        exact: bool = False,
+    ) -> List[Dict[str, Any]]: ...
+
+    def search_batch(
+        self, query_vectors: np.ndarray, specs: Sequence[SearchSpec]
+    ) -> List[List[Dict[str, Any]]]: ...
+
+
+def store_modules(settings: Settings) -> tuple:
+    """Modules the configured backend needs; imported (and timed) by the loader."""
+    if settings.vector_backend == "numpy":
+        return ("app.numpy_store",)
+    return ("qdrant_client", "app.qdrant_store")
+
+
+def build_store(settings: Settings) -> VectorStore:
+    if settings.vector_backend == "numpy":
+        from app.numpy_store import NumpyVectorStore
+
+        return NumpyVectorStore(
+            settings.vector_store_dir,
+            settings.qdrant_collection,
+            index_type=settings.vector_index,
+            nlist=settings.ivf_nlist,
+            nprobe=settings.ivf_nprobe,
+            index_min_points=settings.ivf_min_points,
+            quantization=settings.quantization,
+            rescore_oversample=settings.rescore_oversample,
+        )
+    if settings.vector_backend == "qdrant":
+        from app.qdrant_store import QdrantVectorStore
+
+        return QdrantVectorStore(
+            settings.qdrant_url,
+            settings.qdrant_collection,
+            quantization=settings.quantization,
+            rescore_oversample=settings.rescore_oversample,
+        )
+    raise ValueError(
+        f"Unknown vector_backend '{settings.vector_backend}', expected one of {VECTOR_BACKENDS}"
+    )
@@ -0,0 +1,75 @@
+"""
+Recall@k and QPS of the IVF index against exact search on a synthetic corpus.
+
+    python -m scripts.benchmark_ann --vectors 200000 --nprobe 1 4 8 16 32
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.ivf_index import IVFIndex
+from scripts.synthetic import clustered_vectors, queries_near
+
+
+def exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = vectors @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def run(num_vectors: int, dim: int, num_queries: int, k: int, nlist: int, nprobes) -> list:
+    vectors = clustered_vectors(num_vectors, dim)
+    queries = queries_near(vectors, num_queries)
+
+    t0 = time.perf_counter()
+    truth = [exact_top_k(vectors, q, k) for q in queries]
+    exact_qps = num_queries / (time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    built = IVFIndex.build(vectors, nlist=nlist or None)
+    build_sec = time.perf_counter() - t0
+
+    rows = [{"mode": "exact", "recall_at_k": 1.0, "qps": round(exact_qps, 1)}]
+    with tempfile.TemporaryDirectory() as tmp:
+        built.save(Path(tmp))
+        index = IVFIndex.load(Path(tmp))  # measure the memory-mapped index, as served
+        for nprobe in nprobes:
+            found = []
+            t0 = time.perf_counter()
+            for q in queries:
+                found.append(index.search(q, vectors, k, nprobe)[0])
+            qps = num_queries / (time.perf_counter() - t0)
+            recall = np.mean([len(np.intersect1d(f, t)) / k for f, t in zip(found, truth)])
+            rows.append({
+                "mode": "ivf",
+                "nlist": index.nlist,
+                "nprobe": nprobe,
+                "recall_at_k": round(float(recall), 4),
+                "qps": round(qps, 1),
+                "speedup": round(qps / exact_qps, 1),
+                "build_sec": round(build_sec, 2),
+            })
+    for row in rows:
+        row.update({"vectors": num_vectors, "dim": dim, "k": k})
+    return rows
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="IVF recall@k and QPS vs exact search")
+    parser.add_argument("--vectors", type=int, default=100000, help="Corpus size (default: 100000)")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding size (default: 384, MiniLM)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries to time (default: 200)")
+    parser.add_argument("--k", type=int, default=10, help="Top-k for recall (default: 10)")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF lists (default: about 2*sqrt(n))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for row in run(args.vectors, args.dim, args.queries, args.k, args.nlist, args.nprobe):
+        print(json.dumps(row))
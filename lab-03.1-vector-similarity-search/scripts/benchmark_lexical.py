@@ -0,0 +1,75 @@
+"""
+BM25 query latency on a synthetic corpus with a Zipf-like vocabulary.
+
+    python -m scripts.benchmark_lexical --docs 100000 --query-terms 3 --stopword-ranks 100
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.lexical import BM25Index
+
+
+def synthetic_docs(n: int, vocab: int, length: int, stopword_ranks: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # Word ranks follow 1/rank, like natural text: a few very common terms, a long tail.
+    # The top `stopword_ranks` stand for function words ("the", "of", ...), which
+    # tokenize() drops from real text, so they are left out here too.
+    probs = 1.0 / np.arange(1, vocab + 1)
+    probs /= probs.sum()
+    words = np.array([f"w{i}" for i in range(vocab)])
+    for start in range(0, n, 10000):
+        tokens = rng.choice(vocab, size=(min(10000, n - start), length), p=probs)
+        for row in tokens:
+            yield " ".join(words[row[row >= stopword_ranks]])
+
+
+def run(num_docs: int, vocab: int, length: int, stopword_ranks: int, num_queries: int, query_terms: int,
+        k: int) -> dict:
+    index = BM25Index()
+    docs = []
+    t0 = time.perf_counter()
+    for i, text in enumerate(synthetic_docs(num_docs, vocab, length, stopword_ranks)):
+        index.add(i, text, {"service": ("api", "db", "platform")[i % 3]})
+        if i < num_queries:
+            docs.append(sorted(set(text.split())))
+    index.compile()
+    build_sec = time.perf_counter() - t0
+
+    rng = np.random.default_rng(1)
+    queries = [" ".join(rng.choice(words, size=query_terms, replace=False)) for words in docs]
+    rows = {}
+    for name, filters in (("no_filter", None), ("service_filter", {"service": "db"})):
+        latencies = []
+        for q in queries:
+            t0 = time.perf_counter()
+            index.search(q, k, filters)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+        rows[name] = {
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        }
+    return {"docs": num_docs, "vocab": vocab, "doc_tokens": length, "stopword_ranks": stopword_ranks,
+            "query_terms": query_terms, "k": k,
+            "build_sec": round(build_sec, 2), **rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--vocab", type=int, default=50000)
+    parser.add_argument("--doc-tokens", type=int, default=60)
+    parser.add_argument("--stopword-ranks", type=int, default=100,
+                        help="most frequent ranks treated as stopwords (0 keeps them)")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--query-terms", type=int, default=3)
+    parser.add_argument("--k", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.docs, args.vocab, args.doc_tokens, args.stopword_ranks, args.queries,
+                         args.query_terms, args.k)))
+
+
+if __name__ == "__main__":
+    main()
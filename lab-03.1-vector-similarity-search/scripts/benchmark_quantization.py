@@ -0,0 +1,72 @@
+"""
+Recall@k, latency and first-pass memory of quantized search (int8, binary)
+against exact float32 search, through NumpyVectorStore as served.
+
+    python -m scripts.benchmark_quantization --vectors 100000 --oversample 1 4 10 32
+"""
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from app.numpy_store import NumpyVectorStore
+from scripts.benchmark_ann import exact_top_k
+from scripts.synthetic import clustered_vectors, queries_near
+
+
+def run(num_vectors: int, dim: int, num_queries: int, k: int, kinds, oversamples) -> list:
+    vectors = clustered_vectors(num_vectors, dim)
+    queries = queries_near(vectors, num_queries)
+    truth = [exact_top_k(vectors, q, k) for q in queries]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in ["none", *kinds]:
+            store = NumpyVectorStore(tmp, f"bench-{kind}", initial_capacity=num_vectors, quantization=kind)
+            store.ensure_collection(dim)
+            store.upsert_arrays(list(range(num_vectors)), vectors, [{} for _ in range(num_vectors)])
+            t0 = time.perf_counter()
+            info = store.build_index()
+            build_sec = time.perf_counter() - t0
+            first_pass_mb = info.get("quantized_mb", round(vectors.nbytes / 2**20, 2))
+
+            for oversample in oversamples if kind != "none" else [None]:
+                store.rescore_oversample = oversample or 1
+                latencies, recalls = [], []
+                for q, t in zip(queries, truth):
+                    t0 = time.perf_counter()
+                    hits = store.search(q, k)
+                    latencies.append((time.perf_counter() - t0) * 1000.0)
+                    recalls.append(len(np.intersect1d([h["id"] for h in hits], t)) / k)
+                rows.append({
+                    "quantization": kind,
+                    "oversample": oversample,
+                    "recall_at_k": round(float(np.mean(recalls)), 4),
+                    "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+                    "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+                    "first_pass_mb": first_pass_mb,
+                    "build_sec": round(build_sec, 2),
+                })
+            del store
+    for row in rows:
+        row.update({"vectors": num_vectors, "dim": dim, "k": k})
+    return rows
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Quantized search recall@k, latency and memory vs exact")
+    parser.add_argument("--vectors", type=int, default=100000, help="Corpus size (default: 100000)")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding size (default: 384, MiniLM)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries to time (default: 200)")
+    parser.add_argument("--k", type=int, default=10, help="Top-k for recall (default: 10)")
+    parser.add_argument("--quantization", nargs="+", default=["int8", "binary"], choices=["int8", "binary"])
+    parser.add_argument("--oversample", type=int, nargs="+", default=[1, 4, 10, 32])
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for row in run(args.vectors, args.dim, args.queries, args.k, args.quantization, args.oversample):
+        print(json.dumps(row))
@@ -1,8 +1,88 @@
+"""
+Ingest runbooks.
+
+    python scripts/ingest.py                         # ask the running API to ingest runbooks.json
+    python -m scripts.ingest --file corpus.jsonl     # stream a file of any size in-process
+
+File mode loads the embedding model and the configured store itself
+(VECTOR_BACKEND, QDRANT_URL, ... as for the API) and streams the file in
+fixed-size batches, so memory stays flat however large the file is.
+Progress goes to stderr, the final summary to stdout.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
 import httpx
 
 API = "http://localhost:8000"
 
-if __name__ == "__main__":
-    r = httpx.post(f"{API}/ingest", timeout=120.0)
+
+def ingest_via_api(api: str) -> None:
+    r = httpx.post(f"{api}/ingest", timeout=120.0)
     r.raise_for_status()
     print(r.json())
+
+
+def ingest_file(path: str, batch_size: int, upsert_workers: int, max_pending: int,
+                delete_missing: bool) -> None:
+    from app.config import settings
+    from app.embedding_cache import EmbeddingCache
+    from app.embeddings import EmbeddingModel
+    from app.ingest import iter_documents, sync_documents
+    from app.lexical import BM25Index
+    from app.vector_store import build_store
+
+    embedder = EmbeddingModel(settings.embed_model)
+    store = build_store(settings)
+    cache = None
+    if settings.embedding_cache_dir:
+        cache = EmbeddingCache(settings.embedding_cache_dir, settings.embed_model)
+    lexical = BM25Index(str(Path(settings.lexical_index_dir) / f"{settings.qdrant_collection}.json"))
+
+    last = 0.0
+
+    def progress(stats: dict) -> None:
+        nonlocal last
+        now = time.monotonic()
+        if now - last >= 1.0:
+            last = now
+            print(json.dumps(stats), file=sys.stderr, flush=True)
+
+    result = sync_documents(
+        iter_documents(path),
+        embedder,
+        store,
+        cache,
+        batch_size=batch_size,
+        upsert_workers=upsert_workers,
+        max_pending=max_pending,
+        delete_missing=delete_missing,
+        progress=progress,
+        lexical=lexical,
+    )
+    print(json.dumps({"collection": store.collection, **result}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api", default=API)
+    parser.add_argument("--file", help="JSONL (one runbook per line) or JSON array to ingest in-process")
+    parser.add_argument("--batch-size", type=int, default=256, help="documents per embedding batch")
+    parser.add_argument("--upsert-workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=4, help="embedded batches waiting to be upserted")
+    parser.add_argument("--keep-missing", action="store_true",
+                        help="do not delete stored runbooks that are absent from the file")
+    args = parser.parse_args()
+
+    if args.file:
+        ingest_file(args.file, args.batch_size, args.upsert_workers, args.max_pending,
+                    delete_missing=not args.keep_missing)
+    else:
+        ingest_via_api(args.api)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Synthetic embedding corpora for offline benchmarks (no model download needed)."""
+import numpy as np
+
+
+def clustered_vectors(n: int, dim: int = 384, clusters: int = 200, spread: float = 0.35,
+                      seed: int = 0) -> np.ndarray:
+    """
+    L2-normalized float32 vectors scattered around random topic centers,
+    which is closer to real sentence embeddings than uniform noise.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 65536):
+        m = min(65536, n - start)
+        block = centers[rng.integers(0, clusters, size=m)]
+        block += spread * rng.standard_normal((m, dim)).astype(np.float32) / np.sqrt(dim)
+        vectors[start:start + m] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    return vectors
+
+
+def queries_near(vectors: np.ndarray, count: int, noise: float = 0.1, seed: int = 1) -> np.ndarray:
+    """Perturbed copies of random corpus vectors, like paraphrased queries."""
+    rng = np.random.default_rng(seed)
+    picks = vectors[rng.choice(len(vectors), size=count, replace=False)]
+    queries = picks + noise * rng.standard_normal(picks.shape).astype(np.float32) / np.sqrt(vectors.shape[1])
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
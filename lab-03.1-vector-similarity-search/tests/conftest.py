@@ -0,0 +1,30 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+
+class FakeEmbedder:
+    """Deterministic text -> vector, recording each batch that reaches the 'model'.
+
+    Uncased like MiniLM: text is lowercased before it is hashed.
+    """
+
+    dimension = 8
+    lowercases = True
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_texts(self, texts):
+        self.calls.append(list(texts))
+        rows = [np.frombuffer(hashlib.sha256(t.lower().encode()).digest(), dtype=np.int32) for t in texts]
+        return np.asarray(rows, dtype=np.float32)
+
+    def embed_one(self, text):
+        return self.embed_texts([text])[0]
+
+
+@pytest.fixture
+def embedder():
+    return FakeEmbedder()
@@ -1,4 +1,5 @@
 import httpx
+import time
 
 API = "http://localhost:8000"
 
@@ -6,3 +7,19 @@ def test_health():
     r = httpx.get(f"{API}/health", timeout=10.0)
     assert r.status_code == 200
     assert r.json()["status"] == "ok"
+
+def test_ready_after_background_load():
+    # /health answers immediately; /ready flips once the model and store are built
+    deadline = time.time() + 180
+    while time.time() < deadline:
+        r = httpx.get(f"{API}/ready", timeout=10.0)
+        if r.status_code == 200:
+            break
+        assert r.status_code == 503
+        time.sleep(2)
+    assert r.status_code == 200
+    assert r.json()["status"] == "ready"
+
+    profile = httpx.get(f"{API}/startup-profile", timeout=10.0).json()
+    modules = [m["module"] for m in profile["imports"]]
+    assert "sentence_transformers" in modules
@@ -0,0 +1,161 @@
+# Offline: runs without the API, Qdrant or the embedding model
+# (python -m pytest tests/test_ingest.py)
+import time
+
+import numpy as np
+import pytest
+
+from app.embedding_cache import EmbeddingCache
+from app.ingest import document_text, iter_jsonl, point_id, sync_documents
+from app.numpy_store import NumpyVectorStore
+
+
+def _docs(n):
+    return [
+        {"id": f"rb-{i:03d}", "title": f"Runbook {i}", "service": "api", "severity": "low",
+         "content": f"step {i}"}
+        for i in range(n)
+    ]
+
+
+def test_cache_hits_skip_model_and_persist(tmp_path, embedder):
+    cache = EmbeddingCache(str(tmp_path), "org/model")
+    first = cache.embed(["a", "b", "a"], embedder.embed_texts)
+    assert embedder.calls == [["a", "b"]]
+    assert np.array_equal(first[0], first[2])
+
+    reopened = EmbeddingCache(str(tmp_path), "org/model")
+    again = reopened.embed(["b", "c"], embedder.embed_texts)
+    assert embedder.calls[-1] == ["c"]
+    assert np.array_equal(again[0], first[1])
+    assert reopened.stats() == {"entries": 3, "hits": 1, "misses": 1}
+    # Another model never sees these entries
+    assert len(EmbeddingCache(str(tmp_path), "org/other")) == 0
+
+
+def test_cache_recovers_from_partial_append(tmp_path, embedder):
+    cache = EmbeddingCache(str(tmp_path), "m")
+    expected = cache.embed(["aaaa", "bbbb"], embedder.embed_texts)
+    # Crash during the next append: one whole vector and a partial one written,
+    # then only part of the first key line
+    with open(cache.path / "vectors.f32", "ab") as f:
+        f.write(np.ones(8 + 3, dtype=np.float32).tobytes())
+    with open(cache.path / "keys.txt", "a") as f:
+        f.write(cache.key("dddd")[:20])
+
+    reopened = EmbeddingCache(str(tmp_path), "m")
+    assert len(reopened) == 2
+    assert (reopened.path / "vectors.f32").stat().st_size == 2 * 8 * 4
+    fresh = reopened.embed(["eeeee"], embedder.embed_texts)
+    reopened.embed(["dddd"], embedder.embed_texts)
+
+    final = EmbeddingCache(str(tmp_path), "m")
+    assert final.embed(["aaaa", "bbbb", "eeeee"], embedder.embed_texts).tolist() == \
+        np.vstack([expected, fresh]).tolist()
+    assert embedder.calls == [["aaaa", "bbbb"], ["eeeee"], ["dddd"]]
+    keys = (final.path / "keys.txt").read_text().splitlines()
+    assert keys == [final.key(t) for t in ("aaaa", "bbbb", "eeeee", "dddd")]
+
+
+def test_sync_compacts_stale_cache_rows(tmp_path, embedder):
+    cache = EmbeddingCache(str(tmp_path / "cache"), "m")
+    store = NumpyVectorStore(str(tmp_path / "store"), "runbooks")
+    docs = _docs(10)
+    sync_documents(docs, embedder, store, cache)
+    for edit in ("v2", "v3"):
+        docs = [{**d, "content": f"{d['content']} {edit}"} for d in docs]
+        sync_documents(docs, embedder, store, cache)
+    # v2 left 10 of 20 rows stale (not over half); v3 made it 20 of 30
+    assert len(cache) == 10
+    assert (cache.path / "vectors.f32").stat().st_size == 10 * 8 * 4
+    assert not list(cache.path.glob("*.tmp"))
+
+    embedder.calls.clear()
+    reopened = EmbeddingCache(str(tmp_path / "cache"), "m")
+    texts = [document_text(d) for d in docs]
+    assert reopened.embed(texts, embedder.embed_texts).tolist() == embedder.embed_texts(texts).tolist()
+    assert len(embedder.calls) == 1  # only the reference call above
+
+
+def test_incremental_sync(tmp_path, embedder):
+    store = NumpyVectorStore(str(tmp_path / "store"), "runbooks")
+    cache = EmbeddingCache(str(tmp_path / "cache"), "fake")
+    docs = _docs(5)
+
+    result = sync_documents(docs, embedder, store, cache)
+    assert (result["inserted"], result["embedded"]) == (5, 5)
+    assert set(store.ids) == {point_id(d["id"]) for d in docs}
+
+    result = sync_documents(docs, embedder, store, cache)
+    assert result["unchanged"] == 5 and result["embedded"] == 0
+    assert len(embedder.calls) == 1
+
+    docs[1] = {**docs[1], "content": "edited"}
+    docs[2] = {**docs[2], "severity": "high"}  # payload-only change: cache hit
+    del docs[3]
+    result = sync_documents(docs, embedder, store, cache)
+    assert (result["updated"], result["deleted"], result["unchanged"]) == (2, 1, 2)
+    assert result["embedded"] == 1
+    assert store.count == 4
+
+    hit = store.search(embedder.embed_texts(["Runbook 1\nedited"])[0], limit=1)[0]
+    assert hit["id"] == point_id("rb-001") and hit["payload"]["content"] == "edited"
+    assert store.payloads_by_id()[point_id("rb-002")]["severity"] == "high"
+
+
+def test_delete_compacts_and_persists(tmp_path, embedder):
+    store = NumpyVectorStore(str(tmp_path), "runbooks")
+    docs = _docs(6)
+    sync_documents(docs, embedder, store)
+    store.delete_points([point_id("rb-001"), point_id("rb-004"), "missing"])
+
+    reopened = NumpyVectorStore(str(tmp_path), "runbooks")
+    assert reopened.count == 4
+    for doc in (docs[0], docs[2], docs[3], docs[5]):
+        query = embedder.embed_texts([f"{doc['title']}\n{doc['content']}"])[0]
+        assert reopened.search(query, limit=1)[0]["payload"]["doc_id"] == doc["id"]
+
+
+def test_iter_jsonl(tmp_path):
+    path = tmp_path / "docs.jsonl"
+    path.write_text('{"id": "a"}\n\n{"id": "b"}\n', encoding="utf-8")
+    assert [d["id"] for d in iter_jsonl(str(path))] == ["a", "b"]
+
+    path.write_text('{"id": "a"}\n{"id": \n', encoding="utf-8")
+    with pytest.raises(ValueError, match="docs.jsonl:2"):
+        list(iter_jsonl(str(path)))
+
+
+def test_streaming_sync_is_bounded(tmp_path, embedder):
+    store = NumpyVectorStore(str(tmp_path), "runbooks")
+    read = []
+    upserted = []
+    lag = []
+    upsert_arrays = store.upsert_arrays
+
+    def slow_upsert(ids, vectors, payloads):
+        time.sleep(0.005)
+        upsert_arrays(ids, vectors, payloads)
+        upserted.append(len(ids))
+
+    def stream(docs):
+        for doc in docs:
+            lag.append(len(read) - sum(upserted))
+            read.append(doc)
+            yield doc
+
+    store.upsert_arrays = slow_upsert
+    updates = []
+    result = sync_documents(stream(_docs(100)), embedder, store, batch_size=8, upsert_workers=2,
+                            max_pending=2, progress=updates.append)
+    assert result["inserted"] == 100 and store.count == 100
+    assert all(len(call) <= 8 for call in embedder.calls)
+    # Documents in memory: the batch being read plus at most max_pending batches awaiting upsert
+    assert max(lag) <= 8 * (2 + 1)
+    assert updates[-1]["read"] == 100 and updates[-1]["docs_per_sec"] > 0
+
+    # A partial file with delete_missing=False keeps everything else
+    result = sync_documents(iter(_docs(10)[:3]), embedder, store, delete_missing=False)
+    assert (result["unchanged"], result["deleted"], store.count) == (3, 0, 100)
+    reopened = NumpyVectorStore(str(tmp_path), "runbooks")
+    assert reopened.count == 100
@@ -0,0 +1,50 @@
+# Offline (python -m pytest tests/test_ivf_index.py)
+import numpy as np
+
+from app.ivf_index import IVFIndex
+from app.numpy_store import NumpyVectorStore
+from app.vector_store import Point
+from scripts.synthetic import clustered_vectors, queries_near
+
+
+def _exact(vectors, query, k):
+    return set(np.argsort(-(vectors @ query))[:k].tolist())
+
+
+def test_full_probe_equals_exact_and_recall_grows(tmp_path):
+    vectors = clustered_vectors(3000, dim=32, clusters=20)
+    IVFIndex.build(vectors, nlist=30).save(tmp_path)
+    index = IVFIndex.load(tmp_path)
+    assert isinstance(index.rows, np.memmap)
+    assert int(index.offsets[-1]) == index.count == 3000
+    assert not (tmp_path / "vectors.npy").exists()  # row ids only: vectors stay in the store
+
+    queries = queries_near(vectors, 20)
+    recall = {}
+    for nprobe in (1, 30):
+        hits = [index.search(q, vectors, 10, nprobe)[0] for q in queries]
+        recall[nprobe] = np.mean([len(set(h.tolist()) & _exact(vectors, q, 10)) / 10
+                                  for h, q in zip(hits, queries)])
+    assert recall[30] == 1.0
+    assert recall[1] <= recall[30]
+
+
+def test_store_uses_index_until_upsert(tmp_path):
+    vectors = clustered_vectors(500, dim=16, clusters=10)
+    store = NumpyVectorStore(str(tmp_path), "runbooks", index_type="ivf", index_min_points=100)
+    store.ensure_collection(16)
+    store.upsert_points([Point(id=i, vector=v, payload={"service": "api" if i % 2 else "db"})
+                         for i, v in enumerate(vectors)])
+    assert store.index is None
+    assert store.build_index()["index"] == "ivf"
+
+    hits = store.search(vectors[3], limit=5, nprobe=store.index.nlist, filters={"service": "api"})
+    assert hits[0]["id"] == 3
+    assert all(h["payload"]["service"] == "api" for h in hits)
+
+    # Reopening maps the saved index; an upsert makes it stale and search goes exact
+    reopened = NumpyVectorStore(str(tmp_path), "runbooks", index_type="ivf", index_min_points=100)
+    assert reopened.index is not None
+    reopened.upsert_points([Point(id=1000, vector=vectors[7], payload={"service": "db"})])
+    assert reopened.index is None
+    assert {h["id"] for h in reopened.search(vectors[7], limit=2)} == {7, 1000}
@@ -0,0 +1,61 @@
+# Offline: python -m pytest tests/test_lexical.py
+import pytest
+
+from app.lexical import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+def _index(path=None):
+    index = BM25Index(path)
+    index.add("a", "Database connection pool exhausted ERR-1042 on db-primary", {"service": "db"})
+    index.add("b", "High p95 latency: check http_requests_total and upstream timeouts", {"service": "api"})
+    index.add("c", "Disk full on node: clean images, expand volume", {"service": "platform"})
+    index.add("d", "Connection refused from api to db", {"service": "api"})
+    index.commit()
+    return index
+
+
+def test_tokenize_keeps_identifiers_and_parts():
+    tokens = tokenize("The ERR-1042 spike in http_requests_total")
+    assert {"err-1042", "err", "1042", "http_requests_total", "requests", "spike"} <= set(tokens)
+    assert "the" not in tokens
+
+
+def test_bm25_ranking_and_filters(tmp_path):
+    index = _index(str(tmp_path / "runbooks.json"))
+    assert index.search("ERR-1042")[0][0] == "a"
+    assert index.search("1042")[0][0] == "a"
+    assert index.search("http_requests_total p95")[0][0] == "b"
+
+    hits = index.search("connection", limit=5)
+    assert {pid for pid, _ in hits} == {"a", "d"}
+    assert [s for _, s in hits] == sorted((s for _, s in hits), reverse=True)
+    assert [pid for pid, _ in index.search("connection", filters={"service": "api"})] == ["d"]
+    assert index.search("connection", filters={"team": "x"}) == []
+    assert index.search("nothing matches here") == []
+
+    index.remove("a")
+    index.commit()
+    reopened = BM25Index(str(tmp_path / "runbooks.json"))
+    assert len(reopened) == 3 and reopened.search("1042") == []
+
+
+def test_weighted_rrf():
+    vector, lexical = ["x", "y", "z"], ["z", "w"]
+    fused = dict(reciprocal_rank_fusion([vector, lexical], [1.0, 1.0], k=60))
+    assert max(fused, key=fused.get) == "z"  # ranked by both lists
+    assert fused["x"] == pytest.approx(1 / 61)
+    only_vector = [pid for pid, _ in reciprocal_rank_fusion([vector, lexical], [1.0, 0.0])]
+    assert only_vector == vector
+
+
+def test_common_terms_only_score_rare_candidates():
+    index = BM25Index(common_cutoff=0.3)  # "connection" is in 2 of 4 docs: common
+    for pid, text in (("a", "connection pool ERR-1042"), ("b", "disk full"),
+                      ("c", "disk pressure"), ("d", "connection refused")):
+        index.add(pid, text)
+    index.commit()
+    with_rare = index.search("connection 1042")
+    assert [pid for pid, _ in with_rare] == ["a"]
+    assert with_rare[0][1] > index.search("1042")[0][1]  # the common term still adds weight
+    # Only common terms: every match is scored
+    assert {pid for pid, _ in index.search("connection")} == {"a", "d"}
@@ -0,0 +1,141 @@
+# Offline: runs without the API, Qdrant or the embedding model
+# (python -m pytest tests/test_numpy_store.py)
+import threading
+
+import numpy as np
+import pytest
+
+from app.numpy_store import NumpyVectorStore
+from app.vector_store import Point, SearchSpec
+
+
+def _points(n, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype("float32")
+    services = ["api", "db", "platform"]
+    return vectors, [
+        Point(id=i + 1, vector=vectors[i], payload={"service": services[i % 3], "doc_id": f"rb-{i}"})
+        for i in range(n)
+    ]
+
+
+def test_search_matches_brute_force(tmp_path):
+    vectors, points = _points(50)
+    store = NumpyVectorStore(str(tmp_path), "runbooks", initial_capacity=16)
+    store.ensure_collection(8)
+    store.upsert_points(points)  # grows 16 -> 64
+
+    query = vectors[7] + 0.01
+    hits = store.search(query, limit=5)
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normed @ (query / np.linalg.norm(query))))[:5] + 1
+    assert [h["id"] for h in hits] == expected.tolist()
+    assert hits[0]["id"] == 8
+    assert hits[0]["score"] == pytest.approx(1.0, abs=1e-3)
+    assert [h["score"] for h in hits] == sorted((h["score"] for h in hits), reverse=True)
+
+
+def test_filters_and_threshold(tmp_path):
+    vectors, points = _points(30)
+    store = NumpyVectorStore(str(tmp_path), "runbooks")
+    store.ensure_collection(8)
+    store.upsert_points(points)
+
+    hits = store.search(vectors[0], limit=20, filters={"service": "db"})
+    assert hits and all(h["payload"]["service"] == "db" for h in hits)
+    assert store.search(vectors[0], limit=5, filters={"service": "nope"}) == []
+    assert all(h["score"] >= 0.5 for h in store.search(vectors[0], limit=30, score_threshold=0.5))
+
+
+def test_upsert_replaces_and_persists(tmp_path):
+    vectors, points = _points(10)
+    store = NumpyVectorStore(str(tmp_path), "runbooks")
+    store.ensure_collection(8)
+    store.upsert_points(points)
+    store.upsert_points([Point(id=3, vector=vectors[9], payload={"service": "api", "doc_id": "new"})])
+    assert store.count == 10
+
+    reopened = NumpyVectorStore(str(tmp_path), "runbooks")
+    assert reopened.count == 10
+    top = reopened.search(vectors[9], limit=2)
+    assert {h["id"] for h in top} == {3, 10}
+    assert reopened.payloads[2]["doc_id"] == "new"
+
+
+def test_vector_size_mismatch(tmp_path):
+    store = NumpyVectorStore(str(tmp_path), "runbooks")
+    store.ensure_collection(8)
+    with pytest.raises(ValueError):
+        NumpyVectorStore(str(tmp_path), "runbooks").ensure_collection(16)
+
+
+def test_upsert_arrays_matches_points(tmp_path):
+    vectors, points = _points(20)
+    by_points = NumpyVectorStore(str(tmp_path / "a"), "runbooks")
+    by_points.ensure_collection(8)
+    by_points.upsert_points(points)
+
+    by_arrays = NumpyVectorStore(str(tmp_path / "b"), "runbooks", initial_capacity=8)
+    by_arrays.ensure_collection(8)
+    by_arrays.upsert_arrays([p.id for p in points[:12]], vectors[:12], [p.payload for p in points[:12]])
+    # Mixed new + existing ids take the scattered-row path
+    by_arrays.upsert_arrays([p.id for p in points[10:]], vectors[10:], [p.payload for p in points[10:]])
+
+    assert by_arrays.ids == by_points.ids
+    assert np.allclose(by_arrays.vectors, by_points.vectors)
+    assert by_arrays.payloads == by_points.payloads
+
+
+def test_search_batch_matches_single_queries(tmp_path):
+    vectors, points = _points(60)
+    store = NumpyVectorStore(str(tmp_path), "runbooks")
+    store.ensure_collection(8)
+    store.upsert_points(points)
+
+    specs = [
+        SearchSpec(limit=5),
+        SearchSpec(limit=3, filters={"service": "db"}),
+        SearchSpec(limit=10, score_threshold=0.3),
+        SearchSpec(limit=4, filters={"service": "nope"}),
+    ]
+    queries = vectors[[1, 2, 3, 4]] + 0.05
+    batch = store.search_batch(queries, specs, chunk=3)  # spans two chunks
+    for query, spec, hits in zip(queries, specs, batch):
+        single = store.search(query, spec.limit, spec.score_threshold, spec.filters)
+        assert [h["id"] for h in hits] == [h["id"] for h in single]
+        assert [h["score"] for h in hits] == pytest.approx([h["score"] for h in single], abs=1e-5)
+
+
+def test_searches_run_safely_alongside_writes(tmp_path):
+    vectors, points = _points(200)
+    store = NumpyVectorStore(str(tmp_path), "runbooks", initial_capacity=16)
+    store.ensure_collection(8)
+    store.upsert_points(points[:50])
+    errors = []
+    done = threading.Event()
+
+    def searcher(filters):
+        while not done.is_set():
+            try:
+                for hit in store.search(vectors[3], limit=5, filters=filters):
+                    assert filters is None or hit["payload"]["service"] == filters["service"]
+                store.search_batch(vectors[:4], [SearchSpec(limit=3)] * 4)
+            except Exception as exc:  # collected, so the test reports it
+                errors.append(exc)
+                return
+
+    threads = [threading.Thread(target=searcher, args=(f,)) for f in (None, {"service": "db"})]
+    for t in threads:
+        t.start()
+    try:
+        # Growth (resizes), overwrites and delete compaction while searches run
+        for i in range(50, 200, 10):
+            store.upsert_points(points[i:i + 10])
+            store.delete_points([points[i - 50].id])
+            store.upsert_points(points[i - 50:i - 49])
+    finally:
+        done.set()
+        for t in threads:
+            t.join()
+    assert errors == []
+    assert store.count == 200
@@ -0,0 +1,69 @@
+# Offline: python -m pytest tests/test_quantization.py
+import numpy as np
+import pytest
+
+from app.numpy_store import NumpyVectorStore
+from app.quantization import QuantizedVectors, pack_bits, popcount64
+from scripts.synthetic import clustered_vectors, queries_near
+
+
+def test_popcount_and_pack_bits():
+    words = np.array([0, 1, 0xFF, 2**64 - 1, 0x8000000000000001], dtype=np.uint64)
+    assert popcount64(words).tolist() == [0, 1, 8, 64, 2]
+
+    vectors = np.random.default_rng(0).standard_normal((3, 70)).astype(np.float32)
+    packed = pack_bits(vectors)
+    assert packed.shape == (3, 2) and packed.dtype == np.uint64  # 70 bits -> two words
+    assert popcount64(packed).sum(axis=1).tolist() == (vectors > 0).sum(axis=1).tolist()
+
+
+@pytest.mark.parametrize("kind", ["int8", "binary"])
+def test_build_save_load(tmp_path, kind):
+    vectors = clustered_vectors(500, dim=64)
+    built = QuantizedVectors.build(kind, vectors)
+    assert built.nbytes == vectors.nbytes // (4 if kind == "int8" else 32)
+
+    built.save(tmp_path)
+    loaded = QuantizedVectors.load(tmp_path)
+    assert loaded.kind == kind and loaded.count == 500 and loaded.scale == built.scale
+    np.testing.assert_array_equal(loaded.codes, built.codes)
+
+    # The closest approximate score is the vector itself
+    assert int(np.argmax(loaded.scores(vectors[42]))) == 42
+    rows = np.array([3, 42, 99])
+    np.testing.assert_allclose(loaded.scores(vectors[42], rows), loaded.scores(vectors[42])[rows])
+
+
+def test_store_rescores_quantized_candidates(tmp_path):
+    vectors = clustered_vectors(3000, dim=64)
+    queries = queries_near(vectors, 20)
+    store = NumpyVectorStore(str(tmp_path), "runbooks", initial_capacity=4096, quantization="int8")
+    store.ensure_collection(64)
+    store.upsert_arrays(list(range(3000)), vectors, [{"service": ("api", "db")[i % 2]} for i in range(3000)])
+    info = store.build_index()
+    assert info["quantization"] == "int8" and store.quantized.count == 3000
+
+    recall = []
+    for q in queries:
+        exact = store.search(q, 10, exact=True)
+        approx = store.search(q, 10)
+        recall.append(len({h["id"] for h in exact} & {h["id"] for h in approx}) / 10)
+        # Rescored hits carry exact float32 scores
+        exact_scores = {h["id"]: h["score"] for h in exact}
+        assert all(h["score"] == pytest.approx(exact_scores[h["id"]]) for h in approx if h["id"] in exact_scores)
+    assert np.mean(recall) >= 0.95
+
+    hits = store.search(queries[0], 5, filters={"service": "db"})
+    assert len(hits) == 5 and all(h["payload"]["service"] == "db" for h in hits)
+
+    # Codes survive a reopen, and any write drops them until the next build
+    reopened = NumpyVectorStore(str(tmp_path), "runbooks", quantization="int8")
+    assert reopened.quantized is not None and reopened.quantized.count == 3000
+    reopened.upsert_arrays([0], vectors[:1], [{}])
+    assert reopened.quantized is None
+    assert NumpyVectorStore(str(tmp_path), "runbooks", quantization="int8").quantized is None
+
+
+def test_invalid_quantization(tmp_path):
+    with pytest.raises(ValueError):
+        NumpyVectorStore(str(tmp_path), "runbooks", quantization="fp16")
@@ -0,0 +1,60 @@
+# Offline: python -m pytest tests/test_query_cache.py
+import numpy as np
+
+from app.query_cache import LRUCache, QueryCache, normalize_query
+
+
+def test_lru_bounds_and_stats():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 1, "evictions": 1,
+                             "hit_rate": 0.5}
+
+    disabled = LRUCache(0)
+    disabled.put("a", 1)
+    assert disabled.get("a") is None and len(disabled) == 0
+
+
+def test_embeddings_skip_model_for_normalized_repeats():
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return np.arange(len(texts) * 4, dtype=np.float32).reshape(len(texts), 4)
+
+    # Uncased model: case and whitespace variants share an entry; the model
+    # still gets the original text
+    cache = QueryCache(embedding_size=8, result_size=8)
+    first = cache.embed(["DB  pool exhausted", "disk full"], embed, fold_case=True)
+    again = cache.embed(["db pool exhausted", "new one", "new one"], embed, fold_case=True)
+    assert calls == [["DB  pool exhausted", "disk full"], ["new one"]]
+    assert np.array_equal(again[0], first[0]) and np.array_equal(again[1], again[2])
+    assert normalize_query("  Disk\tFULL ", fold_case=True) == "disk full"
+
+
+def test_cased_model_keeps_case_apart():
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+    cache = QueryCache()
+    cache.embed(["OOM  killed"], embed)
+    cache.embed(["oom killed", "OOM killed"], embed)
+    assert calls == [["OOM  killed"], ["oom killed"]]
+    assert normalize_query("  Disk\tFULL ") == "Disk FULL"
+
+
+def test_bump_invalidates_results():
+    cache = QueryCache()
+    key = cache.result_key("q", 5)
+    cache.results.put(key, ["hit"])
+    assert cache.results.get(cache.result_key("q", 5)) == ["hit"]
+    cache.bump()
+    assert cache.results.get(cache.result_key("q", 5)) is None
+    assert len(cache.results) == 0 and cache.version == 1
@@ -0,0 +1,123 @@
+# Offline: runs without Qdrant or the embedding model
+# (python -m pytest tests/test_search_batch.py)
+import json
+import threading
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.ingest import sync_documents
+from app.lexical import BM25Index
+from app.query_cache import QueryCache
+from app.numpy_store import NumpyVectorStore
+
+
+def _serve(tmp_path, monkeypatch, embedder):
+    store = NumpyVectorStore(str(tmp_path), "runbooks")
+    docs = [
+        {"id": f"rb-{i}", "title": f"Runbook {i}", "service": ["api", "db"][i % 2],
+         "severity": "low", "content": f"step {i}"}
+        for i in range(10)
+    ]
+    lexical = BM25Index()
+    sync_documents(docs, embedder, store, lexical=lexical)
+    monkeypatch.setattr(main.components, "lexical", lexical)
+    monkeypatch.setattr(main.components, "embedder", embedder)
+    monkeypatch.setattr(main.components, "store", store)
+    ready = threading.Event()
+    ready.set()
+    monkeypatch.setattr(main.components, "_ready", ready)
+    monkeypatch.setattr(main, "query_cache", QueryCache())
+    return TestClient(main.app), store, docs
+
+
+def test_batch_search_one_encoder_call(tmp_path, monkeypatch, embedder):
+    client, _, _ = _serve(tmp_path, monkeypatch, embedder)
+    queries = [
+        {"query": "Runbook 3\nstep 3", "top_k": 2},
+        {"query": "Runbook 4\nstep 4", "top_k": 3, "service": "db"},
+    ]
+    embedder.calls.clear()
+    r = client.post("/search/batch", json={"queries": queries})
+    assert r.status_code == 200
+    assert len(embedder.calls) == 1
+
+    results = r.json()["results"]
+    assert [len(res["hits"]) for res in results] == [2, 3]
+    assert results[0]["hits"][0]["title"] == "Runbook 3"
+    assert all(h["service"] == "db" for h in results[1]["hits"])
+    for q, res in zip(queries, results):
+        assert client.post("/search", json=q).json()["hits"] == res["hits"]
+
+    assert client.post("/search/batch", json={"queries": []}).status_code == 422
+
+
+def test_repeated_search_is_served_from_cache(tmp_path, monkeypatch, embedder):
+    client, _, docs = _serve(tmp_path, monkeypatch, embedder)
+    embedder.calls.clear()
+    body = {"query": "Runbook 3\nstep 3", "top_k": 2}
+    first = client.post("/search", json=body).json()
+    assert client.post("/search", json={**body, "query": "runbook 3  STEP 3"}).json()["hits"] == first["hits"]
+    assert len(embedder.calls) == 1
+
+    # Same text, different request: L2 misses, L1 still saves the model call
+    client.post("/search", json={**body, "top_k": 3})
+    assert len(embedder.calls) == 1
+
+    # An ingest that changes the collection retires cached results
+    data = tmp_path / "runbooks.json"
+    data.write_text(json.dumps(docs[:3]), encoding="utf-8")
+    monkeypatch.setattr(main, "DATA_PATH", data)
+    assert client.post("/ingest").json()["deleted"] == 7
+    assert client.post("/search", json=body).json()["hits"] != first["hits"]
+    stats = client.get("/cache/stats").json()
+    assert stats["version"] == 1 and stats["embeddings"]["hits"] >= 2
+
+
+def test_lexical_and_hybrid_modes(tmp_path, monkeypatch, embedder):
+    client, _, _ = _serve(tmp_path, monkeypatch, embedder)
+    embedder.calls.clear()
+    lexical = client.post("/search", json={"query": "step 7", "top_k": 3, "mode": "lexical"}).json()
+    assert lexical["hits"][0]["title"] == "Runbook 7"
+    assert embedder.calls == []  # BM25 only: no model call
+
+    body = {"query": "Runbook 7 step 7", "top_k": 3, "mode": "hybrid", "vector_weight": 0.0}
+    hybrid = client.post("/search", json=body).json()
+    assert [h["id"] for h in hybrid["hits"]][:1] == [lexical["hits"][0]["id"]]
+    assert (lexical["score_type"], hybrid["score_type"]) == ("bm25", "rrf")
+    # A cosine cutoff has no meaning for BM25 or RRF scores
+    assert client.post("/search", json={**body, "score_threshold": 0.5}).status_code == 422
+
+    filtered = client.post("/search", json={**body, "vector_weight": 1.0, "service": "api"}).json()
+    assert filtered["hits"] and all(h["service"] == "api" for h in filtered["hits"])
+
+    batch = client.post("/search/batch", json={"queries": [
+        {"query": "step 7", "top_k": 3, "mode": "lexical"},
+        {"query": "Runbook 2\nstep 2", "top_k": 1},
+    ]}).json()["results"]
+    assert batch[0]["hits"] == lexical["hits"]
+    vector = client.post("/search", json={"query": "Runbook 2\nstep 2", "top_k": 1}).json()
+    assert len(batch[1]["hits"]) == 1 and batch[1]["hits"] == vector["hits"]
+    assert batch[1]["score_type"] == vector["score_type"] == "cosine"
+
+
+def test_concurrent_ingest_is_rejected(tmp_path, monkeypatch, embedder):
+    client, _, _ = _serve(tmp_path, monkeypatch, embedder)
+    monkeypatch.setattr(main.components, "cache", None)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_sync(docs, *args, **kwargs):
+        started.set()
+        release.wait(5)
+        return sync_documents(docs, *args, **kwargs)
+
+    monkeypatch.setattr(main, "sync_documents", slow_sync)
+    first = []
+    worker = threading.Thread(target=lambda: first.append(client.post("/ingest")))
+    worker.start()
+    assert started.wait(5)
+    assert client.post("/ingest").status_code == 409
+    release.set()
+    worker.join(5)
+    assert first[0].status_code == 200
+    assert client.post("/ingest").status_code == 200  # the lock was released